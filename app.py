@@ -3,7 +3,7 @@ from datetime import timedelta, datetime
 import argparse
 import os
 from config import Config
-from models.database import init_db
+from models.database import init_db, init_app as init_db_app
 
 
 def format_datetime(value, format='%Y-%m-%d %H:%M'):
@@ -58,6 +58,9 @@ def create_app(bible_source=None, bible_translation=None):
     # Adatbázis inicializálása
     init_db()
     
+    # Kérésenként egy kapcsolat és egy tranzakció
+    init_db_app(app)
+    
     # Blueprint-ek regisztrálása
     from routes.auth import auth_bp
     from routes.bible import bible_bp
@@ -67,6 +70,10 @@ def create_app(bible_source=None, bible_translation=None):
     app.register_blueprint(bible_bp)
     app.register_blueprint(admin_bp)
     
+    # Parancssori karbantartó parancsok (flask --app app <parancs>)
+    from commands import register_commands
+    register_commands(app)
+    
     return app
 
 if __name__ == '__main__':
@@ -112,12 +119,12 @@ if __name__ == '__main__':
     translation = args.translation or os.environ.get('BIBLE_TRANSLATION') or 'SZIT'
     
     print(f"Biblia forrás: {source}")
+    print(f"Fordítás: {translation}")
     if source == 'api':
         api_url = os.environ.get('BIBLE_API_URL') or Config.BIBLE_API_URL
-        print(f"Fordítás: {translation}")
         print(f"API: {api_url}")
     else:
-        print("Helyi adatbázis (még nincs implementálva)")
+        print(f"Helyi adatbázis: {Config.LOCAL_BIBLE_PATH}")
     print(f"Szerver: http://{args.host}:{args.port}")
     print("="*50)
     
@@ -0,0 +1,67 @@
+"""
+Parancssori karbantartó parancsok
+
+Használat: flask --app app <parancs>
+"""
+
+import click
+
+
+def register_commands(app):
+    """Karbantartó parancsok regisztrálása a Flask CLI-hez"""
+
+    @app.cli.command('recount-counters')
+    def recount_counters_command():
+        """Reakció- és válaszszámlálók újraszámolása (javítás)"""
+        from models.database import recount_counters
+        recount_counters()
+        click.echo('Számlálók újraszámolva.')
+
+    @app.cli.command('rebuild-progress')
+    @click.option('--plan-id', type=int, default=None, help='Csak ennek a tervnek az adatai')
+    def rebuild_progress_command(plan_id):
+        """Olvasási bittérképek és rangsor újraépítése a reading_log táblából"""
+        from models.database import rebuild_reading_progress
+        rebuild_reading_progress(plan_id)
+        click.echo('Olvasási haladás újraépítve.')
+
+    @app.cli.command('backfill-plan-lookup')
+    def backfill_plan_lookup_command():
+        """Hiányzó/elavult terv keresőkulcsok kitöltése (a jelszavakat bekéri, üres = kihagyás)"""
+        from config import Config
+        from models.database import backfill_plan_lookup, get_stale_lookup_plans
+        plans = get_stale_lookup_plans()
+        if not plans:
+            click.echo('Minden terv keresőkulcsa naprakész.')
+            return
+        skipped = 0
+        for plan in plans:
+            # Az alapértelmezett terv jelszavát a konfigurációból is megpróbáljuk
+            if backfill_plan_lookup(plan['id'], Config.SITE_PASSWORD):
+                click.echo(f'#{plan["id"]} {plan["name"]}: kitöltve (SITE_PASSWORD).')
+                continue
+            while True:
+                password = click.prompt(f'#{plan["id"]} {plan["name"]} jelszava', default='',
+                                        hide_input=True, show_default=False)
+                if not password:
+                    skipped += 1
+                    break
+                if backfill_plan_lookup(plan['id'], password):
+                    click.echo(f'#{plan["id"]} {plan["name"]}: kitöltve.')
+                    break
+                click.echo('Hibás jelszó.', err=True)
+        if skipped:
+            click.echo(f'{skipped} terv kihagyva - ezek az első sikeres belépéskor kapnak kulcsot.')
+
+    @app.cli.command('import-bible')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--translation', '-t', required=True, help='Fordítás kódja (pl. SZIT, RUF, KG)')
+    @click.option('--replace', is_flag=True, help='A fordítás meglévő verseinek törlése az import előtt')
+    def import_bible_command(path, translation, replace):
+        """Teljes fordítás importálása a helyi szöveg tárolóba (JSON vagy CSV)"""
+        from services.local_bible import get_local_bible, read_import_file
+        store = get_local_bible(app.config)
+        imported, unknown = store.import_rows(translation.upper(), read_import_file(path), replace=replace)
+        click.echo(f'{imported} vers importálva ({translation.upper()}).')
+        if unknown:
+            click.echo(f'Ismeretlen könyv nevek (kihagyva): {", ".join(sorted(unknown))}', err=True)
@@ -9,6 +9,12 @@ class Config:
     # Titkos kulcs a session-ökhöz
     SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
     
+    # Titkos kulcs a terv jelszavak indexelhető keresőkulcsához (HMAC)
+    # Ajánlott külön megadni, hogy a SECRET_KEY cseréje ne érintse. Csere után a
+    # régi kulcsú tervek az első sikeres belépéskor (vagy: flask backfill-plan-lookup)
+    # új kulcsot kapnak, addig a sikertelen belépések végigellenőrzik őket.
+    PLAN_LOOKUP_SECRET = os.environ.get('PLAN_LOOKUP_SECRET', SECRET_KEY)
+    
     # Központi jelszó a weboldalhoz (alapértelmezett terv létrehozásához)
     SITE_PASSWORD = os.environ.get('SITE_PASSWORD', 'biblia2025')
     
@@ -20,11 +26,32 @@ class Config:
     # SQLite elérési út (csak ha nincs DATABASE_URL)
     DATABASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'bible.db')
     
+    # SQLite production beállítások (WAL mód mellett)
+    # Várakozás zárolt adatbázisra / foglalt íróra (ezredmásodperc)
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+    # Memóriába leképezett I/O mérete (bájt, 0 = kikapcsolva)
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+    # Lap gyorsítótár mérete kapcsolatonként (KiB)
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', '16384'))
+    
     @classmethod
     def is_postgres(cls):
         """Visszaadja, hogy PostgreSQL-t használunk-e"""
         return cls.DATABASE_URL is not None
     
+    # Kapcsolat pool (PostgreSQL) - alapértelmezetten a gunicorn szálak száma
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', os.environ.get('GUNICORN_THREADS', '8')))
+    
+    # Maximális várakozás szabad kapcsolatra (másodperc)
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '30'))
+    
+    # Kapcsolatok újranyitása ennyi másodperc után (0 = soha)
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', '1800'))
+    
+    # Olvasási terv adatok (reading_plans sorok) memória gyorsítótára workerenként (mp, 0 = kikapcsolva).
+    # A saját worker módosításai azonnal érvényesek, a többi worker legfeljebb ennyi idő után látja őket.
+    PLAN_CACHE_TTL = int(os.environ.get('PLAN_CACHE_TTL', '60'))
+    
     # Olvasási terv JSON fájl
     READING_PLAN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'reading_plan.json')
     
@@ -59,3 +86,51 @@ class Config:
     
     # API kulcs (szentiras.hu)
     BIBLE_API_KEY = os.environ.get('BIBLE_API_KEY', '')
+    
+    # API hívások: kapcsolódási és olvasási időkorlát (mp), újrapróbálkozások, várakozási alap (mp)
+    BIBLE_API_CONNECT_TIMEOUT = float(os.environ.get('BIBLE_API_CONNECT_TIMEOUT', '3'))
+    BIBLE_API_READ_TIMEOUT = float(os.environ.get('BIBLE_API_READ_TIMEOUT', '5'))
+    BIBLE_API_RETRIES = int(os.environ.get('BIBLE_API_RETRIES', '2'))
+    BIBLE_API_BACKOFF = float(os.environ.get('BIBLE_API_BACKOFF', '0.3'))
+    # Egy hívás teljes időkorlátja újrapróbálkozásokkal együtt (mp, 0 = nincs);
+    # nélküle az alapértékekkel a legrosszabb eset kb. 25 mp: (3 + 5) × 3 + várakozás
+    BIBLE_API_TOTAL_TIMEOUT = float(os.environ.get('BIBLE_API_TOTAL_TIMEOUT', '10'))
+    # Nyitva tartott keep-alive kapcsolatok workerenként (a gunicorn szálak + VERSE_BATCH_WORKERS)
+    BIBLE_API_POOL_SIZE = int(os.environ.get('BIBLE_API_POOL_SIZE', '12'))
+    
+    # Megszakító: ennyi egymást követő hiba után ennyi másodpercig nem hívjuk az API-t
+    BIBLE_API_BREAKER_THRESHOLD = int(os.environ.get('BIBLE_API_BREAKER_THRESHOLD', '5'))
+    BIBLE_API_BREAKER_RESET = float(os.environ.get('BIBLE_API_BREAKER_RESET', '30'))
+    
+    # Helyi Biblia szöveg tároló ('local' forrás, import: flask import-bible)
+    LOCAL_BIBLE_PATH = os.environ.get(
+        'LOCAL_BIBLE_PATH',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'bible_text.db')
+    )
+    
+    # Kötegelt vers lekérés (/api/verses/batch): párhuzamos szálak és hivatkozások maximális száma
+    VERSE_BATCH_WORKERS = int(os.environ.get('VERSE_BATCH_WORKERS', '4'))
+    VERSE_BATCH_MAX_REFERENCES = int(os.environ.get('VERSE_BATCH_MAX_REFERENCES', '12'))
+    
+    # Tartós vers gyorsítótár (SQLite fájl, üres érték = kikapcsolva)
+    VERSE_CACHE_PATH = os.environ.get(
+        'VERSE_CACHE_PATH',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'verse_cache.db')
+    )
+    
+    # Gyorsítótárazott szakaszok maximális száma (LRU kiürítés)
+    VERSE_CACHE_MAX_ENTRIES = int(os.environ.get('VERSE_CACHE_MAX_ENTRIES', '5000'))
+    
+    # Gyorsítótár bejegyzések frissessége (mp, 0 = sosem jár le): a lejárt bejegyzést
+    # azonnal kiszolgáljuk, és a háttérben frissítjük (stale-while-revalidate)
+    VERSE_CACHE_TTL = int(os.environ.get('VERSE_CACHE_TTL', str(30 * 24 * 3600)))
+    
+    # Csak gyorsítótárból szolgálunk ki, az API-t nem hívjuk (pl. tervezett API leállás idejére).
+    # Nyitott API megszakító esetén automatikusan is bekapcsol.
+    VERSE_CACHE_ONLY = os.environ.get('VERSE_CACHE_ONLY', 'false').lower() in ('1', 'true', 'yes')
+    
+    # Renderelt vers HTML memória gyorsítótár mérete workerenként (szakasz + fordítás)
+    RENDERED_VERSES_CACHE_SIZE = int(os.environ.get('RENDERED_VERSES_CACHE_SIZE', '512'))
+    
+    # Workerek közötti lekérési zár lejárata (mp) - ennyit vár egy worker a másik lekérésére
+    VERSE_FETCH_LOCK_TIMEOUT = float(os.environ.get('VERSE_FETCH_LOCK_TIMEOUT', '15'))
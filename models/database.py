@@ -1,7 +1,17 @@
 import os
+import hmac
+import json
+import base64
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
+from flask import g, has_request_context
 from werkzeug.security import generate_password_hash, check_password_hash
 from config import Config
+from models.pool import PoolHolder, PostgresPool, SQLitePool
+from models.reading_bitmap import ReadingBitmap
 
 # Adatbázis típus meghatározása
 USE_POSTGRES = Config.is_postgres()
@@ -9,23 +19,166 @@ USE_POSTGRES = Config.is_postgres()
 if USE_POSTGRES:
     import psycopg2
     from psycopg2.extras import RealDictCursor
+    IntegrityError = psycopg2.IntegrityError
 else:
     import sqlite3
+    IntegrityError = sqlite3.IntegrityError
 
 
-def get_db_connection():
-    """Adatbázis kapcsolat létrehozása"""
+def _connect():
+    """Új (nem pool-ozott) adatbázis kapcsolat nyitása"""
     if USE_POSTGRES:
-        conn = psycopg2.connect(Config.DATABASE_URL)
-        return conn
+        return psycopg2.connect(Config.DATABASE_URL)
     else:
         # SQLite - biztosítjuk, hogy a data mappa létezik
         os.makedirs(os.path.dirname(Config.DATABASE_PATH), exist_ok=True)
-        conn = sqlite3.connect(Config.DATABASE_PATH)
+        conn = sqlite3.connect(Config.DATABASE_PATH, timeout=Config.SQLITE_BUSY_TIMEOUT_MS / 1000)
         conn.row_factory = sqlite3.Row
+        # Production profil: WAL (olvasók nem várnak az íróra), rövidebb fsync, nagyobb cache
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={int(Config.SQLITE_BUSY_TIMEOUT_MS)}')
+        conn.execute(f'PRAGMA mmap_size={int(Config.SQLITE_MMAP_SIZE)}')
+        conn.execute(f'PRAGMA cache_size=-{int(Config.SQLITE_CACHE_SIZE_KB)}')
+        conn.execute('PRAGMA temp_store=MEMORY')
         return conn
 
 
+def _create_pool():
+    """Az adatbázis típusnak megfelelő kapcsolat pool létrehozása"""
+    if USE_POSTGRES:
+        return PostgresPool(
+            _connect,
+            size=Config.DB_POOL_SIZE,
+            timeout=Config.DB_POOL_TIMEOUT,
+            recycle=Config.DB_POOL_RECYCLE
+        )
+    return SQLitePool(_connect, write_timeout=Config.SQLITE_BUSY_TIMEOUT_MS / 1000)
+
+
+_pool = PoolHolder(_create_pool)
+
+
+class RequestConnection:
+    """
+    Kérés szintű kapcsolat (unit of work).
+    
+    Egy HTTP kérés alatt minden modell függvény ugyanezt a kapcsolatot kapja.
+    A commit() és close() hívások a kérés végére halasztódnak, ahol egyetlen
+    commit vagy rollback történik (lásd init_app). A hibát elnyelő függvények
+    az írásaikat savepoint()-ba teszik, így a közös tranzakció nem marad
+    megszakított állapotban.
+    
+    SQLite alatt kivétel az írási tranzakció: az egyetlen írót nem tartjuk a
+    kérés végéig (sablon renderelés, API hívások), az írás a függvény
+    commit()-jánál véglegesül és az író azonnal felszabadul. A commit nélkül
+    visszatérő függvény rollback()-je vagy close()-a az írást eldobja és az
+    írót szintén elengedi.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def commit(self):
+        # A kérés végén egyszerre commit-olunk (SQLite: a nyitott írás most véglegesül)
+        if self._conn.writing:
+            self._conn.commit()
+
+    def rollback(self):
+        # Csak a félbehagyott SQLite írást görgetjük vissza (az író felszabadul);
+        # PostgreSQL alatt a közös tranzakció sorsa a kérés végén dől el
+        if self._conn.writing:
+            self._conn.rollback()
+
+    def close(self):
+        # A kapcsolatot a kérés végén adjuk vissza a pool-nak, de commit nélküli
+        # SQLite írásnál az írót nem tartjuk addig
+        self.rollback()
+
+
+def get_db_connection(write=False):
+    """
+    Adatbázis kapcsolat kölcsönzése a pool-ból (a close() visszaadja a pool-nak).
+    HTTP kérésen belül a kéréshez kötött közös kapcsolatot adja vissza.
+    
+    Args:
+        write: írási tranzakció indítása (SQLite: soros író útvonal, BEGIN IMMEDIATE).
+               Feltételes írás előtt a conn.begin_write() is hívható.
+    """
+    if has_request_context():
+        if 'db_conn' not in g:
+            g.db_conn = RequestConnection(_pool.get().acquire())
+        conn = g.db_conn
+    else:
+        conn = _pool.get().acquire()
+    if write:
+        conn.begin_write()
+    return conn
+
+
+@contextmanager
+def savepoint(cursor):
+    """
+    Mentési pont a (kérés szintű) tranzakción belül: hiba esetén csak a blokk
+    írásait görgetjük vissza, a kivételt továbbdobjuk.
+    Írási kapcsolaton használandó (SQLite: a BEGIN IMMEDIATE után).
+    """
+    cursor.execute('SAVEPOINT helper_write')
+    try:
+        yield
+    except BaseException:
+        cursor.execute('ROLLBACK TO SAVEPOINT helper_write')
+        cursor.execute('RELEASE SAVEPOINT helper_write')
+        raise
+    cursor.execute('RELEASE SAVEPOINT helper_write')
+
+
+def _commit_request_connection(response):
+    """
+    Kérés végén: egyetlen commit (hibás válasz - 4xx/5xx - esetén rollback).
+    
+    A rollback a kérés közös tranzakcióját dobja el, ami PostgreSQL alatt a
+    függvények összes írása. SQLite alatt a függvények írásai a saját
+    commit()-juknál már véglegesültek, itt csak a commit nélküli maradék
+    (pl. olvasási kapcsolaton végzett írás) görgetődik vissza.
+    """
+    conn = g.pop('db_conn', None)
+    if conn is not None:
+        try:
+            if response.status_code < 400:
+                conn._conn.commit()
+            else:
+                conn._conn.rollback()
+        finally:
+            conn._conn.close()
+    dirty_plans = g.pop('plan_rows_dirty', None)
+    if dirty_plans:
+        _forget_plan_rows(dirty_plans)
+    return response
+
+
+def _release_request_connection(exception=None):
+    """Kérés lebontásakor: a megmaradt (hibás) tranzakció visszagörgetése"""
+    conn = g.pop('db_conn', None)
+    if conn is not None:
+        # A pool visszaadáskor rollback-et végez
+        conn._conn.close()
+
+
+def init_app(app):
+    """Kérés szintű adatbázis kapcsolat kezelés regisztrálása"""
+    app.after_request(_commit_request_connection)
+    app.teardown_request(_release_request_connection)
+
+
+def get_pool_stats():
+    """Kapcsolat pool statisztikák (kölcsönzött kapcsolatok, várakozási idő, churn)"""
+    return _pool.get().stats()
+
+
 def get_cursor(conn):
     """Cursor létrehozása az adatbázis típusnak megfelelően"""
     if USE_POSTGRES:
@@ -57,11 +210,22 @@ def placeholders(count):
     p = placeholder()
     return ', '.join([p] * count)
 
-def init_db():
-    """Adatbázis táblák létrehozása"""
-    conn = get_db_connection()
-    cursor = get_cursor(conn)
-    
+
+# ==========================================
+# Séma migrációk
+# ==========================================
+
+def _sqlite_add_column(cursor, table, column_def):
+    """Oszlop hozzáadása SQLite táblához, ha még nem létezik"""
+    try:
+        cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column_def}')
+    except sqlite3.OperationalError:
+        # Az oszlop már létezik (régi, migrációk előtti adatbázis)
+        pass
+
+
+def _migration_base_schema(cursor):
+    """1. verzió: alap táblák (a migrációk előtti init_db() sémája)"""
     if USE_POSTGRES:
         # PostgreSQL szintaxis
         cursor.execute('''
@@ -77,12 +241,9 @@ def init_db():
         ''')
         
         # start_date mező hozzáadása ha nem létezik (PostgreSQL-ben külön kell kezelni)
-        try:
-            cursor.execute('''
-                ALTER TABLE reading_plans ADD COLUMN IF NOT EXISTS start_date DATE DEFAULT CURRENT_DATE
-            ''')
-        except Exception:
-            conn.rollback()
+        cursor.execute('''
+            ALTER TABLE reading_plans ADD COLUMN IF NOT EXISTS start_date DATE DEFAULT CURRENT_DATE
+        ''')
         
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS users (
@@ -166,14 +327,8 @@ def init_db():
         ''')
         
         # is_private mező hozzáadása a comments és highlights táblákhoz (ha nem létezik)
-        try:
-            cursor.execute('ALTER TABLE comments ADD COLUMN IF NOT EXISTS is_private BOOLEAN DEFAULT FALSE')
-        except Exception:
-            conn.rollback()
-        try:
-            cursor.execute('ALTER TABLE highlights ADD COLUMN IF NOT EXISTS is_private BOOLEAN DEFAULT FALSE')
-        except Exception:
-            conn.rollback()
+        cursor.execute('ALTER TABLE comments ADD COLUMN IF NOT EXISTS is_private BOOLEAN DEFAULT FALSE')
+        cursor.execute('ALTER TABLE highlights ADD COLUMN IF NOT EXISTS is_private BOOLEAN DEFAULT FALSE')
     else:
         # SQLite szintaxis
         cursor.execute('''
@@ -189,10 +344,7 @@ def init_db():
         ''')
         
         # start_date mező hozzáadása ha nem létezik
-        try:
-            cursor.execute('ALTER TABLE reading_plans ADD COLUMN start_date TEXT')
-        except:
-            pass
+        _sqlite_add_column(cursor, 'reading_plans', 'start_date TEXT')
         
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS users (
@@ -276,17 +428,174 @@ def init_db():
         ''')
         
         # is_private mező hozzáadása a comments és highlights táblákhoz (ha nem létezik)
-        try:
-            cursor.execute('ALTER TABLE comments ADD COLUMN is_private INTEGER DEFAULT 0')
-        except:
-            pass
-        try:
-            cursor.execute('ALTER TABLE highlights ADD COLUMN is_private INTEGER DEFAULT 0')
-        except:
-            pass
+        _sqlite_add_column(cursor, 'comments', 'is_private INTEGER DEFAULT 0')
+        _sqlite_add_column(cursor, 'highlights', 'is_private INTEGER DEFAULT 0')
+
+
+def _migration_day_indexes(cursor):
+    """2. verzió: összetett indexek a napi (dátum szerinti) lekérdezésekhez"""
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_comments_plan_date ON comments (plan_id, date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_highlights_plan_date ON highlights (plan_id, date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_reactions_target ON reactions (target_type, target_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_comment_replies_parent ON comment_replies (parent_comment_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_reading_log_plan_date ON reading_log (plan_id, date)')
+
+
+def _migration_plan_password_lookup(cursor):
+    """3. verzió: indexelt jelszó keresőkulcs a tervekhez (bejelentkezés O(1) kereséssel)"""
+    if USE_POSTGRES:
+        cursor.execute('ALTER TABLE reading_plans ADD COLUMN IF NOT EXISTS password_lookup TEXT')
+    else:
+        _sqlite_add_column(cursor, 'reading_plans', 'password_lookup TEXT')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_reading_plans_password_lookup ON reading_plans (password_lookup)')
+
+
+def _migration_counters(cursor):
+    """4. verzió: denormalizált reakció- és válaszszámlálók a kommenteken és kiemeléseken"""
+    for table in ('comments', 'highlights'):
+        for column in ('reaction_count', 'reply_count'):
+            if USE_POSTGRES:
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} INTEGER NOT NULL DEFAULT 0')
+            else:
+                _sqlite_add_column(cursor, table, f'{column} INTEGER NOT NULL DEFAULT 0')
+    _recount_counters(cursor)
+
+
+def _migration_reading_progress(cursor):
+    """5. verzió: tömör olvasási bittérkép felhasználónként és tervenként (a reading_log mellett)"""
+    blob_type = 'BYTEA' if USE_POSTGRES else 'BLOB'
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS reading_progress (
+            user_id INTEGER NOT NULL,
+            plan_id INTEGER NOT NULL,
+            base_date TEXT,
+            read_bitmap {blob_type},
+            PRIMARY KEY (user_id, plan_id)
+        )
+    ''')
+    # A feltöltést a 7. verzió végzi (az akkor bővített táblára)
+
+
+def _migration_user_notes_indexes(cursor):
+    """6. verzió: indexek a felhasználói jegyzetek kurzor alapú lapozásához"""
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_comments_user_created ON comments (user_id, plan_id, created_at, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_highlights_user_created ON highlights (user_id, plan_id, created_at, id)')
+
+
+def _migration_plan_leaderboard(cursor):
+    """
+    7. verzió: materializált rangsor adatok a reading_progress táblában
+    (olvasott napok száma, utolsó olvasott nap). Az aktuális sorozat napról napra
+    változik, azt olvasáskor számoljuk a bittérképből.
+    """
+    if USE_POSTGRES:
+        cursor.execute('ALTER TABLE reading_progress ADD COLUMN IF NOT EXISTS days_read INTEGER NOT NULL DEFAULT 0')
+        cursor.execute('ALTER TABLE reading_progress ADD COLUMN IF NOT EXISTS last_read_at TEXT')
+    else:
+        _sqlite_add_column(cursor, 'reading_progress', 'days_read INTEGER NOT NULL DEFAULT 0')
+        _sqlite_add_column(cursor, 'reading_progress', 'last_read_at TEXT')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_reading_progress_plan_days ON reading_progress (plan_id, days_read)')
+    _rebuild_reading_progress(cursor)
+
+
+def _migration_plan_lookup_key_id(cursor):
+    """8. verzió: a keresőkulcsot képző titok azonosítója (titok csere után a régi kulcsok felismerhetők)"""
+    if USE_POSTGRES:
+        cursor.execute('ALTER TABLE reading_plans ADD COLUMN IF NOT EXISTS password_lookup_key_id TEXT')
+    else:
+        _sqlite_add_column(cursor, 'reading_plans', 'password_lookup_key_id TEXT')
+
+
+# Verziózott migrációk: (verzió, leírás, függvény) - csak a végére szabad újat felvenni!
+MIGRATIONS = [
+    (1, 'Alap séma', _migration_base_schema),
+    (2, 'Indexek a napi lekérdezésekhez', _migration_day_indexes),
+    (3, 'Terv jelszó keresőkulcs', _migration_plan_password_lookup),
+    (4, 'Reakció- és válaszszámlálók', _migration_counters),
+    (5, 'Olvasási bittérkép', _migration_reading_progress),
+    (6, 'Jegyzet lapozási indexek', _migration_user_notes_indexes),
+    (7, 'Materializált olvasási rangsor', _migration_plan_leaderboard),
+    (8, 'Terv keresőkulcs titok azonosító', _migration_plan_lookup_key_id),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# PostgreSQL advisory lock azonosító a migrációkhoz
+SCHEMA_MIGRATION_LOCK_ID = 72015
+
+
+def get_schema_version(conn):
+    """Az adatbázis aktuális séma verziója (0, ha még nincs schema_version tábla)"""
+    cursor = get_cursor(conn)
+    try:
+        cursor.execute('SELECT MAX(version) AS version FROM schema_version')
+        row = cursor.fetchone()
+        return (row['version'] or 0) if row else 0
+    except Exception:
+        conn.rollback()
+        return 0
+
+
+def _begin_migration(conn, cursor):
+    """Migrációs tranzakció indítása - több worker egyidejű indulásakor is csak egy fut"""
+    if USE_POSTGRES:
+        cursor.execute('SELECT pg_advisory_xact_lock(%s)', (SCHEMA_MIGRATION_LOCK_ID,))
+    else:
+        conn.begin_write()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def migrate_db():
+    """
+    Függőben lévő séma migrációk futtatása.
     
-    conn.commit()
-    conn.close()
+    Ha a séma naprakész, egyetlen SELECT fut (nincs DDL induláskor).
+    Minden migráció saját tranzakcióban fut és a schema_version táblába kerül.
+    
+    Returns:
+        list: a most lefuttatott migrációk verziószámai
+    """
+    conn = get_db_connection()
+    applied = []
+    try:
+        if get_schema_version(conn) >= SCHEMA_VERSION:
+            return applied
+        
+        cursor = get_cursor(conn)
+        p = placeholder()
+        for version, description, migration in MIGRATIONS:
+            _begin_migration(conn, cursor)
+            # A lock megszerzése után újra ellenőrizzük (másik worker már lefuttathatta)
+            cursor.execute(f'SELECT version FROM schema_version WHERE version = {p}', (version,))
+            if cursor.fetchone() is not None:
+                conn.commit()
+                continue
+            try:
+                migration(cursor)
+                cursor.execute(
+                    f'INSERT INTO schema_version (version, description) VALUES ({p}, {p})',
+                    (version, description)
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            applied.append(version)
+            print(f"[DB] Migráció lefutott: {version} - {description}")
+    finally:
+        conn.close()
+    return applied
+
+
+def init_db():
+    """Adatbázis séma naprakészre hozása és alapértelmezett terv létrehozása"""
+    migrate_db()
     
     # Alapértelmezett terv létrehozása ha nem létezik
     create_default_plan_if_not_exists()
@@ -296,6 +605,40 @@ def init_db():
 # Olvasási terv műveletek
 # ==========================================
 
+def plan_lookup_key(password):
+    """
+    Indexelhető, nem visszafejthető keresőkulcs a terv jelszavából (HMAC-SHA256).
+    
+    A bejelentkezés ezzel egyetlen indexelt lekérdezéssel találja meg a tervet,
+    és csak utána fut egyetlen (szándékosan lassú) jelszó hash ellenőrzés.
+    """
+    return hmac.new(
+        Config.PLAN_LOOKUP_SECRET.encode('utf-8'),
+        password.encode('utf-8'),
+        hashlib.sha256
+    ).hexdigest()
+
+
+def plan_lookup_key_id():
+    """A jelenlegi PLAN_LOOKUP_SECRET rövid azonosítója (a titok maga nem fejthető vissza belőle)"""
+    return hmac.new(
+        Config.PLAN_LOOKUP_SECRET.encode('utf-8'),
+        b'plan-lookup-key-id',
+        hashlib.sha256
+    ).hexdigest()[:16]
+
+
+def _store_plan_lookup(cursor, plan_id, password):
+    """A terv keresőkulcsának (újra)írása a jelenlegi titokkal"""
+    p = placeholder()
+    lookup = plan_lookup_key(password)
+    cursor.execute(
+        f'UPDATE reading_plans SET password_lookup = {p}, password_lookup_key_id = {p} WHERE id = {p}',
+        (lookup, plan_lookup_key_id(), plan_id)
+    )
+    return lookup
+
+
 def create_default_plan_if_not_exists():
     """Alapértelmezett olvasási terv létrehozása"""
     conn = get_db_connection()
@@ -303,42 +646,165 @@ def create_default_plan_if_not_exists():
     
     cursor.execute('SELECT id FROM reading_plans LIMIT 1')
     if cursor.fetchone() is None:
+        conn.begin_write()
         # Létrehozzuk az alapértelmezett tervet a régi jelszóval
         password_hash = generate_password_hash(Config.SITE_PASSWORD)
         p = placeholder()
         cursor.execute(f'''
-            INSERT INTO reading_plans (name, password_hash, plan_file, description)
-            VALUES ({p}, {p}, {p}, {p})
-        ''', ('Bibliaolvasási Terv 2025', password_hash, 'reading_plan.json', 'Alapértelmezett éves bibliaolvasási terv'))
+            INSERT INTO reading_plans (name, password_hash, password_lookup, password_lookup_key_id, plan_file, description)
+            VALUES ({p}, {p}, {p}, {p}, {p}, {p})
+        ''', ('Bibliaolvasási Terv 2025', password_hash, plan_lookup_key(Config.SITE_PASSWORD),
+              plan_lookup_key_id(), 'reading_plan.json', 'Alapértelmezett éves bibliaolvasási terv'))
         conn.commit()
     
     conn.close()
 
 
 def get_plan_by_password(password):
-    """Olvasási terv lekérése jelszó alapján"""
+    """
+    Olvasási terv lekérése jelszó alapján.
+    
+    A keresőkulcs alapján indexelt lekérdezéssel keressük a tervet. Ha nincs
+    találat, csak a más titokkal képzett (PLAN_LOOKUP_SECRET csere) vagy kulcs
+    nélküli (régi) terveket ellenőrizzük végig, és egyezéskor újraírjuk a
+    kulcsukat - így ez az ág kiürül (azonnal: flask backfill-plan-lookup).
+    """
+    lookup = plan_lookup_key(password)
+    key_id = plan_lookup_key_id()
     conn = get_db_connection()
     cursor = get_cursor(conn)
-    cursor.execute('SELECT * FROM reading_plans')
-    plans = cursor.fetchall()
+    p = placeholder()
+    
+    try:
+        cursor.execute(f'SELECT * FROM reading_plans WHERE password_lookup = {p} ORDER BY id', (lookup,))
+        for plan in cursor.fetchall():
+            plan_dict = row_to_dict(plan)
+            if check_password_hash(plan_dict['password_hash'], password):
+                if plan_dict.get('password_lookup_key_id') != key_id:
+                    conn.begin_write()
+                    _store_plan_lookup(cursor, plan_dict['id'], password)
+                    conn.commit()
+                return plan_dict
+        
+        # Elavult kulcsú tervek (a kulcs-azonosító nem a jelenlegi titoké)
+        cursor.execute(f'''
+            SELECT * FROM reading_plans
+            WHERE password_lookup_key_id IS NULL OR password_lookup_key_id <> {p}
+            ORDER BY id
+        ''', (key_id,))
+        for plan in cursor.fetchall():
+            plan_dict = row_to_dict(plan)
+            if check_password_hash(plan_dict['password_hash'], password):
+                conn.begin_write()
+                plan_dict['password_lookup'] = _store_plan_lookup(cursor, plan_dict['id'], password)
+                plan_dict['password_lookup_key_id'] = key_id
+                conn.commit()
+                return plan_dict
+        return None
+    finally:
+        conn.close()
+
+
+def get_stale_lookup_plans():
+    """Tervek, amelyek keresőkulcsa hiányzik vagy nem a jelenlegi titokkal készült"""
+    conn = get_db_connection()
+    cursor = get_cursor(conn)
+    p = placeholder()
+    cursor.execute(f'''
+        SELECT id, name, password_hash FROM reading_plans
+        WHERE password_lookup_key_id IS NULL OR password_lookup_key_id <> {p}
+        ORDER BY id
+    ''', (plan_lookup_key_id(),))
+    plans = [row_to_dict(row) for row in cursor.fetchall()]
     conn.close()
+    return plans
+
+
+def backfill_plan_lookup(plan_id, password):
+    """
+    Egy terv keresőkulcsának kitöltése a jelszó ellenőrzése után.
     
-    for plan in plans:
-        plan_dict = row_to_dict(plan) if not USE_POSTGRES else dict(plan)
-        if check_password_hash(plan_dict['password_hash'], password):
-            return plan_dict
+    Returns:
+        bool: a jelszó egyezett és a kulcs újraíródott
+    """
+    conn = get_db_connection(write=True)
+    cursor = get_cursor(conn)
+    p = placeholder()
+    try:
+        cursor.execute(f'SELECT password_hash FROM reading_plans WHERE id = {p}', (plan_id,))
+        row = cursor.fetchone()
+        if row is None or not check_password_hash(row['password_hash'], password):
+            conn.rollback()
+            return False
+        _store_plan_lookup(cursor, plan_id, password)
+        conn.commit()
+        return True
+    finally:
+        conn.close()
+
+
+# Terv sorok gyorsítótára: kérésen belül (g.plan_rows) és workerenként rövid TTL-lel.
+# A terv adatai ritkán változnak, de egy oldal több helyről is lekéri őket.
+_plan_rows = {}
+_plan_rows_lock = threading.Lock()
+
+
+def _cached_plan_row(plan_id):
+    if has_request_context():
+        rows = g.get('plan_rows')
+        if rows is not None and plan_id in rows:
+            return rows[plan_id]
+    entry = _plan_rows.get(plan_id)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
     return None
 
 
+def _remember_plan_row(plan_id, plan):
+    if has_request_context():
+        if 'plan_rows' not in g:
+            g.plan_rows = {}
+        g.plan_rows[plan_id] = plan
+        # A kérés saját (még nem commit-olt) módosítása után nem töltjük a közös gyorsítótárat
+        if g.get('plan_rows_dirty'):
+            return
+    if plan is not None and Config.PLAN_CACHE_TTL > 0:
+        with _plan_rows_lock:
+            _plan_rows[plan_id] = (time.monotonic() + Config.PLAN_CACHE_TTL, plan)
+
+
+def _forget_plan_rows(plan_ids):
+    with _plan_rows_lock:
+        for plan_id in plan_ids:
+            if plan_id is None:
+                _plan_rows.clear()
+            else:
+                _plan_rows.pop(plan_id, None)
+
+
+def invalidate_plan_cache(plan_id=None):
+    """Terv sor(ok) eldobása a gyorsítótárból - minden reading_plans módosítás után"""
+    _forget_plan_rows([plan_id])
+    if has_request_context():
+        g.pop('plan_rows', None)
+        # A kérés végi commit után még egyszer eldobjuk (közben más kérés betölthette a régi sort)
+        g.setdefault('plan_rows_dirty', set()).add(plan_id)
+
+
 def get_plan_by_id(plan_id):
-    """Olvasási terv lekérése ID alapján"""
+    """Olvasási terv lekérése ID alapján (gyorsítótárazva, lásd invalidate_plan_cache)"""
+    plan = _cached_plan_row(plan_id)
+    if plan is not None:
+        return dict(plan)
+    
     conn = get_db_connection()
     cursor = get_cursor(conn)
     p = placeholder()
     cursor.execute(f'SELECT * FROM reading_plans WHERE id = {p}', (plan_id,))
-    plan = cursor.fetchone()
+    plan = row_to_dict(cursor.fetchone())
     conn.close()
-    return row_to_dict(plan)
+    _remember_plan_row(plan_id, plan)
+    return dict(plan) if plan is not None else None
 
 
 def get_all_plans():
@@ -353,7 +819,7 @@ def get_all_plans():
 
 def create_plan(name, password, plan_file, description='', start_date=None):
     """Új olvasási terv létrehozása"""
-    conn = get_db_connection()
+    conn = get_db_connection(write=True)
     cursor = get_cursor(conn)
     password_hash = generate_password_hash(password)
     p = placeholder()
@@ -362,17 +828,19 @@ def create_plan(name, password, plan_file, description='', start_date=None):
     if start_date is None:
         start_date = datetime.now().strftime('%Y-%m-%d')
     
+    lookup = plan_lookup_key(password)
+    key_id = plan_lookup_key_id()
     if USE_POSTGRES:
         cursor.execute(f'''
-            INSERT INTO reading_plans (name, password_hash, plan_file, description, start_date)
-            VALUES ({p}, {p}, {p}, {p}, {p}) RETURNING id
-        ''', (name, password_hash, plan_file, description, start_date))
+            INSERT INTO reading_plans (name, password_hash, password_lookup, password_lookup_key_id, plan_file, description, start_date)
+            VALUES ({p}, {p}, {p}, {p}, {p}, {p}, {p}) RETURNING id
+        ''', (name, password_hash, lookup, key_id, plan_file, description, start_date))
         plan_id = cursor.fetchone()['id']
     else:
         cursor.execute(f'''
-            INSERT INTO reading_plans (name, password_hash, plan_file, description, start_date)
-            VALUES ({p}, {p}, {p}, {p}, {p})
-        ''', (name, password_hash, plan_file, description, start_date))
+            INSERT INTO reading_plans (name, password_hash, password_lookup, password_lookup_key_id, plan_file, description, start_date)
+            VALUES ({p}, {p}, {p}, {p}, {p}, {p}, {p})
+        ''', (name, password_hash, lookup, key_id, plan_file, description, start_date))
         plan_id = cursor.lastrowid
     
     conn.commit()
@@ -382,28 +850,33 @@ def create_plan(name, password, plan_file, description='', start_date=None):
 
 def update_plan_start_date(plan_id, start_date):
     """Olvasási terv kezdő dátumának módosítása"""
-    conn = get_db_connection()
+    conn = get_db_connection(write=True)
     cursor = get_cursor(conn)
     p = placeholder()
     cursor.execute(f'UPDATE reading_plans SET start_date = {p} WHERE id = {p}', (start_date, plan_id))
     conn.commit()
     conn.close()
+    invalidate_plan_cache(plan_id)
 
 
 def update_plan_password(plan_id, new_password):
     """Olvasási terv jelszavának módosítása"""
-    conn = get_db_connection()
+    conn = get_db_connection(write=True)
     cursor = get_cursor(conn)
-    password_hash = generate_password_hash(new_password)
     p = placeholder()
-    cursor.execute(f'UPDATE reading_plans SET password_hash = {p} WHERE id = {p}', (password_hash, plan_id))
+    cursor.execute(
+        f'UPDATE reading_plans SET password_hash = {p} WHERE id = {p}',
+        (generate_password_hash(new_password), plan_id)
+    )
+    _store_plan_lookup(cursor, plan_id, new_password)
     conn.commit()
     conn.close()
+    invalidate_plan_cache(plan_id)
 
 
 def update_plan(plan_id, name=None, description=None):
     """Olvasási terv adatainak módosítása"""
-    conn = get_db_connection()
+    conn = get_db_connection(write=True)
     cursor = get_cursor(conn)
     p = placeholder()
     
@@ -414,21 +887,24 @@ def update_plan(plan_id, name=None, description=None):
     
     conn.commit()
     conn.close()
+    invalidate_plan_cache(plan_id)
 
 
 def delete_plan(plan_id):
     """Olvasási terv törlése (és minden kapcsolódó adat)"""
-    conn = get_db_connection()
+    conn = get_db_connection(write=True)
     cursor = get_cursor(conn)
     p = placeholder()
     # Töröljük a kapcsolódó adatokat
     cursor.execute(f'DELETE FROM reading_log WHERE plan_id = {p}', (plan_id,))
+    cursor.execute(f'DELETE FROM reading_progress WHERE plan_id = {p}', (plan_id,))
     cursor.execute(f'DELETE FROM highlights WHERE plan_id = {p}', (plan_id,))
     cursor.execute(f'DELETE FROM comments WHERE plan_id = {p}', (plan_id,))
     cursor.execute(f'DELETE FROM users WHERE plan_id = {p}', (plan_id,))
     cursor.execute(f'DELETE FROM reading_plans WHERE id = {p}', (plan_id,))
     conn.commit()
     conn.close()
+    invalidate_plan_cache(plan_id)
 
 
 # ==========================================
@@ -447,6 +923,7 @@ def get_or_create_user(name, plan_id):
     
     if user is None:
         # Ha nem létezik, hozzuk létre
+        conn.begin_write()
         cursor.execute(f'INSERT INTO users (name, plan_id) VALUES ({p}, {p})', (name, plan_id))
         conn.commit()
         cursor.execute(f'SELECT * FROM users WHERE name = {p} AND plan_id = {p}', (name, plan_id))
@@ -472,18 +949,20 @@ def get_all_users(plan_id=None):
 
 def delete_user(user_id, plan_id):
     """Felhasználó és minden kapcsolódó adatának törlése egy tervből"""
-    conn = get_db_connection()
+    conn = get_db_connection(write=True)
     cursor = get_cursor(conn)
     p = placeholder()
     
     # Ellenőrizzük, hogy a felhasználó ehhez a tervhez tartozik-e
     cursor.execute(f'SELECT id FROM users WHERE id = {p} AND plan_id = {p}', (user_id, plan_id))
     if cursor.fetchone() is None:
+        conn.rollback()
         conn.close()
         return False
     
     # Töröljük a felhasználó adatait
     cursor.execute(f'DELETE FROM reading_log WHERE user_id = {p} AND plan_id = {p}', (user_id, plan_id))
+    cursor.execute(f'DELETE FROM reading_progress WHERE user_id = {p} AND plan_id = {p}', (user_id, plan_id))
     cursor.execute(f'DELETE FROM highlights WHERE user_id = {p} AND plan_id = {p}', (user_id, plan_id))
     cursor.execute(f'DELETE FROM comments WHERE user_id = {p} AND plan_id = {p}', (user_id, plan_id))
     cursor.execute(f'DELETE FROM users WHERE id = {p} AND plan_id = {p}', (user_id, plan_id))
@@ -521,7 +1000,7 @@ def get_user_stats(user_id, plan_id):
 
 def add_comment(user_id, plan_id, date, content, verse_ref=None, comment_type='comment'):
     """Új komment hozzáadása"""
-    conn = get_db_connection()
+    conn = get_db_connection(write=True)
     cursor = get_cursor(conn)
     p = placeholder()
     
@@ -563,17 +1042,44 @@ def get_comments_for_date(date, plan_id, current_user_id=None):
     comments = [dict(row) for row in cursor.fetchall()]
     conn.close()
     
-    # Reakciók és válaszok hozzáadása minden kommenthez
+    # Reakciók és válaszok hozzáadása minden kommenthez (batch-ben, N+1 lekérdezés nélkül)
+    comment_ids = [c['id'] for c in comments]
+    reactions_map = get_reactions_for_targets('comment', comment_ids)
+    replies_map = get_replies_for_comments(comment_ids)
     for comment in comments:
-        comment['reactions'] = get_reactions_for_target('comment', comment['id'])
+        comment['reactions'] = reactions_map.get(comment['id'], [])
         comment['reaction_count'] = len(comment['reactions'])
-        comment['replies'] = get_replies_for_comment(comment['id'])
+        comment['replies'] = replies_map.get(comment['id'], [])
     
     return comments
 
+def load_day_bundle(date, plan_id, user_id):
+    """
+    Egy nap összes közösségi adatának betöltése fix számú lekérdezéssel.
+    
+    Kommentek, kiemelések, válaszok, reakció listák és számok, valamint
+    elemenként a user_reacted jelző - a kommentek számától függetlenül
+    legfeljebb 5 lekérdezés (a kérés szintű közös kapcsolaton).
+    
+    Returns:
+        dict: {'comments': [...], 'highlights': [...]}
+    """
+    comments = get_comments_for_date(date, plan_id, user_id)
+    highlights = get_highlights_for_date(date, plan_id, user_id)
+    
+    # A user_reacted jelzőt a már betöltött reakció listákból számoljuk
+    for item in comments + highlights:
+        item['user_reacted'] = any(r['user_id'] == user_id for r in item['reactions'])
+    
+    return {
+        'comments': comments,
+        'highlights': highlights
+    }
+
+
 def delete_comment(comment_id, user_id):
     """Komment törlése (csak a saját kommentet)"""
-    conn = get_db_connection()
+    conn = get_db_connection(write=True)
     cursor = get_cursor(conn)
     p = placeholder()
     cursor.execute(f'DELETE FROM comments WHERE id = {p} AND user_id = {p}', (comment_id, user_id))
@@ -585,7 +1091,7 @@ def delete_comment(comment_id, user_id):
 
 def update_comment(comment_id, user_id, content):
     """Komment szerkesztése (csak a saját kommentet)"""
-    conn = get_db_connection()
+    conn = get_db_connection(write=True)
     cursor = get_cursor(conn)
     p = placeholder()
     cursor.execute(f'UPDATE comments SET content = {p} WHERE id = {p} AND user_id = {p}', (content, comment_id, user_id))
@@ -601,7 +1107,7 @@ def update_comment(comment_id, user_id, content):
 
 def add_highlight(user_id, plan_id, date, verse_ref, text, color='yellow'):
     """Új kiemelés hozzáadása"""
-    conn = get_db_connection()
+    conn = get_db_connection(write=True)
     cursor = get_cursor(conn)
     p = placeholder()
     
@@ -641,43 +1147,19 @@ def get_highlights_for_date(date, plan_id, current_user_id=None):
         ORDER BY h.created_at DESC
     ''', (date, plan_id, current_user_id or 0))
     highlights = [dict(row) for row in cursor.fetchall()]
+    conn.close()
     
     # Reakciók hozzáadása minden kiemeléshez (N+1 lekérdezés elkerülése érdekében batch-ben töltjük)
-    highlight_ids = [h['id'] for h in highlights]
-    reactions_by_highlight = {hid: [] for hid in highlight_ids}
-
-    if highlight_ids:
-        # Dinamikus IN lista a highlight azonosítókhoz
-        in_placeholders = ', '.join([p] * len(highlight_ids))
-        cursor.execute(
-            f'''
-            SELECT *
-            FROM reactions
-            WHERE target_type = {p}
-              AND target_id IN ({in_placeholders})
-            ''',
-            tuple(['highlight'] + highlight_ids),
-        )
-
-        for row in cursor.fetchall():
-            row_dict = dict(row)
-            target_id = row_dict.get('target_id')
-            if target_id in reactions_by_highlight:
-                reactions_by_highlight[target_id].append(row_dict)
-
-    # Reakciók és reakciószám beállítása a kiemelésekhez
+    reactions_map = get_reactions_for_targets('highlight', [h['id'] for h in highlights])
     for highlight in highlights:
-        hid = highlight['id']
-        highlight_reactions = reactions_by_highlight.get(hid, [])
-        highlight['reactions'] = highlight_reactions
-        highlight['reaction_count'] = len(highlight_reactions)
+        highlight['reactions'] = reactions_map.get(highlight['id'], [])
+        highlight['reaction_count'] = len(highlight['reactions'])
     
-    conn.close()
     return highlights
 
 def delete_highlight(highlight_id, user_id):
     """Kiemelés törlése"""
-    conn = get_db_connection()
+    conn = get_db_connection(write=True)
     cursor = get_cursor(conn)
     p = placeholder()
     cursor.execute(f'DELETE FROM highlights WHERE id = {p} AND user_id = {p}', (highlight_id, user_id))
@@ -691,34 +1173,85 @@ def delete_highlight(highlight_id, user_id):
 # Olvasási napló műveletek
 # ==========================================
 
+def _load_reading_bitmap(cursor, user_id, plan_id, for_update=False):
+    """Bittérkép betöltése (írás előtt PostgreSQL-en sorzárral); hiányzó sor esetén None"""
+    p = placeholder()
+    lock = ' FOR UPDATE' if for_update and USE_POSTGRES else ''
+    cursor.execute(f'''
+        SELECT base_date, read_bitmap FROM reading_progress
+        WHERE user_id = {p} AND plan_id = {p}{lock}
+    ''', (user_id, plan_id))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return ReadingBitmap(row['base_date'], row['read_bitmap'])
+
+
+def _save_reading_bitmap(cursor, user_id, plan_id, bitmap):
+    """Bittérkép és a belőle származó rangsor adatok (olvasott napok száma, utolsó olvasott nap) mentése (upsert)"""
+    p = placeholder()
+    base_date = bitmap.base_date.strftime('%Y-%m-%d') if bitmap.base_date else None
+    last_date = bitmap.last_date()
+    cursor.execute(f'''
+        INSERT INTO reading_progress (user_id, plan_id, base_date, read_bitmap, days_read, last_read_at)
+        VALUES ({p}, {p}, {p}, {p}, {p}, {p})
+        ON CONFLICT (user_id, plan_id) DO UPDATE
+        SET base_date = excluded.base_date,
+            read_bitmap = excluded.read_bitmap,
+            days_read = excluded.days_read,
+            last_read_at = excluded.last_read_at
+    ''', (user_id, plan_id, base_date, bitmap.to_bytes(), bitmap.count(),
+          last_date.isoformat() if last_date else None))
+
+
+def _update_reading_bitmap(cursor, user_id, plan_id, date, is_read):
+    """Bittérkép frissítése a reading_log módosításával azonos tranzakcióban"""
+    bitmap = _load_reading_bitmap(cursor, user_id, plan_id, for_update=True)
+    if bitmap is None:
+        # Nincs még sor: a naplóból építjük fel (az aktuális módosítással együtt)
+        p = placeholder()
+        cursor.execute(f'SELECT date FROM reading_log WHERE user_id = {p} AND plan_id = {p}', (user_id, plan_id))
+        bitmap = ReadingBitmap.from_dates(row['date'] for row in cursor.fetchall())
+    elif is_read:
+        bitmap.add(date)
+    else:
+        bitmap.discard(date)
+    _save_reading_bitmap(cursor, user_id, plan_id, bitmap)
+
+
 def mark_day_as_read(user_id, plan_id, date):
-    """Nap megjelölése olvasottként"""
-    conn = get_db_connection()
+    """Nap megjelölése olvasottként (a napló és a bittérkép együtt, vagy egyik sem)"""
+    conn = get_db_connection(write=True)
     cursor = get_cursor(conn)
     p = placeholder()
     try:
-        if USE_POSTGRES:
-            cursor.execute(f'''
-                INSERT INTO reading_log (user_id, plan_id, date)
-                VALUES ({p}, {p}, {p})
-                ON CONFLICT (user_id, plan_id, date) DO NOTHING
-            ''', (user_id, plan_id, date))
-        else:
-            cursor.execute(f'''
-                INSERT OR REPLACE INTO reading_log (user_id, plan_id, date)
-                VALUES ({p}, {p}, {p})
-            ''', (user_id, plan_id, date))
+        with savepoint(cursor):
+            if USE_POSTGRES:
+                cursor.execute(f'''
+                    INSERT INTO reading_log (user_id, plan_id, date)
+                    VALUES ({p}, {p}, {p})
+                    ON CONFLICT (user_id, plan_id, date) DO NOTHING
+                ''', (user_id, plan_id, date))
+            else:
+                cursor.execute(f'''
+                    INSERT OR REPLACE INTO reading_log (user_id, plan_id, date)
+                    VALUES ({p}, {p}, {p})
+                ''', (user_id, plan_id, date))
+            _update_reading_bitmap(cursor, user_id, plan_id, date, True)
         conn.commit()
-    except:
-        pass
-    conn.close()
+    except IntegrityError:
+        # Pl. közben törölt felhasználó/terv: mindkét írás visszagörgetve, a többi hibát továbbdobjuk
+        conn.rollback()
+    finally:
+        conn.close()
 
 def unmark_day_as_read(user_id, plan_id, date):
     """Olvasott megjelölés visszavonása"""
-    conn = get_db_connection()
+    conn = get_db_connection(write=True)
     cursor = get_cursor(conn)
     p = placeholder()
     cursor.execute(f'DELETE FROM reading_log WHERE user_id = {p} AND plan_id = {p} AND date = {p}', (user_id, plan_id, date))
+    _update_reading_bitmap(cursor, user_id, plan_id, date, False)
     conn.commit()
     conn.close()
 
@@ -732,21 +1265,70 @@ def get_reading_log(user_id, plan_id):
     conn.close()
     return dates
 
+def get_reading_progress(user_id, plan_id):
+    """
+    Felhasználó olvasási bittérképe egy adott tervben (egyetlen elsődleges kulcsos lekérdezés).
+    
+    Returns:
+        ReadingBitmap: O(1) tagság (date in progress), count(), count_range(start, end)
+    """
+    conn = get_db_connection()
+    cursor = get_cursor(conn)
+    bitmap = _load_reading_bitmap(cursor, user_id, plan_id)
+    conn.close()
+    return bitmap if bitmap is not None else ReadingBitmap()
+
+def _rebuild_reading_progress(cursor, plan_id=None):
+    """Bittérképek és rangsor adatok újraépítése a reading_log táblából (opcionálisan egy tervre)"""
+    p = placeholder()
+    if plan_id is None:
+        cursor.execute('DELETE FROM reading_progress')
+        cursor.execute('SELECT user_id, plan_id, date FROM reading_log ORDER BY user_id, plan_id')
+    else:
+        cursor.execute(f'DELETE FROM reading_progress WHERE plan_id = {p}', (plan_id,))
+        cursor.execute(f'SELECT user_id, plan_id, date FROM reading_log WHERE plan_id = {p} ORDER BY user_id', (plan_id,))
+    bitmaps = {}
+    for row in cursor.fetchall():
+        key = (row['user_id'], row['plan_id'])
+        bitmaps.setdefault(key, ReadingBitmap()).add(row['date'])
+    for (user_id, row_plan_id), bitmap in bitmaps.items():
+        _save_reading_bitmap(cursor, user_id, row_plan_id, bitmap)
+
+def rebuild_reading_progress(plan_id=None):
+    """Olvasási bittérképek és rangsor újraépítése (karbantartó parancs: flask rebuild-progress)"""
+    conn = get_db_connection(write=True)
+    cursor = get_cursor(conn)
+    _rebuild_reading_progress(cursor, plan_id)
+    conn.commit()
+    conn.close()
+
 def get_all_reading_stats(plan_id):
-    """Összes felhasználó olvasási statisztikája egy adott tervben"""
+    """
+    Összes felhasználó olvasási statisztikája egy adott tervben: olvasott napok,
+    utolsó olvasott nap és a mai (vagy tegnapi) nappal végződő sorozat.
+    A materializált reading_progress táblából olvas (aggregálás nélkül).
+    """
     conn = get_db_connection()
     cursor = get_cursor(conn)
     p = placeholder()
     cursor.execute(f'''
-        SELECT u.name, COUNT(r.id) as days_read
+        SELECT u.name, COALESCE(r.days_read, 0) as days_read, r.last_read_at,
+               r.base_date, r.read_bitmap
         FROM users u
-        LEFT JOIN reading_log r ON u.id = r.user_id AND r.plan_id = {p}
+        LEFT JOIN reading_progress r ON u.id = r.user_id AND r.plan_id = {p}
         WHERE u.plan_id = {p}
-        GROUP BY u.id, u.name
         ORDER BY days_read DESC
     ''', (plan_id, plan_id))
-    stats = [dict(row) for row in cursor.fetchall()]
+    rows = cursor.fetchall()
     conn.close()
+    
+    today = datetime.now().date()
+    stats = []
+    for row in rows:
+        stat = dict(row)
+        bitmap = ReadingBitmap(stat.pop('base_date'), stat.pop('read_bitmap'))
+        stat['current_streak'] = bitmap.streak(today)
+        stats.append(stat)
     return stats
 
 def get_readers_for_date(date, plan_id):
@@ -770,125 +1352,254 @@ def get_readers_for_date(date, plan_id):
 # Felhasználói jegyzetek összesítés
 # ==========================================
 
-def get_user_comments(user_id, plan_id, limit=None):
-    """Felhasználó összes kommentjének lekérése időrendben visszafelé"""
+class InvalidCursor(ValueError):
+    """Érvénytelen lapozási kurzor"""
+
+
+def encode_notes_cursor(note):
+    """
+    Lapozási kurzor készítése a lap utolsó eleméből.
+    A sorrend: created_at, típus, id - mind csökkenő.
+    """
+    created_at = note['created_at']
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat(sep=' ')
+    key = [str(created_at), note.get('type', 'comment'), int(note['id'])]
+    return base64.urlsafe_b64encode(json.dumps(key).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_notes_cursor(cursor_str):
+    """Kurzor visszafejtése (created_at, type, id) hármassá"""
+    if not cursor_str:
+        return None
+    try:
+        padded = cursor_str + '=' * (-len(cursor_str) % 4)
+        created_at, note_type, note_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if note_type not in ('comment', 'highlight'):
+            raise ValueError(note_type)
+        return str(created_at), note_type, int(note_id)
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor_str)
+
+
+def _keyset_condition(alias, note_type, cursor_key):
+    """
+    Keyset feltétel: a kurzor utáni elemek (created_at DESC, type DESC, id DESC sorrendben).
+    A típus ágon belül konstans, így a feltétel indexbarát (created_at, id) összehasonlítás marad.
+    """
+    if cursor_key is None:
+        return '', ()
+    created_at, cursor_type, cursor_id = cursor_key
+    p = placeholder()
+    if note_type == cursor_type:
+        return (f' AND ({alias}.created_at < {p} OR ({alias}.created_at = {p} AND {alias}.id < {p}))',
+                (created_at, created_at, cursor_id))
+    if note_type < cursor_type:
+        # Azonos időpontnál ennek a típusnak az elemei a kurzor után jönnek
+        return f' AND {alias}.created_at <= {p}', (created_at,)
+    return f' AND {alias}.created_at < {p}', (created_at,)
+
+
+def _limit_clause(limit):
+    if limit:
+        return f' LIMIT {placeholder()}', (int(limit),)
+    return '', ()
+
+
+def get_user_comments(user_id, plan_id, limit=None, cursor=None):
+    """
+    Felhasználó kommentjeinek lekérése időrendben visszafelé.
+    limit/cursor megadásával kurzor alapú lapozás (a kurzor a decode_notes_cursor kimenete).
+    """
     conn = get_db_connection()
-    cursor = get_cursor(conn)
+    db_cursor = get_cursor(conn)
     p = placeholder()
+    keyset, keyset_params = _keyset_condition('c', 'comment', cursor)
+    limit_sql, limit_params = _limit_clause(limit)
     query = f'''
         SELECT c.*, u.name as user_name
         FROM comments c
         JOIN users u ON c.user_id = u.id
-        WHERE c.user_id = {p} AND c.plan_id = {p}
-        ORDER BY c.created_at DESC
+        WHERE c.user_id = {p} AND c.plan_id = {p}{keyset}
+        ORDER BY c.created_at DESC, c.id DESC{limit_sql}
     '''
-    if limit:
-        query += f' LIMIT {limit}'
-    cursor.execute(query, (user_id, plan_id))
-    comments = [dict(row) for row in cursor.fetchall()]
+    db_cursor.execute(query, (user_id, plan_id) + keyset_params + limit_params)
+    comments = [dict(row) for row in db_cursor.fetchall()]
     conn.close()
     return comments
 
 
-def get_user_highlights(user_id, plan_id, limit=None):
-    """Felhasználó összes kiemelésének lekérése időrendben visszafelé"""
+def get_user_highlights(user_id, plan_id, limit=None, cursor=None):
+    """
+    Felhasználó kiemeléseinek lekérése időrendben visszafelé.
+    limit/cursor megadásával kurzor alapú lapozás (a kurzor a decode_notes_cursor kimenete).
+    """
     conn = get_db_connection()
-    cursor = get_cursor(conn)
+    db_cursor = get_cursor(conn)
     p = placeholder()
+    keyset, keyset_params = _keyset_condition('h', 'highlight', cursor)
+    limit_sql, limit_params = _limit_clause(limit)
     query = f'''
         SELECT h.*, u.name as user_name
         FROM highlights h
         JOIN users u ON h.user_id = u.id
-        WHERE h.user_id = {p} AND h.plan_id = {p}
-        ORDER BY h.created_at DESC
+        WHERE h.user_id = {p} AND h.plan_id = {p}{keyset}
+        ORDER BY h.created_at DESC, h.id DESC{limit_sql}
     '''
-    if limit:
-        query += f' LIMIT {limit}'
-    cursor.execute(query, (user_id, plan_id))
-    highlights = [dict(row) for row in cursor.fetchall()]
+    db_cursor.execute(query, (user_id, plan_id) + keyset_params + limit_params)
+    highlights = [dict(row) for row in db_cursor.fetchall()]
     conn.close()
     return highlights
 
 
-def get_user_notes_combined(user_id, plan_id, limit=None):
-    """Felhasználó összes jegyzetének és kiemelésének lekérése együtt, időrendben visszafelé"""
+def get_user_notes_combined(user_id, plan_id, limit=None, cursor=None):
+    """
+    Felhasználó jegyzeteinek és kiemeléseinek lekérése együtt, időrendben visszafelé.
+    
+    limit/cursor megadásával keyset lapozás: mindkét ág külön, indexelten
+    legfeljebb limit sort ad, majd a UNION ezekből választja ki a lapot.
+    """
     conn = get_db_connection()
-    cursor = get_cursor(conn)
+    db_cursor = get_cursor(conn)
     p = placeholder()
     
+    comment_keyset, comment_params = _keyset_condition('c', 'comment', cursor)
+    highlight_keyset, highlight_params = _keyset_condition('h', 'highlight', cursor)
+    limit_sql, limit_params = _limit_clause(limit)
+    
     # Kombinált lekérdezés UNION-nal
     query = f'''
-        SELECT 
-            'comment' as type,
-            c.id,
-            c.date,
-            c.verse_ref,
-            c.content as text,
-            c.comment_type,
-            NULL as color,
-            c.created_at
-        FROM comments c
-        WHERE c.user_id = {p} AND c.plan_id = {p}
+        SELECT * FROM (
+            SELECT 
+                'comment' as type,
+                c.id,
+                c.date,
+                c.verse_ref,
+                c.content as text,
+                c.comment_type,
+                NULL as color,
+                c.is_private,
+                c.created_at,
+                c.reaction_count,
+                c.reply_count
+            FROM comments c
+            WHERE c.user_id = {p} AND c.plan_id = {p}{comment_keyset}
+            ORDER BY c.created_at DESC, c.id DESC{limit_sql}
+        ) comment_notes
         
         UNION ALL
         
-        SELECT 
-            'highlight' as type,
-            h.id,
-            h.date,
-            h.verse_ref,
-            h.text,
-            NULL as comment_type,
-            h.color,
-            h.created_at
-        FROM highlights h
-        WHERE h.user_id = {p} AND h.plan_id = {p}
+        SELECT * FROM (
+            SELECT 
+                'highlight' as type,
+                h.id,
+                h.date,
+                h.verse_ref,
+                h.text,
+                NULL as comment_type,
+                h.color,
+                h.is_private,
+                h.created_at,
+                h.reaction_count,
+                0 as reply_count
+            FROM highlights h
+            WHERE h.user_id = {p} AND h.plan_id = {p}{highlight_keyset}
+            ORDER BY h.created_at DESC, h.id DESC{limit_sql}
+        ) highlight_notes
         
-        ORDER BY created_at DESC
+        ORDER BY created_at DESC, type DESC, id DESC{limit_sql}
     '''
-    if limit:
-        query = query.replace('ORDER BY created_at DESC', f'ORDER BY created_at DESC LIMIT {limit}')
-    
-    cursor.execute(query, (user_id, plan_id, user_id, plan_id))
-    notes = [dict(row) for row in cursor.fetchall()]
+    params = ((user_id, plan_id) + comment_params + limit_params
+              + (user_id, plan_id) + highlight_params + limit_params
+              + limit_params)
+    db_cursor.execute(query, params)
+    notes = [dict(row) for row in db_cursor.fetchall()]
     conn.close()
     return notes
 
 
+def count_user_notes(user_id, plan_id):
+    """Felhasználó kommentjeinek és kiemeléseinek száma egyetlen lekérdezéssel"""
+    conn = get_db_connection()
+    cursor = get_cursor(conn)
+    p = placeholder()
+    cursor.execute(f'''
+        SELECT
+            (SELECT COUNT(*) FROM comments WHERE user_id = {p} AND plan_id = {p}) AS comments,
+            (SELECT COUNT(*) FROM highlights WHERE user_id = {p} AND plan_id = {p}) AS highlights
+    ''', (user_id, plan_id, user_id, plan_id))
+    row = cursor.fetchone()
+    conn.close()
+    return {
+        'comments': row['comments'],
+        'highlights': row['highlights']
+    }
+
+
 # ==========================================
 # Reakciók (like/szívecske) műveletek
 # ==========================================
 
+# Reakció célpont típus -> számlálót tartalmazó tábla
+COUNTER_TABLES = {
+    'comment': 'comments',
+    'highlight': 'highlights',
+}
+
+
+def _change_reaction_count(cursor, target_type, target_id, delta):
+    """Reakció számláló módosítása ugyanabban a tranzakcióban; visszaadja az új értéket"""
+    table = COUNTER_TABLES.get(target_type)
+    if table is None:
+        return 0
+    p = placeholder()
+    condition = '' if delta > 0 else ' AND reaction_count > 0'
+    if delta and USE_POSTGRES:
+        cursor.execute(f'''
+            UPDATE {table} SET reaction_count = reaction_count + {p}
+            WHERE id = {p}{condition}
+            RETURNING reaction_count
+        ''', (delta, target_id))
+        result = cursor.fetchone()
+        if result is not None:
+            return result['reaction_count']
+    elif delta:
+        cursor.execute(f'''
+            UPDATE {table} SET reaction_count = reaction_count + {p}
+            WHERE id = {p}{condition}
+        ''', (delta, target_id))
+    cursor.execute(f'SELECT reaction_count FROM {table} WHERE id = {p}', (target_id,))
+    result = cursor.fetchone()
+    return result['reaction_count'] if result else 0
+
+
 def add_reaction(user_id, target_type, target_id, reaction_type='heart'):
-    """Reakció hozzáadása"""
-    conn = get_db_connection()
+    """Reakció hozzáadása (a célpont reakció számlálójával együtt)"""
+    conn = get_db_connection(write=True)
     cursor = get_cursor(conn)
     p = placeholder()
     
     try:
-        cursor.execute(f'''
-            INSERT INTO reactions (user_id, target_type, target_id, reaction_type)
-            VALUES ({p}, {p}, {p}, {p})
-        ''', (user_id, target_type, target_id, reaction_type))
+        with savepoint(cursor):
+            cursor.execute(f'''
+                INSERT INTO reactions (user_id, target_type, target_id, reaction_type)
+                VALUES ({p}, {p}, {p}, {p})
+            ''', (user_id, target_type, target_id, reaction_type))
+            
+            # Visszaadjuk az új reakciók számát (a számlálóból, COUNT(*) nélkül)
+            count = _change_reaction_count(cursor, target_type, target_id, 1)
         conn.commit()
-        
-        # Visszaadjuk az új reakciók számát
-        cursor.execute(f'''
-            SELECT COUNT(*) as count FROM reactions
-            WHERE target_type = {p} AND target_id = {p}
-        ''', (target_type, target_id))
-        result = cursor.fetchone()
-        count = dict(result)['count'] if result else 0
-        conn.close()
         return {'success': True, 'count': count}
-    except Exception as e:
-        conn.close()
+    except IntegrityError as e:
+        # Már létező reakció: csak a saját írásainkat görgettük vissza
         return {'success': False, 'error': str(e)}
+    finally:
+        conn.close()
 
 
 def remove_reaction(user_id, target_type, target_id):
-    """Reakció eltávolítása"""
-    conn = get_db_connection()
+    """Reakció eltávolítása (a célpont reakció számlálójával együtt)"""
+    conn = get_db_connection(write=True)
     cursor = get_cursor(conn)
     p = placeholder()
     
@@ -896,15 +1607,11 @@ def remove_reaction(user_id, target_type, target_id):
         DELETE FROM reactions
         WHERE user_id = {p} AND target_type = {p} AND target_id = {p}
     ''', (user_id, target_type, target_id))
-    conn.commit()
     
     # Visszaadjuk az új reakciók számát
-    cursor.execute(f'''
-        SELECT COUNT(*) as count FROM reactions
-        WHERE target_type = {p} AND target_id = {p}
-    ''', (target_type, target_id))
-    result = cursor.fetchone()
-    count = dict(result)['count'] if result else 0
+    delta = -1 if cursor.rowcount > 0 else 0
+    count = _change_reaction_count(cursor, target_type, target_id, delta)
+    conn.commit()
     conn.close()
     return count
 
@@ -947,7 +1654,7 @@ def has_user_reacted(user_id, target_type, target_id):
 
 def add_comment_reply(user_id, parent_comment_id, content):
     """Válasz hozzáadása egy kommenthez"""
-    conn = get_db_connection()
+    conn = get_db_connection(write=True)
     cursor = get_cursor(conn)
     p = placeholder()
     
@@ -965,6 +1672,9 @@ def add_comment_reply(user_id, parent_comment_id, content):
         ''', (user_id, parent_comment_id, content))
         reply_id = cursor.lastrowid
     
+    # Válasz számláló növelése ugyanabban a tranzakcióban
+    cursor.execute(f'UPDATE comments SET reply_count = reply_count + 1 WHERE id = {p}', (parent_comment_id,))
+    
     conn.commit()
     conn.close()
     return reply_id
@@ -1047,27 +1757,65 @@ def get_replies_for_comments(parent_comment_ids):
 
 def delete_comment_reply(reply_id, user_id):
     """Válasz törlése (csak a saját válaszok)"""
-    conn = get_db_connection()
+    conn = get_db_connection(write=True)
     cursor = get_cursor(conn)
     p = placeholder()
     
+    cursor.execute(f'SELECT parent_comment_id FROM comment_replies WHERE id = {p} AND user_id = {p}', (reply_id, user_id))
+    reply = cursor.fetchone()
+    if reply is None:
+        conn.rollback()
+        conn.close()
+        return False
+    
     cursor.execute(f'''
         DELETE FROM comment_replies
         WHERE id = {p} AND user_id = {p}
     ''', (reply_id, user_id))
-    conn.commit()
     deleted = cursor.rowcount > 0
+    if deleted:
+        # Válasz számláló csökkentése ugyanabban a tranzakcióban
+        cursor.execute(f'''
+            UPDATE comments SET reply_count = reply_count - 1
+            WHERE id = {p} AND reply_count > 0
+        ''', (reply['parent_comment_id'],))
+    conn.commit()
     conn.close()
     return deleted
 
 
+def _recount_counters(cursor):
+    """Reakció- és válaszszámlálók újraszámolása a reactions és comment_replies táblákból"""
+    for target_type, table in COUNTER_TABLES.items():
+        reply_count = '''
+            (SELECT COUNT(*) FROM comment_replies cr WHERE cr.parent_comment_id = comments.id)
+        ''' if table == 'comments' else '0'
+        cursor.execute(f'''
+            UPDATE {table} SET
+                reaction_count = (
+                    SELECT COUNT(*) FROM reactions r
+                    WHERE r.target_type = '{target_type}' AND r.target_id = {table}.id
+                ),
+                reply_count = {reply_count}
+        ''')
+
+
+def recount_counters():
+    """Számlálók javítása (karbantartó parancs: flask recount-counters)"""
+    conn = get_db_connection(write=True)
+    cursor = get_cursor(conn)
+    _recount_counters(cursor)
+    conn.commit()
+    conn.close()
+
+
 # ==========================================
 # Privát jegyzet/kiemelés műveletek
 # ==========================================
 
 def update_comment_privacy(comment_id, user_id, is_private):
     """Komment privát státuszának módosítása"""
-    conn = get_db_connection()
+    conn = get_db_connection(write=True)
     cursor = get_cursor(conn)
     p = placeholder()
     
@@ -1088,7 +1836,7 @@ def update_comment_privacy(comment_id, user_id, is_private):
 
 def update_highlight_privacy(highlight_id, user_id, is_private):
     """Kiemelés privát státuszának módosítása"""
-    conn = get_db_connection()
+    conn = get_db_connection(write=True)
     cursor = get_cursor(conn)
     p = placeholder()
     
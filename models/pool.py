@@ -0,0 +1,359 @@
+"""
+Adatbázis kapcsolat pool
+
+PostgreSQL: szálbiztos, korlátos méretű pool (a gunicorn --threads számához igazítva).
+SQLite: szálanként egy újrahasznosított kapcsolat, soros író útvonallal.
+
+A kölcsönzött kapcsolat close() hívása nem zárja le a kapcsolatot,
+hanem visszaadja a pool-nak, így a meglévő kód változtatás nélkül működik.
+"""
+
+import os
+import threading
+import time
+
+
+class PoolTimeout(Exception):
+    """Nem sikerült kapcsolatot szerezni a pool-ból a megadott időn belül"""
+
+
+class PooledConnection:
+    """Pool-ból kölcsönzött kapcsolat - a close() visszaadja a pool-nak"""
+
+    def __init__(self, pool, raw, state=None):
+        self._pool = pool
+        self._raw = raw
+        self._state = state
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    @property
+    def raw(self):
+        """A valódi (DB-API) kapcsolat objektum"""
+        return self._raw
+
+    @property
+    def writing(self):
+        """Nyitott írási tranzakció (SQLite: a kapcsolat birtokolja az írót)"""
+        return self._pool.is_writing(self._state)
+
+    def begin_write(self):
+        """Írási tranzakció indítása (SQLite: a soros író útvonalon keresztül)"""
+        self._pool.begin_write(self._raw, self._state)
+
+    def commit(self):
+        """Commit - a tranzakció végén az író azonnal felszabadul"""
+        self._raw.commit()
+        self._pool.end_write(self._raw, self._state)
+
+    def rollback(self):
+        self._raw.rollback()
+        self._pool.end_write(self._raw, self._state)
+
+    def close(self):
+        """Kapcsolat visszaadása a pool-nak"""
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool.release(raw, self._state)
+
+    def __del__(self):
+        # Biztonsági háló: ha egy hibaág nem hívott close()-t, ne szivárogjon el a kapcsolat
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class _PoolStats:
+    """Pool statisztikák (kölcsönzések, várakozás, kapcsolat churn)"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.checked_out = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+        self.created = 0
+        self.discarded = 0
+
+    def record_checkout(self, waited):
+        self.checkouts += 1
+        self.checked_out += 1
+        if waited > 0.001:
+            self.waits += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    def as_dict(self):
+        return {
+            'checkouts': self.checkouts,
+            'checked_out': self.checked_out,
+            'waits': self.waits,
+            'total_wait_ms': round(self.total_wait * 1000, 2),
+            'avg_wait_ms': round(self.total_wait * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+            'max_wait_ms': round(self.max_wait * 1000, 2),
+            'timeouts': self.timeouts,
+            'created': self.created,
+            'discarded': self.discarded,
+        }
+
+
+class PostgresPool:
+    """Szálbiztos, korlátos méretű PostgreSQL kapcsolat pool"""
+
+    backend = 'postgres'
+
+    def __init__(self, connect, size, timeout=30, recycle=1800):
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self._idle = []  # [(kapcsolat, létrehozás ideje)] - LIFO, a legfrissebb kapcsolat megy ki először
+        self._born = {}  # id(kapcsolat) -> létrehozás ideje
+        self._open = 0
+        self._cond = threading.Condition()
+        self._stats = _PoolStats()
+
+    def acquire(self):
+        """Kapcsolat kölcsönzése (blokkol, ha a pool telített)"""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    raw, born = self._idle.pop()
+                    if raw.closed or (self.recycle and time.monotonic() - born > self.recycle):
+                        self._discard_locked(raw)
+                        continue
+                    self._stats.record_checkout(time.monotonic() - start)
+                    return PooledConnection(self, raw)
+                if self._open < self.size:
+                    # Helyet foglalunk, a kapcsolatot a lock-on kívül nyitjuk meg
+                    self._open += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats.timeouts += 1
+                    raise PoolTimeout(
+                        f'Nincs szabad adatbázis kapcsolat {self.timeout} mp után '
+                        f'(pool méret: {self.size})'
+                    )
+                self._cond.wait(remaining)
+
+        try:
+            raw = self._connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._born[id(raw)] = time.monotonic()
+            self._stats.created += 1
+            self._stats.record_checkout(time.monotonic() - start)
+        return PooledConnection(self, raw)
+
+    def begin_write(self, raw, state=None):
+        # PostgreSQL: az MVCC miatt nincs szükség soros írásra
+        pass
+
+    def end_write(self, raw, state=None):
+        pass
+
+    def is_writing(self, state=None):
+        return False
+
+    def release(self, raw, state=None):
+        """Kapcsolat visszaadása: a félbehagyott tranzakciót visszagörgetjük"""
+        healthy = not raw.closed
+        if healthy:
+            try:
+                raw.rollback()
+            except Exception:
+                healthy = False
+        with self._cond:
+            self._stats.checked_out -= 1
+            if healthy:
+                self._idle.append((raw, self._born.get(id(raw), time.monotonic())))
+            else:
+                self._discard_locked(raw)
+            self._cond.notify()
+
+    def _discard_locked(self, raw):
+        self._open -= 1
+        self._born.pop(id(raw), None)
+        self._stats.discarded += 1
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def close_all(self):
+        """Összes szabad kapcsolat lezárása"""
+        with self._cond:
+            while self._idle:
+                raw, _ = self._idle.pop()
+                self._discard_locked(raw)
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            data = self._stats.as_dict()
+            data.update({
+                'backend': self.backend,
+                'size': self.size,
+                'open': self._open,
+                'idle': len(self._idle),
+                'saturated': self._open >= self.size and not self._idle,
+            })
+        return data
+
+
+class _ThreadConnection:
+    """Egy szál SQLite kapcsolata: egymásba ágyazott kölcsönzések száma és író birtoklás"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.depth = 0
+        self.writing = False
+
+
+class SQLitePool:
+    """
+    SQLite: szálanként egy újrahasznosított kapcsolat.
+    
+    Az írások egyetlen, sorba állított író útvonalon mennek (folyamaton belüli
+    lock + BEGIN IMMEDIATE, folyamatok között busy_timeout), az olvasók
+    WAL módban sosem várnak az íróra.
+    
+    A szál kapcsolatának kölcsönzései egymásba ágyazhatók: csak a legkülső
+    visszaadás görget vissza, és a szál már birtokolt írója nem blokkol újra.
+    Az író a commit/rollback pillanatában felszabadul.
+    """
+
+    backend = 'sqlite'
+
+    def __init__(self, connect, write_timeout=5.0):
+        self._connect = connect
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writer = threading.Lock()
+        self.write_timeout = write_timeout
+        self._open = 0
+        self._stats = _PoolStats()
+        self._writes = 0
+        self._write_waits = 0
+        self._write_wait_total = 0.0
+        self._write_wait_max = 0.0
+
+    def acquire(self):
+        start = time.monotonic()
+        state = getattr(self._local, 'state', None)
+        created = state is None
+        if created:
+            state = _ThreadConnection(self._connect())
+            self._local.state = state
+        state.depth += 1
+        with self._lock:
+            if created:
+                self._open += 1
+                self._stats.created += 1
+            self._stats.record_checkout(time.monotonic() - start)
+        return PooledConnection(self, state.raw, state)
+
+    def begin_write(self, raw, state):
+        """Sorba állás az író útvonalon (ha a szál még nem birtokolja), majd írási tranzakció nyitása"""
+        if not state.writing:
+            start = time.monotonic()
+            if not self._writer.acquire(timeout=self.write_timeout):
+                with self._lock:
+                    self._stats.timeouts += 1
+                raise PoolTimeout(f'Az adatbázis író foglalt {self.write_timeout} mp után')
+            state.writing = True
+            waited = time.monotonic() - start
+            with self._lock:
+                self._writes += 1
+                if waited > 0.001:
+                    self._write_waits += 1
+                self._write_wait_total += waited
+                self._write_wait_max = max(self._write_wait_max, waited)
+        try:
+            if not raw.in_transaction:
+                raw.execute('BEGIN IMMEDIATE')
+        except Exception:
+            self._release_writer(state)
+            raise
+
+    def end_write(self, raw, state):
+        """Lezárult tranzakció (commit/rollback) után az író felszabadítása"""
+        if state.writing and not raw.in_transaction:
+            self._release_writer(state)
+
+    def is_writing(self, state):
+        return state.writing
+
+    def _release_writer(self, state):
+        if state.writing:
+            state.writing = False
+            self._writer.release()
+
+    def release(self, raw, state):
+        # Csak a legkülső visszaadás dobja el a commit nélkül hagyott írást
+        state.depth -= 1
+        try:
+            if state.depth == 0 and raw.in_transaction:
+                raw.rollback()
+        finally:
+            if state.depth == 0:
+                self._release_writer(state)
+            with self._lock:
+                self._stats.checked_out -= 1
+
+    def close_all(self):
+        """Az aktuális szál kapcsolatának lezárása"""
+        state = getattr(self._local, 'state', None)
+        if state is not None:
+            self._local.state = None
+            self._release_writer(state)
+            state.raw.close()
+            with self._lock:
+                self._open -= 1
+                self._stats.discarded += 1
+
+    def stats(self):
+        with self._lock:
+            data = self._stats.as_dict()
+            data.update({
+                'backend': self.backend,
+                'size': None,
+                'open': self._open,
+                'idle': None,
+                'saturated': self._writer.locked(),
+                'writes': self._writes,
+                'write_waits': self._write_waits,
+                'write_wait_total_ms': round(self._write_wait_total * 1000, 2),
+                'write_wait_max_ms': round(self._write_wait_max * 1000, 2),
+            })
+        return data
+
+
+class PoolHolder:
+    """Lusta pool létrehozás, fork után (gunicorn worker) új pool"""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        pid = os.getpid()
+        if self._pool is None or self._pid != pid:
+            with self._lock:
+                if self._pool is None or self._pid != pid:
+                    self._pool = self._factory()
+                    self._pid = pid
+        return self._pool
@@ -0,0 +1,165 @@
+"""
+Olvasási napló tömör bittérképe
+
+Felhasználónként és tervenként egy bittérkép: a base_date-től számított
+i. nap olvasottsága az i. bit (bájton belül a legalacsonyabb bittől).
+Egy teljes év 46 bájt; a tagság O(1), a számlálás és a tartomány
+lekérdezés egyetlen egész számos popcount.
+"""
+
+from datetime import date, datetime, timedelta
+
+# Egy bittérkép legfeljebb ennyi bájt (4096 nap, kb. 11 év) - ezen túli napot nem veszünk fel
+MAX_BYTES = 512
+
+
+def parse_date(value):
+    """'YYYY-MM-DD' string vagy date -> date (érvénytelen érték esetén None)"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None
+
+
+class ReadingBitmap:
+    """Olvasott napok halmaza bittérképként"""
+
+    def __init__(self, base_date=None, data=b''):
+        self.base_date = parse_date(base_date) if base_date else None
+        self._bits = bytearray(data or b'')
+
+    @classmethod
+    def from_dates(cls, dates):
+        """Bittérkép építése dátumok listájából (pl. reading_log sorokból)"""
+        bitmap = cls()
+        for value in dates:
+            bitmap.add(value)
+        return bitmap
+
+    def _index(self, value):
+        d = parse_date(value)
+        if d is None or self.base_date is None:
+            return None
+        return (d - self.base_date).days
+
+    def __contains__(self, value):
+        return self.contains(value)
+
+    def __len__(self):
+        return self.count()
+
+    def contains(self, value):
+        """Olvasott-e az adott nap - O(1)"""
+        i = self._index(value)
+        if i is None or i < 0 or (i >> 3) >= len(self._bits):
+            return False
+        return bool(self._bits[i >> 3] & (1 << (i & 7)))
+
+    def add(self, value):
+        """
+        Nap megjelölése olvasottként; visszaadja, hogy változott-e.
+        Értelmezhetetlen vagy a MAX_BYTES méretkorláton túli napnál False.
+        """
+        d = parse_date(value)
+        if d is None:
+            return False
+        if self.base_date is None:
+            self.base_date = d
+        i = (d - self.base_date).days
+        if i < 0:
+            needed = len(self._bits) + ((-i + 7) >> 3)
+        else:
+            needed = max(len(self._bits), (i >> 3) + 1)
+        if needed > MAX_BYTES:
+            return False
+        if i < 0:
+            # Az alapdátum előtti nap: egész bájtnyival visszatoljuk az alapdátumot
+            shift_bytes = (-i + 7) >> 3
+            self._bits[0:0] = bytes(shift_bytes)
+            self.base_date -= timedelta(days=shift_bytes * 8)
+            i += shift_bytes * 8
+        if (i >> 3) >= len(self._bits):
+            self._bits.extend(bytes((i >> 3) - len(self._bits) + 1))
+        mask = 1 << (i & 7)
+        if self._bits[i >> 3] & mask:
+            return False
+        self._bits[i >> 3] |= mask
+        return True
+
+    def discard(self, value):
+        """Olvasott jelölés törlése; visszaadja, hogy változott-e"""
+        i = self._index(value)
+        if i is None or i < 0 or (i >> 3) >= len(self._bits):
+            return False
+        mask = 1 << (i & 7)
+        if not self._bits[i >> 3] & mask:
+            return False
+        self._bits[i >> 3] &= ~mask & 0xFF
+        # Záró üres bájtok levágása, hogy a tárolt érték tömör maradjon
+        while self._bits and self._bits[-1] == 0:
+            self._bits.pop()
+        return True
+
+    def count(self):
+        """Olvasott napok száma"""
+        return int.from_bytes(self._bits, 'little').bit_count()
+
+    def count_range(self, start, end):
+        """Olvasott napok száma a [start, end] dátum tartományban (mindkét vég zárt)"""
+        lo = self._index(start)
+        hi = self._index(end)
+        if lo is None or hi is None:
+            return 0
+        lo = max(lo, 0)
+        hi = min(hi, len(self._bits) * 8 - 1)
+        if hi < lo:
+            return 0
+        value = int.from_bytes(self._bits, 'little') >> lo
+        return (value & ((1 << (hi - lo + 1)) - 1)).bit_count()
+
+    def mask(self, start, length):
+        """A start naptól kezdődő length nap olvasottsága egész számként (i. bit = start + i nap)"""
+        lo = self._index(start)
+        if lo is None or length <= 0:
+            return 0
+        value = int.from_bytes(self._bits, 'little')
+        value = value >> lo if lo >= 0 else value << -lo
+        return value & ((1 << length) - 1)
+
+    def last_date(self):
+        """A legkésőbbi olvasott nap (üres bittérképnél None)"""
+        top = int.from_bytes(self._bits, 'little').bit_length()
+        return self.base_date + timedelta(days=top - 1) if top else None
+
+    def streak(self, today=None):
+        """
+        Aktuális sorozat: a ma (vagy ha ma még nem, a tegnap) végződő, egymást
+        követő olvasott napok száma; korábban megszakadt sorozatnál 0.
+        """
+        end = self._index(today or date.today())
+        if end is None or end < 0:
+            return 0
+        if not self.contains(self.base_date + timedelta(days=end)):
+            end -= 1
+        if end < 0:
+            return 0
+        # Az end bitig (bezárólag) tartó folytonos egyes bitek hossza
+        value = int.from_bytes(self._bits, 'little') & ((1 << (end + 1)) - 1)
+        inverted = ~value & ((1 << (end + 1)) - 1)
+        return end + 1 - inverted.bit_length()
+
+    def dates(self):
+        """Olvasott napok dátumai növekvő sorrendben"""
+        for byte_index, byte in enumerate(self._bits):
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte & (1 << bit):
+                    yield self.base_date + timedelta(days=byte_index * 8 + bit)
+
+    def to_bytes(self):
+        return bytes(self._bits)
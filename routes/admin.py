@@ -1,14 +1,19 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify, current_app
 from functools import wraps
 from datetime import datetime, date
 from models.database import (
     get_all_plans, create_plan, delete_plan, update_plan_password, update_plan,
     get_plan_by_id, get_all_users, delete_user, get_user_stats,
-    update_plan_start_date
+    update_plan_start_date, get_pool_stats
 )
 from config import Config
+from services.bible_api import is_cache_only
+from services.http_client import get_upstream_client
+from services.memo import get_rendered_verses_cache
+from services.plan_index import EMPTY_INDEX
+from services.plan_repository import plan_repository
+from services.verse_cache import get_verse_cache
 import os
-import json
 import re
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
@@ -65,6 +70,20 @@ def plans():
     return render_template('admin/plans.html', plans=all_plans)
 
 
+@admin_bp.route('/stats')
+@admin_required
+def runtime_stats():
+    """Adatbázis kapcsolat pool, API megszakító és vers gyorsítótárak statisztikái"""
+    stats = get_pool_stats()
+    stats['bible_api'] = get_upstream_client(current_app.config).stats()
+    stats['bible_api']['cache_only'] = is_cache_only()
+    cache = get_verse_cache(current_app.config)
+    stats['verse_cache'] = cache.stats() if cache is not None else None
+    stats['rendered_verses'] = get_rendered_verses_cache(current_app.config).stats()
+    stats['plans'] = plan_repository.stats()
+    return jsonify(stats)
+
+
 @admin_bp.route('/plans/create', methods=['GET', 'POST'])
 @admin_required
 def create_plan_view():
@@ -216,20 +235,22 @@ def validate_plan_file(plan_file):
     return True
 
 def load_plan_file(plan_file):
-    """Olvasási terv fájl betöltése"""
+    """Olvasási terv fájl betöltése (módosítható másolat a közös tárolóból)"""
+    validate_plan_file(plan_file)
+    plan_path = os.path.join(os.path.dirname(Config.READING_PLAN_PATH), plan_file)
+    return plan_repository.load_copy(plan_path)
+
+def load_plan_index(plan_file):
+    """Olvasási terv előre fordított indexe (csak olvasásra)"""
     validate_plan_file(plan_file)
     plan_path = os.path.join(os.path.dirname(Config.READING_PLAN_PATH), plan_file)
-    if os.path.exists(plan_path):
-        with open(plan_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
+    return plan_repository.get_index(plan_path) or EMPTY_INDEX
 
 def save_plan_file(plan_file, data):
-    """Olvasási terv fájl mentése"""
+    """Olvasási terv fájl mentése (a többi worker a fájl változásából újratölt)"""
     validate_plan_file(plan_file)
     plan_path = os.path.join(os.path.dirname(Config.READING_PLAN_PATH), plan_file)
-    with open(plan_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+    plan_repository.save(plan_path, data)
 
 
 @admin_bp.route('/plans/<int:plan_id>/readings')
@@ -241,28 +262,14 @@ def edit_readings(plan_id):
         flash('Terv nem található!', 'error')
         return redirect(url_for('admin.plans'))
     
-    plan_data = load_plan_file(plan['plan_file'])
-    
-    # Rendezés: ha számozott (1, 2, 3...), akkor szám szerint, egyébként string szerint
-    sorted_keys = sorted(
-        plan_data.keys(),
-        key=lambda x: (0, int(str(x))) if str(x).isdigit() else (1, str(x))
-    )
-    
-    readings = []
-    for key in sorted_keys:
-        readings.append({
-            'day': key,
-            'data': plan_data[key]
-        })
-    
-    # Ellenőrizzük, hogy számozott-e a terv
-    is_numbered = len(plan_data) > 0 and list(plan_data.keys())[0].isdigit()
+    # Az index már rendezett (számozott napok szám szerint, a többi string szerint)
+    plan_index = load_plan_index(plan['plan_file'])
+    readings = [{'day': key, 'data': plan_day.raw} for key, plan_day in plan_index.days()]
     
     return render_template('admin/edit_readings.html', 
                           plan=plan, 
                           readings=readings,
-                          is_numbered=is_numbered)
+                          is_numbered=plan_index.numbered)
 
 
 @admin_bp.route('/plans/<int:plan_id>/readings/<day>', methods=['GET', 'POST'])
@@ -274,10 +281,9 @@ def edit_reading_day(plan_id, day):
         flash('Terv nem található!', 'error')
         return redirect(url_for('admin.plans'))
     
-    plan_data = load_plan_file(plan['plan_file'])
-    
     if request.method == 'POST':
-        # Mentés
+        # Mentés (a terv módosítható másolatán)
+        plan_data = load_plan_file(plan['plan_file'])
         ot = request.form.get('ot', '').strip()
         nt = request.form.get('nt', '').strip()
         ps = request.form.get('ps', '').strip()
@@ -303,7 +309,7 @@ def edit_reading_day(plan_id, day):
         return redirect(url_for('admin.edit_readings', plan_id=plan_id))
     
     # GET: nap adatainak betöltése
-    day_data = plan_data.get(day, {})
+    day_data = load_plan_index(plan['plan_file']).day(day).raw
     
     return render_template('admin/edit_reading_day.html',
                           plan=plan,
@@ -320,9 +326,8 @@ def add_reading_day(plan_id):
         flash('Terv nem található!', 'error')
         return redirect(url_for('admin.plans'))
     
-    plan_data = load_plan_file(plan['plan_file'])
-    
     if request.method == 'POST':
+        plan_data = load_plan_file(plan['plan_file'])
         day = request.form.get('day', '').strip()
         ot = request.form.get('ot', '').strip()
         nt = request.form.get('nt', '').strip()
@@ -358,14 +363,13 @@ def add_reading_day(plan_id):
         return redirect(url_for('admin.edit_readings', plan_id=plan_id))
     
     # Következő nap javaslata
-    if plan_data:
-        try:
-            max_day = max(int(k) for k in plan_data.keys() if k.isdigit())
-            suggested_day = str(max_day + 1)
-        except:
-            suggested_day = ''
-    else:
+    plan_index = load_plan_index(plan['plan_file'])
+    if not plan_index.total_days:
         suggested_day = '1'
+    elif plan_index.max_day is not None:
+        suggested_day = str(plan_index.max_day + 1)
+    else:
+        suggested_day = ''
     
     return render_template('admin/add_reading_day.html', plan=plan, suggested_day=suggested_day)
 
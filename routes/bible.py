@@ -1,22 +1,29 @@
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify, current_app
 from functools import wraps
 from datetime import datetime, date, timedelta
-import json
+from concurrent.futures import ThreadPoolExecutor
 import os
 from config import Config
+from models.pool import PoolHolder
 from models.database import (
-    get_comments_for_date, add_comment, delete_comment, update_comment,
-    get_highlights_for_date, add_highlight, delete_highlight,
-    mark_day_as_read, unmark_day_as_read, get_reading_log,
+    add_comment, delete_comment, update_comment,
+    add_highlight, delete_highlight,
+    mark_day_as_read, unmark_day_as_read, get_reading_progress,
     get_all_users, get_all_reading_stats, get_readers_for_date,
     get_user_comments, get_user_highlights, get_user_notes_combined,
-    get_plan_by_id,
+    count_user_notes, encode_notes_cursor, decode_notes_cursor, InvalidCursor,
+    get_plan_by_id, load_day_bundle,
     add_reaction, remove_reaction, has_user_reacted,
     add_comment_reply, get_replies_for_comment, delete_comment_reply,
     update_comment_privacy, update_highlight_privacy,
-    get_reactions_for_target, get_reactions_for_targets, get_replies_for_comments
+    get_reactions_for_target
 )
-from services.bible_api import fetch_verses_from_api, format_verses_html, get_available_translations
+from services.bible_api import align_verses, fetch_verses_from_api, format_verses_html, get_available_translations
+from services.local_bible import fetch_verses_from_local, get_local_bible
+from services.memo import get_rendered_verses_cache
+from services.plan_index import EMPTY_DAY, EMPTY_INDEX
+from services.plan_repository import plan_repository
+from services.reference_parser import reference_key
 
 bible_bp = Blueprint('bible', __name__)
 
@@ -62,33 +69,20 @@ def get_date_for_day(day_number, plan_id):
     return start_date + timedelta(days=day_number - 1)
 
 
-def is_numbered_plan(reading_plan):
-    """Ellenőrzi, hogy a terv számozott napokkal működik-e (1, 2, 3...) vagy dátumokkal (MM-DD)"""
-    if not reading_plan:
-        return False
-    first_key = list(reading_plan.keys())[0]
-    # Ha az első kulcs csak számokból áll, akkor számozott terv
-    return first_key.isdigit()
-
-
-def load_reading_plan(plan_id=None):
-    """Olvasási terv betöltése JSON-ból (terv alapján)"""
-    try:
-        # Ha van plan_id, az adott terv fájlját töltjük be
-        if plan_id:
-            plan = get_plan_by_id(plan_id)
-            if plan:
-                plan_file = plan['plan_file']
-                plan_path = os.path.join(os.path.dirname(Config.READING_PLAN_PATH), plan_file)
-                if os.path.exists(plan_path):
-                    with open(plan_path, 'r', encoding='utf-8') as f:
-                        return json.load(f)
-        
-        # Alapértelmezett terv fájl
-        with open(Config.READING_PLAN_PATH, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
+def load_plan_index(plan_id=None):
+    """Olvasási terv előre fordított indexe (terv alapján) - a közös, csak olvasható példány"""
+    # Ha van plan_id, az adott terv fájlját használjuk
+    if plan_id:
+        plan = get_plan_by_id(plan_id)
+        if plan:
+            plan_path = os.path.join(os.path.dirname(Config.READING_PLAN_PATH), plan['plan_file'])
+            plan_index = plan_repository.get_index(plan_path)
+            if plan_index is not None:
+                return plan_index
+    
+    # Alapértelmezett terv fájl
+    plan_index = plan_repository.get_index(Config.READING_PLAN_PATH)
+    return plan_index if plan_index is not None else EMPTY_INDEX
 
 def get_today_string():
     """Mai dátum string formátumban (MM-DD)"""
@@ -119,17 +113,16 @@ def index():
     plan = get_plan_by_id(plan_id)
     
     # Olvasási statisztikák
-    user_reading_log = get_reading_log(session['user_id'], plan_id)
+    progress = get_reading_progress(session['user_id'], plan_id)
     stats = get_all_reading_stats(plan_id)
     
     # Összes nap a tervben
-    reading_plan = load_reading_plan(plan_id)
-    total_days = len(reading_plan)
+    total_days = load_plan_index(plan_id).total_days
     
     return render_template('home.html',
                          plan=plan,
                          total_days=total_days,
-                         days_read=len(user_reading_log),
+                         days_read=progress.count(),
                          stats=stats)
 
 @bible_bp.route('/daily')
@@ -158,19 +151,16 @@ def daily(date_str=None):
             target_date = date.today()
             date_str = target_date.strftime('%Y-%m-%d')
     
-    # Olvasási terv betöltése
-    reading_plan = load_reading_plan(plan_id)
+    # Olvasási terv indexe (betöltéskor egyszer feldolgozva)
+    plan_index = load_plan_index(plan_id)
     
-    # Ellenőrizzük, hogy számozott vagy dátum alapú terv
+    # Terv kulcs és nap sorszám (számozott tervnél a kezdő dátumtól, egyébként MM-DD)
+    plan_key, day_number = plan_index.key_for_date(target_date, start_date)
     out_of_range = False  # Jelzi, ha a dátum a terven kívül esik
     
-    if is_numbered_plan(reading_plan):
-        # Számozott terv: kiszámoljuk a nap sorszámát - átadunk start_date-et
-        day_number = get_day_number(target_date, plan_id, start_date)
-        plan_key = str(day_number)
-        
-        # Terv maximális napjának meghatározása
-        max_day = max(int(k) for k in reading_plan.keys()) if reading_plan else 366
+    if plan_index.numbered:
+        # Terv maximális napja
+        max_day = plan_index.max_day or 366
         
         # Ha a nap sorszám kívül esik a terven, ne jelenítsünk meg olvasmányt
         if day_number < 1:
@@ -179,78 +169,21 @@ def daily(date_str=None):
         elif day_number > max_day:
             out_of_range = True
             flash('Ez a dátum a terv végén túl van.', 'warning')
-    else:
-        # Régi dátum alapú terv (MM-DD)
-        day_number = None
-        plan_key = target_date.strftime('%m-%d')
-    
-    # Ha a dátum a terven kívül esik, üres olvasmányokat jelenítünk meg
-    if out_of_range:
-        daily_readings_raw = {}
-    else:
-        # Mai szakaszok - átalakítás listává
-        daily_readings_raw = reading_plan.get(plan_key, {})
-    
-    # Szakasz típusok metaadatai
-    section_types = {
-        'ot': {'name': 'Ószövetség', 'icon': 'bi-bookmark', 'order': 1},
-        'nt': {'name': 'Újszövetség', 'icon': 'bi-bookmark-fill', 'order': 2},
-        'ps': {'name': 'Zsoltár', 'icon': 'bi-music-note', 'order': 3},
-        'pr': {'name': 'Példabeszédek', 'icon': 'bi-lightbulb', 'order': 4},
-    }
-    
-    # Lista formátum készítése
-    readings_list = []
     
-    # Epoch adatok kinyerése (ha van)
-    epoch_data = daily_readings_raw.get('epoch', None)
+    # Mai szakaszok (normalizált, rendezett lista) és korszak adat;
+    # ha a dátum a terven kívül esik, üres olvasmányokat jelenítünk meg
+    plan_day = EMPTY_DAY if out_of_range else plan_index.day(plan_key)
+    readings_list = plan_day.sections
+    epoch_data = plan_day.epoch
     
-    # Ha a readings már lista formátumú (sections kulccsal)
-    if 'sections' in daily_readings_raw:
-        readings_list = daily_readings_raw['sections']
-    else:
-        # Régi formátum átalakítása (ot, nt, ps, pr kulcsok)
-        for key in ['ot', 'nt', 'ps', 'pr']:
-            if key in daily_readings_raw and daily_readings_raw[key]:
-                meta = section_types.get(key, {'name': key.upper(), 'icon': 'bi-book', 'order': 99})
-                readings_list.append({
-                    'id': key,
-                    'name': meta['name'],
-                    'icon': meta['icon'],
-                    'reference': daily_readings_raw[key],
-                    'order': meta['order']
-                })
-        
-        # Egyéb kulcsok (ami nem ot, nt, ps, pr)
-        custom_order = 10
-        for key, value in daily_readings_raw.items():
-            if key not in ['ot', 'nt', 'ps', 'pr'] and value:
-                readings_list.append({
-                    'id': key,
-                    'name': key,
-                    'icon': 'bi-book',
-                    'reference': value,
-                    'order': custom_order
-                })
-                custom_order += 1
-        
-        # Rendezés order szerint
-        readings_list.sort(key=lambda x: x.get('order', 99))
-    
-    # Kommentek és kiemelések (privát szűréssel)
+    # Kommentek és kiemelések (privát szűréssel, reakciókkal és válaszokkal együtt)
     current_user_id = session.get('user_id')
-    comments = get_comments_for_date(date_str, plan_id, current_user_id)
-    highlights = get_highlights_for_date(date_str, plan_id, current_user_id)
+    day_bundle = load_day_bundle(date_str, plan_id, current_user_id)
+    comments = day_bundle['comments']
+    highlights = day_bundle['highlights']
     
-    # Hozzáadjuk, hogy az aktuális user reagált-e már
-    for comment in comments:
-        comment['user_reacted'] = has_user_reacted(current_user_id, 'comment', comment['id'])
-    for highlight in highlights:
-        highlight['user_reacted'] = has_user_reacted(current_user_id, 'highlight', highlight['id'])
-    
-    # Olvasási napló
-    user_reading_log = get_reading_log(session['user_id'], plan_id)
-    is_read = date_str in user_reading_log
+    # Olvasási napló (bittérkép, O(1) tagság)
+    is_read = target_date in get_reading_progress(session['user_id'], plan_id)
     
     # Kik olvasták már el ezt a napot
     readers = get_readers_for_date(date_str, plan_id)
@@ -303,100 +236,84 @@ def format_date_hungarian(d):
 def calendar():
     """Éves naptár nézet"""
     plan_id = session.get('plan_id')
-    reading_plan = load_reading_plan(plan_id)
-    user_reading_log = get_reading_log(session['user_id'], plan_id)
+    plan_index = load_plan_index(plan_id)
+    progress = get_reading_progress(session['user_id'], plan_id)
     stats = get_all_reading_stats(plan_id)
     
     # Terv kezdő dátuma
     start_date = get_plan_start_date(plan_id)
-    numbered_plan = is_numbered_plan(reading_plan)
-    total_days = len(reading_plan)
     
-    if numbered_plan:
-        # Számozott terv: generáljuk a hónapokat a kezdő dátumtól
-        from calendar import monthrange
-        
-        # Számoljuk ki, hogy hány hónapot kell megjeleníteni
-        end_date = start_date + timedelta(days=total_days - 1)
-        
-        months = []
-        current_month_start = date(start_date.year, start_date.month, 1)
-        
-        month_names = ['Január', 'Február', 'Március', 'Április', 'Május', 'Június',
-                       'Július', 'Augusztus', 'Szeptember', 'Október', 'November', 'December']
-        
-        while current_month_start <= end_date:
-            days_in_current_month = monthrange(current_month_start.year, current_month_start.month)[1]
-            
-            month_data = {
-                'name': f"{current_month_start.year}. {month_names[current_month_start.month - 1]}",
-                'days': []
-            }
-            
-            for d in range(1, days_in_current_month + 1):
-                current_date = date(current_month_start.year, current_month_start.month, d)
-                date_str = current_date.strftime('%Y-%m-%d')
-                
-                # Szamoljuk ki a nap szamat - atadunk start_date-et a gyors szamitashoz
-                day_num = get_day_number(current_date, plan_id, start_date)
-                
-                # Ellenőrizzük, hogy ez a nap a terv része-e
-                has_reading = 1 <= day_num <= total_days and str(day_num) in reading_plan
-                is_read = date_str in user_reading_log
-                is_today = current_date == date.today()
-                
-                month_data['days'].append({
-                    'day': d,
-                    'day_number': day_num if has_reading else None,
-                    'date_str': date_str,
-                    'has_reading': has_reading,
-                    'is_read': is_read,
-                    'is_today': is_today
-                })
-            
-            months.append(month_data)
-            
-            # Következő hónap
-            if current_month_start.month == 12:
-                current_month_start = date(current_month_start.year + 1, 1, 1)
-            else:
-                current_month_start = date(current_month_start.year, current_month_start.month + 1, 1)
-    else:
-        # Régi dátum alapú terv
-        months = []
-        month_names = ['Január', 'Február', 'Március', 'Április', 'Május', 'Június',
-                       'Július', 'Augusztus', 'Szeptember', 'Október', 'November', 'December']
-        days_in_month = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
-        
-        for m in range(12):
-            month_data = {
-                'name': month_names[m],
-                'days': []
-            }
-            for d in range(1, days_in_month[m] + 1):
-                date_key = f"{m+1:02d}-{d:02d}"
-                current_date = date(start_date.year, m+1, d)
-                date_str = current_date.strftime('%Y-%m-%d')
-                has_reading = date_key in reading_plan
-                is_read = date_str in user_reading_log
-                is_today = current_date == date.today()
-                
-                month_data['days'].append({
-                    'day': d,
-                    'day_number': None,
-                    'date_str': date_str,
-                    'has_reading': has_reading,
-                    'is_read': is_read,
-                    'is_today': is_today
-                })
-            months.append(month_data)
+    # A naptár váza (napok, sorszámok, olvasmány jelzés) tervenként és kezdő dátumonként
+    # egyszer készül; az oldal csak a hónap kereteket tartalmazza, a napokat
+    # a böngésző tölti be hónaponként az /api/calendar végpontról
+    months = plan_index.calendar(start_date)
     
     return render_template('calendar.html',
                          months=months,
+                         current_month=date.today().strftime('%Y-%m'),
+                         daily_url=url_for('bible.daily'),
                          stats=stats,
-                         total_read=len(user_reading_log),
+                         total_read=progress.count(),
                          start_date=start_date.strftime('%Y-%m-%d'),
-                         numbered_plan=numbered_plan)
+                         numbered_plan=plan_index.numbered)
+
+
+def _parse_month(value):
+    """'YYYY-MM' -> (év, hónap); hiányzó értéknél None, hibásnál ValueError"""
+    if not value:
+        return None
+    parsed = datetime.strptime(value, '%Y-%m')
+    return parsed.year, parsed.month
+
+
+@bible_bp.route('/api/calendar')
+@login_required
+def api_calendar():
+    """
+    Naptár hónapok tömör formában.
+    
+    Query paraméterek: from, to (YYYY-MM, mindkettő zárt és elhagyható)
+    Válasz hónaponként: {"key": "2025-01", "name", "days": napok száma,
+    "day_base": az 1. nap sorszáma (számozott terv, egyébként null),
+    "has_reading": bitmaszk, "is_read": bitmaszk} - az i. bit a hónap (i+1). napja.
+    
+    A váz a terv indexéből jön, csak az olvasottság maszkja kérés függő; az ETag
+    miatt a böngésző változatlan hónapoknál 304-et kap.
+    """
+    try:
+        first = _parse_month(request.args.get('from'))
+        last = _parse_month(request.args.get('to'))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Hibás hónap (YYYY-MM)'}), 400
+    
+    plan_id = session.get('plan_id')
+    plan_index = load_plan_index(plan_id)
+    start_date = get_plan_start_date(plan_id)
+    progress = get_reading_progress(session['user_id'], plan_id)
+    
+    months = []
+    for month in plan_index.calendar(start_date):
+        key = (month.year, month.month)
+        if (first and key < first) or (last and key > last):
+            continue
+        months.append({
+            'key': f'{month.year}-{month.month:02d}',
+            'name': month.name,
+            'days': len(month.days),
+            'day_base': month.day_base,
+            'has_reading': month.reading_mask,
+            'is_read': progress.mask(date(month.year, month.month, 1), len(month.days))
+        })
+    
+    response = jsonify({
+        'success': True,
+        'numbered': plan_index.numbered,
+        'today': date.today().isoformat(),
+        'months': months
+    })
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.add_etag()
+    return response.make_conditional(request)
 
 # API végpontok
 @bible_bp.route('/api/comment', methods=['POST'])
@@ -492,12 +409,23 @@ def api_delete_highlight(highlight_id):
 @login_required
 def api_mark_read():
     """Nap megjelölése olvasottként"""
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     date_str = data.get('date')
     is_read = data.get('is_read', True)
     
     plan_id = session.get('plan_id')
     
+    # Csak YYYY-MM-DD formátumú, a terv időszakába eső dátum jelölhető
+    try:
+        target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        target_date = None
+    if target_date is None or target_date.isoformat() != date_str:
+        return jsonify({'success': False, 'error': 'Hibás dátum (YYYY-MM-DD)'}), 400
+    first, last = load_plan_index(plan_id).date_range(get_plan_start_date(plan_id))
+    if not first <= target_date <= last:
+        return jsonify({'success': False, 'error': 'A dátum a terv időszakán kívül esik'}), 400
+    
     if is_read:
         mark_day_as_read(session['user_id'], plan_id, date_str)
     else:
@@ -506,6 +434,52 @@ def api_mark_read():
     return jsonify({'success': True})
 
 
+def resolve_verses(reference, translation):
+    """Versek lekérése a beállított forrásból és a válasz összeállítása (JSON-kész dict)"""
+    bible_source = current_app.config.get('BIBLE_SOURCE', 'api')
+    
+    # Kész válaszok szakasz és fordítás szerint - a szöveg nem változik
+    rendered_verses_cache = get_rendered_verses_cache(current_app.config)
+    memo_key = (bible_source, reference_key(reference) or reference, translation)
+    payload = rendered_verses_cache.get(memo_key)
+    if payload is not None:
+        return payload
+    
+    payload = _build_verses_payload(bible_source, reference, translation)
+    # Lejárt gyorsítótárból adott választ nem memoizálunk (a háttérben frissül)
+    if payload['success'] and not payload['stale']:
+        rendered_verses_cache.put(memo_key, payload)
+    return payload
+
+
+def _build_verses_payload(bible_source, reference, translation):
+    if bible_source == 'api':
+        # szentiras.eu API használata
+        result = fetch_verses_from_api(reference, translation)
+        source = 'szentiras.eu'
+    else:
+        # Helyi, indexelt szöveg tároló
+        result = fetch_verses_from_local(get_local_bible(current_app.config), reference, translation)
+        source = 'local'
+    
+    if result['success']:
+        return {
+            'success': True,
+            'html': format_verses_html(result),
+            'verses': result['verses'],
+            'full_reference': result['full_reference'],
+            'source': source,
+            'translation': translation,
+            'stale': result.get('stale', False)
+        }
+    return {
+        'success': False,
+        'error': result.get('error', 'Ismeretlen hiba'),
+        'html': f'<p class="text-muted"><i class="bi bi-info-circle"></i> {result.get("error", "Nem sikerült betölteni")}</p>',
+        'reference': reference
+    }
+
+
 @bible_bp.route('/api/verses/<path:reference>')
 @login_required
 def api_get_verses(reference):
@@ -516,39 +490,144 @@ def api_get_verses(reference):
     Query paraméterek:
         - translation: Fordítás kódja (SZIT, RUF, KG, stb.)
     """
-    bible_source = current_app.config.get('BIBLE_SOURCE', 'api')
-    
     # Fordítás a query paraméterből vagy alapértelmezettből
     translation = request.args.get('translation', current_app.config.get('BIBLE_TRANSLATION', 'SZIT'))
+    return jsonify(resolve_verses(reference, translation))
+
+
+# Közös, korlátos szálkészlet a kötegelt lekérésekhez (fork után újra létrejön)
+_verse_executor = PoolHolder(
+    lambda: ThreadPoolExecutor(max_workers=Config.VERSE_BATCH_WORKERS, thread_name_prefix='verses')
+)
+
+
+def _resolve_in_app_context(app, reference, translation):
+    with app.app_context():
+        return resolve_verses(reference, translation)
+
+
+def _resolve_many(jobs):
+    """
+    Több (hivatkozás, fordítás) pár feloldása: {kulcs: (hivatkozás, fordítás)} -> {kulcs: válasz}.
     
-    if bible_source == 'api':
-        # szentiras.eu API használata
-        result = fetch_verses_from_api(reference, translation)
-        
-        if result['success']:
-            return jsonify({
-                'success': True,
-                'html': format_verses_html(result),
-                'verses': result['verses'],
-                'full_reference': result['full_reference'],
-                'source': 'szentiras.eu',
-                'translation': translation
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'error': result.get('error', 'Ismeretlen hiba'),
-                'html': f'<p class="text-muted"><i class="bi bi-info-circle"></i> {result.get("error", "Nem sikerült betölteni")}</p>',
-                'reference': reference
-            })
-    else:
-        # Helyi adatbázis (még nincs implementálva)
-        return jsonify({
-            'success': False,
-            'error': 'Helyi adatbázis még nincs implementálva',
-            'html': '<p class="text-muted"><i class="bi bi-info-circle"></i> Helyi adatbázis még nincs implementálva</p>',
-            'reference': reference
-        })
+    API forrás esetén a közös szálkészleten párhuzamosan, így a válaszidő
+    a leglassabb lekérés ideje, nem az összegük.
+    """
+    if current_app.config.get('BIBLE_SOURCE', 'api') == 'api' and len(jobs) > 1:
+        app = current_app._get_current_object()
+        executor = _verse_executor.get()
+        futures = {
+            key: executor.submit(_resolve_in_app_context, app, reference, translation)
+            for key, (reference, translation) in jobs.items()
+        }
+        return {key: future.result() for key, future in futures.items()}
+    # Helyi forrás: egy indexelt lekérdezés szakaszonként, nincs mit párhuzamosítani
+    return {key: resolve_verses(reference, translation) for key, (reference, translation) in jobs.items()}
+
+
+def _parse_references(data):
+    """A kérés hivatkozás listája - hibás kérésnél (None, hibaüzenet)"""
+    references = data.get('references')
+    if not isinstance(references, list) or not all(isinstance(r, str) for r in references):
+        return None, 'Hiányzó vagy hibás hivatkozás lista'
+    max_references = current_app.config.get('VERSE_BATCH_MAX_REFERENCES', 12)
+    if len(references) > max_references:
+        return None, f'Legfeljebb {max_references} hivatkozás kérhető egyszerre'
+    return references, None
+
+
+def _unique_references(references):
+    """Hivatkozások kulcsai és a kulcsonként első hivatkozás (eltérő írásmód esetén is egyszer)"""
+    keys = [reference_key(ref) or ref for ref in references]
+    unique_refs = {}
+    for ref, key in zip(references, keys):
+        unique_refs.setdefault(key, ref)
+    return keys, unique_refs
+
+
+@bible_bp.route('/api/verses/batch', methods=['POST'])
+@login_required
+def api_get_verses_batch():
+    """
+    Egy nap összes szakaszának lekérése egyetlen kéréssel.
+    
+    Kérés: {"references": ["1Móz 1-3", "Mt 5:1-12", ...], "translation": "SZIT"}
+    Válasz: {"success": true, "results": [...]} - a hivatkozásokkal azonos sorrendben,
+    elemenként az /api/verses/<reference> válaszával megegyező formátumban.
+    
+    API forrás esetén a szakaszokat párhuzamosan kérjük le, így a válaszidő
+    a leglassabb szakasz ideje, nem az összegük.
+    """
+    data = request.get_json(silent=True) or {}
+    translation = data.get('translation') or current_app.config.get('BIBLE_TRANSLATION', 'SZIT')
+    references, error = _parse_references(data)
+    if error:
+        return jsonify({'success': False, 'error': error}), 400
+    
+    keys, unique_refs = _unique_references(references)
+    resolved = _resolve_many({key: (ref, translation) for key, ref in unique_refs.items()})
+    
+    return jsonify({
+        'success': True,
+        'translation': translation,
+        'results': [resolved[key] for key in keys]
+    })
+
+
+@bible_bp.route('/api/verses/parallel', methods=['POST'])
+@login_required
+def api_get_verses_parallel():
+    """
+    Párhuzamos olvasás: ugyanazon szakaszok több fordításban, versenként összefésülve.
+    
+    Kérés: {"references": ["Mt 5:1-12", ...], "translations": ["SZIT", "RUF", "KG"]}
+    Válasz: {"success": true, "translations": [...], "results": [...]} - hivatkozásonként
+    {"success", "reference", "full_reference", "rows": [{"chapter", "verse", "reference",
+    "texts": {fordítás: szöveg}}], "errors": {fordítás: hibaüzenet}}.
+    
+    Minden (szakasz, fordítás) pár ugyanazon a gyorsítótáron és szálkészleten megy
+    át, mint a kötegelt lekérés, így meleg gyorsítótárral a többi fordítás szinte ingyen van.
+    """
+    data = request.get_json(silent=True) or {}
+    references, error = _parse_references(data)
+    if error:
+        return jsonify({'success': False, 'error': error}), 400
+    
+    translations = data.get('translations')
+    available = get_available_translations()
+    if not isinstance(translations, list) or not translations:
+        return jsonify({'success': False, 'error': 'Hiányzó vagy hibás fordítás lista'}), 400
+    # Ismétlődések nélkül, a kért sorrendben
+    translations = list(dict.fromkeys(translations))
+    unknown = [t for t in translations if not isinstance(t, str) or t not in available]
+    if unknown:
+        return jsonify({'success': False, 'error': f'Ismeretlen fordítás: {", ".join(map(str, unknown))}'}), 400
+    
+    keys, unique_refs = _unique_references(references)
+    resolved = _resolve_many({
+        (key, translation): (ref, translation)
+        for key, ref in unique_refs.items()
+        for translation in translations
+    })
+    
+    aligned = {}
+    for key, ref in unique_refs.items():
+        payloads = {translation: resolved[(key, translation)] for translation in translations}
+        succeeded = {t: p for t, p in payloads.items() if p['success']}
+        aligned[key] = {
+            'success': bool(succeeded),
+            'reference': ref,
+            'full_reference': next((p['full_reference'] for p in succeeded.values()), ref),
+            'rows': align_verses({t: p['verses'] for t, p in succeeded.items()}),
+            'errors': {t: p['error'] for t, p in payloads.items() if not p['success']},
+            'stale': any(p.get('stale') for p in succeeded.values())
+        }
+    
+    return jsonify({
+        'success': True,
+        'translations': translations,
+        'results': [aligned[key] for key in keys]
+    })
 
 
 @bible_bp.route('/api/bible-source')
@@ -575,27 +654,24 @@ def api_translations():
     })
 
 
-@bible_bp.route('/my-notes')
-@login_required
-def my_notes():
-    """Saját jegyzet~ek és kiemelések oldal"""
-    user_id = session.get('user_id')
-    plan_id = session.get('plan_id')
+# Egy lapon megjelenített jegyzetek száma (a többit görgetéskor töltjük be)
+NOTES_PAGE_SIZE = 20
+
+
+def load_notes_page(user_id, plan_id, view_type, cursor=None):
+    """
+    Jegyzetek egy lapjának betöltése kurzor alapú lapozással.
     
-    # Nézet típusa: 'all', 'comments', 'highlights'
-    view_type = request.args.get('view', 'all')
+    Returns:
+        tuple: (jegyzetek listája, következő lap kurzora vagy None)
+    """
+    # Eggyel többet kérünk le, így tudjuk, van-e következő lap
+    limit = NOTES_PAGE_SIZE + 1
     
+    # A reakció- és válaszszámok a denormalizált számlálókból jönnek (reactions tábla nélkül)
     if view_type == 'comments':
-        raw_notes = get_user_comments(user_id, plan_id)
-        comment_ids = [note['id'] for note in raw_notes]
-        
-        # Batch query: összes válasz egyszerre
-        replies_map = get_replies_for_comments(comment_ids) if comment_ids else {}
-        # Batch query: összes reakció egyszerre
-        reactions_map = get_reactions_for_targets('comment', comment_ids) if comment_ids else {}
-        
         notes = []
-        for note in raw_notes:
+        for note in get_user_comments(user_id, plan_id, limit=limit, cursor=cursor):
             notes.append({
                 'type': 'comment',
                 'id': note['id'],
@@ -606,21 +682,12 @@ def my_notes():
                 'color': None,
                 'created_at': note['created_at'],
                 'is_private': note.get('is_private', False),
-                'reaction_count': len(reactions_map.get(note['id'], [])),
-                'reply_count': len(replies_map.get(note['id'], []))
+                'reaction_count': note.get('reaction_count', 0),
+                'reply_count': note.get('reply_count', 0)
             })
-        total_comments = len(raw_notes)
-        total_highlights = len(get_user_highlights(user_id, plan_id))
-        
     elif view_type == 'highlights':
-        raw_notes = get_user_highlights(user_id, plan_id)
-        highlight_ids = [note['id'] for note in raw_notes]
-        
-        # Batch query: összes reakció egyszerre
-        reactions_map = get_reactions_for_targets('highlight', highlight_ids) if highlight_ids else {}
-        
         notes = []
-        for note in raw_notes:
+        for note in get_user_highlights(user_id, plan_id, limit=limit, cursor=cursor):
             notes.append({
                 'type': 'highlight',
                 'id': note['id'],
@@ -631,43 +698,60 @@ def my_notes():
                 'color': note.get('color', 'yellow'),
                 'created_at': note['created_at'],
                 'is_private': note.get('is_private', False),
-                'reaction_count': len(reactions_map.get(note['id'], []))
+                'reaction_count': note.get('reaction_count', 0)
             })
-        total_comments = len(get_user_comments(user_id, plan_id))
-        total_highlights = len(raw_notes)
-        
     else:
-        raw_notes = get_user_notes_combined(user_id, plan_id)
-        comment_ids = [note['id'] for note in raw_notes if note['type'] == 'comment']
-        highlight_ids = [note['id'] for note in raw_notes if note['type'] == 'highlight']
-        
-        # Batch queries: összes reakció és válasz egyszerre
-        comments_reactions_map = get_reactions_for_targets('comment', comment_ids) if comment_ids else {}
-        highlights_reactions_map = get_reactions_for_targets('highlight', highlight_ids) if highlight_ids else {}
-        replies_map = get_replies_for_comments(comment_ids) if comment_ids else {}
-        
-        notes = []
-        for note in raw_notes:
-            note_data = dict(note)
-            if note['type'] == 'comment':
-                note_data['reaction_count'] = len(comments_reactions_map.get(note['id'], []))
-                note_data['reply_count'] = len(replies_map.get(note['id'], []))
-            else:
-                note_data['reaction_count'] = len(highlights_reactions_map.get(note['id'], []))
-                note_data['reply_count'] = 0
-            notes.append(note_data)
-        
-        total_comments = len(comment_ids)
-        total_highlights = len(highlight_ids)
+        notes = get_user_notes_combined(user_id, plan_id, limit=limit, cursor=cursor)
+    
+    next_cursor = None
+    if len(notes) > NOTES_PAGE_SIZE:
+        notes = notes[:NOTES_PAGE_SIZE]
+        next_cursor = encode_notes_cursor(notes[-1])
+    return notes, next_cursor
+
+
+@bible_bp.route('/my-notes')
+@login_required
+def my_notes():
+    """Saját jegyzet~ek és kiemelések oldal (első lap, a többi görgetéskor töltődik)"""
+    user_id = session.get('user_id')
+    plan_id = session.get('plan_id')
+    
+    # Nézet típusa: 'all', 'comments', 'highlights'
+    view_type = request.args.get('view', 'all')
+    
+    notes, next_cursor = load_notes_page(user_id, plan_id, view_type)
+    totals = count_user_notes(user_id, plan_id)
     
     return render_template('my_notes.html',
                          notes=notes,
+                         next_cursor=next_cursor,
                          view_type=view_type,
-                         total_comments=total_comments,
-                         total_highlights=total_highlights,
+                         total_comments=totals['comments'],
+                         total_highlights=totals['highlights'],
                          username=session.get('username'))
 
 
+@bible_bp.route('/api/my-notes')
+@login_required
+def api_my_notes():
+    """Jegyzetek következő lapja (végtelen görgetéshez)"""
+    view_type = request.args.get('view', 'all')
+    try:
+        cursor = decode_notes_cursor(request.args.get('cursor'))
+    except InvalidCursor:
+        return jsonify({'success': False, 'error': 'Érvénytelen kurzor'}), 400
+    
+    notes, next_cursor = load_notes_page(session.get('user_id'), session.get('plan_id'), view_type, cursor)
+    
+    return jsonify({
+        'success': True,
+        'html': render_template('my_notes_items.html', notes=notes),
+        'count': len(notes),
+        'next_cursor': next_cursor
+    })
+
+
 @bible_bp.route('/export/highlights.pdf')
 @login_required
 def export_highlights_pdf():
@@ -2,7 +2,12 @@
 from .bible_api import (
     fetch_verses_from_api, 
     format_verses_html, 
+    align_verses,
     normalize_reference,
+    normalize_book_name,
+    parse_reference,
     get_available_translations,
     AVAILABLE_TRANSLATIONS
 )
+from .local_bible import fetch_verses_from_local, get_local_bible
+from .reference_parser import InvalidReference, ParsedReference, reference_key
@@ -3,10 +3,25 @@ Szentírás API szolgáltatás
 Forrás: https://szentiras.hu/api
 """
 
+import logging
 import requests
+import os
 import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from flask import current_app
 
+from .http_client import CircuitBreaker, CircuitOpenError, get_upstream_client
+from .reference_parser import (
+    InvalidReference, normalize_book_name, normalize_reference, parse_reference
+)
+from .single_flight import SingleFlight
+from .verse_cache import get_verse_cache
+
+logger = logging.getLogger(__name__)
+
 # Elérhető fordítások
 AVAILABLE_TRANSLATIONS = {
     'SZIT': {
@@ -47,6 +62,18 @@ def get_available_translations():
     return AVAILABLE_TRANSLATIONS
 
 
+# Előre fordított minták a vers feldolgozáshoz és megjelenítéshez
+_UPPER = r'A-ZÁÉÍÓÖŐÚÜŰ'
+_LOWER = r'a-záéíóöőúüű'
+_TAG_RE = re.compile(r'<[^>]+>')
+_MAJOR_HEADING_RE = re.compile(
+    rf'^((?:[IVXLC]+\.?\s*)?[{_UPPER}][{_UPPER}\s,\'\-]*[{_UPPER}])(?=[{_UPPER}](?:[{_LOWER}]|\s[{_LOWER}]))'
+)
+_SUBTITLE_RE = re.compile(rf'^([{_UPPER}][^.]{{1,80}}\.)(?=[{_UPPER}])')
+_LETTER_RE = re.compile(r'[^\W\d_]')
+_SECTION_SPAN_RE = re.compile(r'<span class="section-(?:heading|title)">.*?</span>\s*')
+
+
 def process_verse_html(text):
     """
     Feldolgozza a vers szöveget.
@@ -61,151 +88,118 @@ def process_verse_html(text):
         return ''
     
     # HTML tagek eltávolítása (az új API nem küld HTML-t, de biztos ami biztos)
-    text = re.sub(r'<[^>]+>', '', text)
+    if '<' in text:
+        text = _TAG_RE.sub('', text)
     
     parts = []
     
     # 1. Fő cím: CSUPA NAGYBETŰS szöveg az elején (pl. "I. JÉZUS KRISZTUS SZÜLETÉSE ÉS GYERMEKKORA")
-    _upper = r'A-ZÁÉÍÓÖŐÚÜŰ'
-    _lower = r'a-záéíóöőúüű'
-    major_match = re.match(
-        rf'^((?:[IVXLC]+\.?\s*)?[{_upper}][{_upper}\s,\'\-]*[{_upper}])(?=[{_upper}](?:[{_lower}]|\s[{_lower}]))',
-        text
-    )
+    major_match = _MAJOR_HEADING_RE.match(text)
     if major_match:
         heading_text = major_match.group(1).strip()
-        alpha_chars = [c for c in heading_text if c.isalpha()]
-        if len(alpha_chars) >= 3 and all(c.isupper() for c in alpha_chars):
+        letters = _LETTER_RE.findall(heading_text)
+        if len(letters) >= 3 and heading_text == heading_text.upper():
             parts.append(f'<span class="section-heading">{heading_text}</span>')
             text = text[major_match.end():]
     
     # 2. Alcím: rövid mondat ponttal lezárva, közvetlenül nagybetű követi (pl. "Jézus ősei.")
-    subtitle_match = re.match(
-        rf'^([{_upper}][^.]{{1,80}}\.)(?=[{_upper}])',
-        text
-    )
+    subtitle_match = _SUBTITLE_RE.match(text)
     if subtitle_match:
-        subtitle = subtitle_match.group(1)
-        parts.append(f'<span class="section-title">{subtitle}</span>')
+        parts.append(f'<span class="section-title">{subtitle_match.group(1)}</span>')
         text = text[subtitle_match.end():]
     
+    if not parts:
+        return text
     parts.append(text)
     return ''.join(parts)
 
 
-# Könyv nevek átalakítása az API formátumra
-BOOK_MAPPINGS = {
-    # Ószövetség
-    '1mózes': '1Móz', '1móz': '1Móz', 'genezis': '1Móz', 'ter': '1Móz',
-    '2mózes': '2Móz', '2móz': '2Móz', 'exodus': '2Móz', 'kiv': '2Móz',
-    '3mózes': '3Móz', '3móz': '3Móz', 'leviticus': '3Móz', 'lev': '3Móz',
-    '4mózes': '4Móz', '4móz': '4Móz', 'numeri': '4Móz', 'szám': '4Móz',
-    '5mózes': '5Móz', '5móz': '5Móz', 'deuteronomium': '5Móz', 'mtörv': '5Móz',
-    'józsué': 'Józs', 'józs': 'Józs',
-    'bírák': 'Bír', 'bír': 'Bír',
-    'ruth': 'Ruth', 'rut': 'Ruth',
-    '1sámuel': '1Sám', '1sám': '1Sám',
-    '2sámuel': '2Sám', '2sám': '2Sám',
-    '1királyok': '1Kir', '1kir': '1Kir',
-    '2királyok': '2Kir', '2kir': '2Kir',
-    '1krónikák': '1Krón', '1krón': '1Krón',
-    '2krónikák': '2Krón', '2krón': '2Krón',
-    'ezsdrás': 'Ezsd', 'ezsd': 'Ezsd',
-    'nehémiás': 'Neh', 'neh': 'Neh',
-    'eszter': 'Eszt', 'eszt': 'Eszt',
-    'jób': 'Jób',
-    'zsoltárok': 'Zsolt', 'zsoltár': 'Zsolt', 'zsolt': 'Zsolt',
-    'példabeszédek': 'Péld', 'péld': 'Péld',
-    'prédikátor': 'Préd', 'préd': 'Préd',
-    'énekek éneke': 'Én', 'én': 'Én',
-    'ézsaiás': 'Ézs', 'ézs': 'Ézs', 'izajás': 'Ézs',
-    'jeremiás': 'Jer', 'jer': 'Jer',
-    'siralmak': 'Siral', 'jsir': 'Siral',
-    'ezékiel': 'Ez', 'ez': 'Ez',
-    'dániel': 'Dán', 'dán': 'Dán',
-    'hóseás': 'Hós', 'hós': 'Hós',
-    'jóel': 'Jóel',
-    'ámósz': 'Ám', 'ám': 'Ám',
-    'abdiás': 'Abd', 'abd': 'Abd',
-    'jónás': 'Jón', 'jón': 'Jón',
-    'mikeás': 'Mik', 'mik': 'Mik',
-    'náhum': 'Náh', 'náh': 'Náh',
-    'habakuk': 'Hab', 'hab': 'Hab',
-    'zofóniás': 'Zof', 'zof': 'Zof',
-    'haggeus': 'Hag', 'hag': 'Hag',
-    'zakariás': 'Zak', 'zak': 'Zak',
-    'malakiás': 'Mal', 'mal': 'Mal',
-    
-    # Újszövetség
-    'máté': 'Mt', 'mt': 'Mt',
-    'márk': 'Mk', 'mk': 'Mk',
-    'lukács': 'Lk', 'lk': 'Lk',
-    'jános': 'Jn', 'jn': 'Jn',
-    'apostolok cselekedetei': 'ApCsel', 'apcsel': 'ApCsel', 'csel': 'ApCsel',
-    'róma': 'Róm', 'róm': 'Róm', 'rómaiakhoz': 'Róm',
-    '1korinthus': '1Kor', '1kor': '1Kor',
-    '2korinthus': '2Kor', '2kor': '2Kor',
-    'galata': 'Gal', 'gal': 'Gal',
-    'efezus': 'Ef', 'ef': 'Ef',
-    'filippi': 'Fil', 'fil': 'Fil',
-    'kolossé': 'Kol', 'kol': 'Kol',
-    '1thesszalonika': '1Thessz', '1thessz': '1Thessz',
-    '2thesszalonika': '2Thessz', '2thessz': '2Thessz',
-    '1timóteus': '1Tim', '1tim': '1Tim',
-    '2timóteus': '2Tim', '2tim': '2Tim',
-    'titusz': 'Tit', 'tit': 'Tit',
-    'filemon': 'Filem', 'filem': 'Filem',
-    'zsidók': 'Zsid', 'zsid': 'Zsid',
-    'jakab': 'Jak', 'jak': 'Jak',
-    '1péter': '1Pt', '1pt': '1Pt',
-    '2péter': '2Pt', '2pt': '2Pt',
-    '1jános': '1Jn', '1jn': '1Jn',
-    '2jános': '2Jn', '2jn': '2Jn',
-    '3jános': '3Jn', '3jn': '3Jn',
-    'júdás': 'Júd', 'júd': 'Júd',
-    'jelenések': 'Jel', 'jel': 'Jel',
-}
+# Folyamaton belüli kérés összevonás (normalizált hivatkozás, fordítás) kulccsal
+_single_flight = SingleFlight()
 
 
-def normalize_reference(reference):
+def _get_cache():
+    """Vers gyorsítótár az aktuális alkalmazás beállításaival (None, ha ki van kapcsolva)"""
+    try:
+        return get_verse_cache(current_app.config)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("Vers gyorsítótár nem elérhető: %s", e)
+        return None
+
+
+def is_cache_only():
     """
-    Átalakítja a hivatkozást az API által elfogadott formátumra.
-    Pl: "1Mózes 1-3" -> "1Móz1-3"
+    Csak gyorsítótárból szolgálunk ki: beállítás (VERSE_CACHE_ONLY), vagy
+    automatikusan, amíg az API megszakítója nyitva van.
     """
-    if not reference:
-        return None
-    
-    # Tisztítás
-    ref = reference.strip()
-    
-    # Próbáljuk megtalálni a könyv nevét és a fejezet/vers számokat
-    # Minta: "1Mózes 1-3" vagy "Máté 5:1-26" vagy "Zsoltár 1"
+    if current_app.config.get('VERSE_CACHE_ONLY'):
+        return True
+    return get_upstream_client(current_app.config).breaker.state == CircuitBreaker.OPEN
+
+
+def _is_stale(cached):
+    """Lejárt-e a bejegyzés frissessége (VERSE_CACHE_TTL mp, 0 = soha)"""
+    ttl = current_app.config.get('VERSE_CACHE_TTL', 0)
+    return bool(ttl) and time.time() - (cached.get('fetched_at') or 0) > ttl
+
+
+def _cache_only_result(reference):
+    return {
+        'success': False,
+        'error': 'A szentírás API átmenetileg nem elérhető, és ez a szakasz nincs a gyorsítótárban',
+        'verses': [],
+        'full_reference': reference
+    }
+
+
+# Háttérben futó frissítések (stale-while-revalidate) - folyamatonként, fork után újra létrejön
+_refresh_lock = threading.Lock()
+_refreshing = set()
+_refresh_executor = None
+_refresh_pid = None
+
+
+def _schedule_refresh(cache, api_ref, translation, store):
+    """Lejárt bejegyzés frissítése a háttérben (kulcsonként egyszerre csak egy)"""
+    global _refresh_executor, _refresh_pid
+    key = f'{api_ref}|{translation}'
+    with _refresh_lock:
+        if key in _refreshing:
+            return
+        if _refresh_executor is None or _refresh_pid != os.getpid():
+            _refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='verse-refresh')
+            _refresh_pid = os.getpid()
+            _refreshing.clear()
+        _refreshing.add(key)
+        executor = _refresh_executor
     
-    # Számmal kezdődő könyvek kezelése (1Mózes, 2Királyok, stb.)
-    match = re.match(r'^(\d?\s*[A-Za-zÁÉÍÓÖŐÚÜŰáéíóöőúüű]+)\s*(.*)$', ref, re.IGNORECASE)
+    app = current_app._get_current_object()
     
-    if match:
-        book_name = match.group(1).strip().lower()
-        chapter_verse = match.group(2).strip()
-        
-        # Könyv név normalizálása
-        # Távolítsuk el a szóközöket a számok és betűk között
-        book_name = re.sub(r'(\d)\s+', r'\1', book_name)
-        
-        # Keressük meg a megfelelő API könyv nevet
-        api_book = None
-        for key, value in BOOK_MAPPINGS.items():
-            if book_name == key or book_name.startswith(key):
-                api_book = value
-                break
-        
-        if api_book:
-            # Összeállítjuk az API hivatkozást (szóköz nélkül)
-            return f"{api_book}{chapter_verse}"
+    def run():
+        try:
+            with app.app_context():
+                _revalidate(cache, api_ref, translation, store)
+        except Exception as e:
+            logger.warning("Háttér frissítés hiba (%s): %s", key, e)
+        finally:
+            with _refresh_lock:
+                _refreshing.discard(key)
     
-    # Ha nem sikerült feldolgozni, próbáljuk közvetlenül
-    # Eltávolítjuk a szóközöket
-    return ref.replace(' ', '')
+    executor.submit(run)
+
+
+def _revalidate(cache, api_ref, translation, store):
+    """Egy bejegyzés újratöltése az API-ból (ha egy másik worker már frissíti, kihagyjuk)"""
+    key = f'{api_ref}|{translation}'
+    owner = cache.try_lock(key, current_app.config.get('VERSE_FETCH_LOCK_TIMEOUT', 15))
+    if owner is None:
+        return
+    try:
+        result = _fetch_from_upstream(api_ref, api_ref, translation)
+        if result['success']:
+            store(result)
+    finally:
+        cache.unlock(key, owner)
 
 
 def fetch_verses_from_api(reference, translation='SZIT'):
@@ -221,11 +215,18 @@ def fetch_verses_from_api(reference, translation='SZIT'):
             'success': bool,
             'verses': [{'text': str, 'reference': str}],
             'full_reference': str,
-            'error': str (ha hiba történt)
+            'error': str (ha hiba történt),
+            'stale': bool (lejárt gyorsítótár bejegyzésből, a háttérben frissül)
         }
     """
+    # Tartós gyorsítótár: a szöveg egy fordításban sosem változik
+    cache = _get_cache()
+    cache_only = is_cache_only()
+    
     try:
-        # Hivatkozás normalizálása
+        parsed = parse_reference(reference)
+    except InvalidReference:
+        # Nem szeletelhető hivatkozás: egészben kérjük le és tároljuk
         api_ref = normalize_reference(reference)
         if not api_ref:
             return {
@@ -234,7 +235,223 @@ def fetch_verses_from_api(reference, translation='SZIT'):
                 'verses': [],
                 'full_reference': reference
             }
-        
+        return _fetch_passage(cache, reference, api_ref, translation, cache_only)
+    
+    # Egész fejezeteket kérünk le és tárolunk, a kért tartományokat ezekből vágjuk ki
+    verses = []
+    stale = False
+    for passage in parsed.passages:
+        chapters = _load_chapters(
+            cache, reference, passage.book, passage.start[0], passage.stop[0], translation, cache_only
+        )
+        if not chapters['success']:
+            return chapters
+        stale = stale or chapters['stale']
+        verses.extend(v for v in chapters['verses'] if passage.contains(v['chapter'], v['verse']))
+    
+    if not verses:
+        return {
+            'success': False,
+            'error': 'Nem található vers',
+            'verses': [],
+            'full_reference': reference
+        }
+    return {
+        'success': True,
+        'verses': verses,
+        'full_reference': verses[0]['reference'] or reference,
+        'error': None,
+        'stale': stale
+    }
+
+
+def _cache_get(cache, api_ref, translation):
+    if cache is None:
+        return None
+    try:
+        return cache.get(api_ref, translation)
+    except sqlite3.Error as e:
+        logger.warning("Vers gyorsítótár hiba: %s", e)
+        return None
+
+
+def _cache_put(cache, api_ref, translation, verses, full_reference):
+    try:
+        cache.put(api_ref, translation, verses, full_reference)
+    except sqlite3.Error as e:
+        logger.warning("Vers gyorsítótár hiba: %s", e)
+
+
+def _cached_result(cached, stale=False):
+    return {
+        'success': True,
+        'verses': cached['verses'],
+        'full_reference': cached['full_reference'],
+        'error': None,
+        'stale': stale
+    }
+
+
+# Fejezet és vers szám a szép hivatkozás végén (pl. "Mt 5,3")
+_LOCATION_RE = re.compile(r'(\d+),(\d+)\D*$')
+
+
+def _verse_location(reference):
+    """Fejezet és vers szám a szép hivatkozásból (pl. "Mt 5,3" -> (5, 3))"""
+    match = _LOCATION_RE.search(reference or '')
+    if not match:
+        return None, None
+    return int(match.group(1)), int(match.group(2))
+
+
+def _with_location(verses):
+    """Fejezet/vers számok pótlása (korábban, számok nélkül tárolt bejegyzésekhez)"""
+    for verse in verses:
+        if 'chapter' not in verse:
+            verse['chapter'], verse['verse'] = _verse_location(verse.get('reference'))
+    return verses
+
+
+def _chapter_key(book, chapter):
+    return f'{book}{chapter}'
+
+
+def _lookup_chapters(cache, book, first, last, translation):
+    """A fejezetek versei a gyorsítótárból - None, ha bármelyik hiányzik"""
+    verses = []
+    for chapter in range(first, last + 1):
+        cached = _cache_get(cache, _chapter_key(book, chapter), translation)
+        if not cached:
+            return None
+        verses.extend(_with_location(cached['verses']))
+    return {'success': True, 'verses': verses, 'full_reference': None, 'error': None}
+
+
+def _store_chapters(cache, book, translation, verses):
+    """Lekért versek tárolása fejezetenként"""
+    by_chapter = {}
+    for verse in verses:
+        if verse['chapter'] is not None:
+            by_chapter.setdefault(verse['chapter'], []).append(verse)
+    for chapter, chapter_verses in by_chapter.items():
+        _cache_put(cache, _chapter_key(book, chapter), translation, chapter_verses, chapter_verses[0]['reference'])
+
+
+def _load_chapters(cache, reference, book, first, last, translation, cache_only=False):
+    """
+    Egy fejezet tartomány összes verse: a gyorsítótárban lévő fejezetek onnan,
+    a hiányzók egyetlen upstream lekéréssel (pl. "Mt5-6").
+    A lejárt fejezeteket azonnal kiszolgáljuk, és a háttérben frissítjük.
+    """
+    found = {}
+    missing = []
+    stale = []
+    for chapter in range(first, last + 1):
+        cached = _cache_get(cache, _chapter_key(book, chapter), translation)
+        if cached:
+            found[chapter] = _with_location(cached['verses'])
+            if _is_stale(cached):
+                stale.append(chapter)
+        else:
+            missing.append(chapter)
+    
+    if missing:
+        if cache_only:
+            return _cache_only_result(reference)
+        lo, hi = missing[0], missing[-1]
+        span = _chapter_key(book, lo) if lo == hi else f'{book}{lo}-{hi}'
+        # Azonos, egyidejű lekérések összevonása (a reggeli csúcsban mindenki ugyanazt kéri)
+        result = _single_flight.do(
+            (span, translation),
+            lambda: _fetch_coalesced(
+                cache, reference, span, translation,
+                lookup=lambda: _lookup_chapters(cache, book, lo, hi, translation),
+                store=lambda r: _store_chapters(cache, book, translation, r['verses'])
+            )
+        )
+        if not result['success']:
+            return result
+        fetched = {}
+        for verse in result['verses']:
+            fetched.setdefault(verse['chapter'], []).append(verse)
+        for chapter in missing:
+            if chapter in fetched:
+                found[chapter] = fetched[chapter]
+    
+    if stale and not cache_only:
+        lo, hi = stale[0], stale[-1]
+        span = _chapter_key(book, lo) if lo == hi else f'{book}{lo}-{hi}'
+        _schedule_refresh(cache, span, translation, lambda r: _store_chapters(cache, book, translation, r['verses']))
+    
+    verses = [v for chapter in range(first, last + 1) for v in found.get(chapter, [])]
+    return {'success': True, 'verses': verses, 'full_reference': reference, 'error': None, 'stale': bool(stale)}
+
+
+def _fetch_passage(cache, reference, api_ref, translation, cache_only=False):
+    """Egy (fejezetekre nem bontható) hivatkozás lekérése egészben, gyorsítótárral"""
+    def store(result):
+        _cache_put(cache, api_ref, translation, result['verses'], result['full_reference'])
+    
+    def lookup():
+        cached = _cache_get(cache, api_ref, translation)
+        return _cached_result(cached) if cached else None
+    
+    cached = _cache_get(cache, api_ref, translation)
+    if cached:
+        stale = _is_stale(cached)
+        if stale and not cache_only:
+            _schedule_refresh(cache, api_ref, translation, store)
+        return _cached_result(cached, stale)
+    if cache_only:
+        return _cache_only_result(reference)
+    return _single_flight.do(
+        (api_ref, translation),
+        lambda: _fetch_coalesced(cache, reference, api_ref, translation, lookup=lookup, store=store)
+    )
+
+
+def _fetch_coalesced(cache, reference, api_ref, translation, lookup, store):
+    """
+    Upstream lekérés workerek közötti zárral: ha egy másik worker már kéri
+    ugyanezt, megvárjuk, amíg beírja az eredményt a gyorsítótárba (lookup).
+    Sikeres lekérés után a store tárolja az eredményt.
+    """
+    def fetch():
+        result = _fetch_from_upstream(reference, api_ref, translation)
+        if result['success'] and cache is not None:
+            store(result)
+        return result
+    
+    if cache is None:
+        return fetch()
+    
+    key = f'{api_ref}|{translation}'
+    timeout = current_app.config.get('VERSE_FETCH_LOCK_TIMEOUT', 15)
+    try:
+        owner = cache.try_lock(key, timeout)
+        if owner is None:
+            cached = cache.wait_for(key, lookup, timeout)
+            if cached:
+                return cached
+            owner = cache.try_lock(key, timeout)
+    except sqlite3.Error as e:
+        logger.warning("Vers gyorsítótár hiba: %s", e)
+        owner = None
+    
+    try:
+        return fetch()
+    finally:
+        if owner is not None:
+            try:
+                cache.unlock(key, owner)
+            except sqlite3.Error as e:
+                logger.warning("Vers gyorsítótár hiba: %s", e)
+
+
+def _fetch_from_upstream(reference, api_ref, translation):
+    """Egy szakasz lekérése a szentiras.hu API-ból"""
+    url = None
+    try:
         # API URL összeállítása
         api_base = current_app.config.get('BIBLE_API_URL', 'https://szentiras.hu/api')
         url = f"{api_base}/idezet/{api_ref}/{translation}"
@@ -249,9 +466,8 @@ def fetch_verses_from_api(reference, translation='SZIT'):
         if api_key:
             headers['X-API-Key'] = api_key
         
-        # Lekérés
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
+        # Lekérés a közös (keep-alive) kapcsolaton, újrapróbálkozással és megszakítóval
+        response = get_upstream_client(current_app.config).get(url, headers=headers)
         
         data = response.json()
         
@@ -278,9 +494,12 @@ def fetch_verses_from_api(reference, translation='SZIT'):
                 # HTML tagek feldolgozása - fejlécek megtartása formázottan
                 verse_text = process_verse_html(verse_text)
                 
+                chapter, verse_num = _verse_location(verse_ref)
                 verses.append({
                     'text': verse_text,
-                    'reference': verse_ref
+                    'reference': verse_ref,
+                    'chapter': chapter,
+                    'verse': verse_num
                 })
                 
                 # Az első vers helyéből vesszük a szép hivatkozást
@@ -295,7 +514,8 @@ def fetch_verses_from_api(reference, translation='SZIT'):
                 'success': True,
                 'verses': verses,
                 'full_reference': full_reference,
-                'error': None
+                'error': None,
+                'stale': False
             }
         else:
             print(f"[DEBUG] Nincs vers a válaszban!")
@@ -306,6 +526,13 @@ def fetch_verses_from_api(reference, translation='SZIT'):
                 'full_reference': reference
             }
             
+    except CircuitOpenError:
+        return {
+            'success': False,
+            'error': 'A szentírás API átmenetileg nem elérhető',
+            'verses': [],
+            'full_reference': reference
+        }
     except requests.exceptions.Timeout:
         print(f"[DEBUG] API időtúllépés: {url}")
         return {
@@ -338,6 +565,9 @@ def format_verses_html(verses_data):
     """
     Formázza a verseket HTML-ként megjelenítésre.
     
+    Egyetlen menetben dolgozik a versek fejezet/vers számaiból (a lekéréskor
+    egyszer kiszámolva); a szakaszcímeket egy előre fordított mintával emeli ki.
+    
     Args:
         verses_data: A fetch_verses_from_api visszatérési értéke
     
@@ -348,60 +578,90 @@ def format_verses_html(verses_data):
         error = verses_data.get('error', 'Ismeretlen hiba')
         return f'<p class="text-muted fst-italic"><i class="bi bi-exclamation-triangle"></i> {error}</p>'
     
-    html_parts = []
-    current_chapter = None
+    verses = verses_data.get('verses', [])
+    if not verses:
+        return ''
     
-    # Számoljuk meg, hány különböző fejezet van
-    chapters_in_reading = set()
-    for verse in verses_data.get('verses', []):
-        ref = verse.get('reference', '')
-        chapter_match = re.search(r'(\d+),', ref)
-        if chapter_match:
-            chapters_in_reading.add(chapter_match.group(1))
+    # Csak akkor jelenítjük meg a fejezetszámot, ha több (könyv, fejezet) van
+    # (pl. "Mt 5; Mk 3; Lk 5" három fejezet, bár az első és az utolsó száma egyezik)
+    locations = [(_book_of(verse), _location_of(verse)) for verse in verses]
+    show_chapter_headers = len({(book, chapter) for book, (chapter, _) in locations if chapter is not None}) > 1
     
-    # Csak akkor jelenítjük meg a fejezetszámot, ha több fejezet van
-    show_chapter_headers = len(chapters_in_reading) > 1
+    html_parts = []
+    append = html_parts.append
+    current_chapter = None
     
-    for verse in verses_data.get('verses', []):
+    for verse, (book, (chapter, verse_num)) in zip(verses, locations):
         text = verse.get('text', '')
         ref = verse.get('reference', '')
         
-        # Vers szám kinyerése a hivatkozásból
-        verse_num_match = re.search(r',(\d+)$', ref)
-        verse_num = verse_num_match.group(1) if verse_num_match else ''
-        
-        # Fejezet kinyerése
-        chapter_match = re.search(r'(\d+),', ref)
-        chapter = chapter_match.group(1) if chapter_match else ''
-        
         # Új fejezet jelzése fejezetszámmal
-        if chapter and chapter != current_chapter:
+        if chapter is not None and (book, chapter) != current_chapter:
             if show_chapter_headers:
                 # Kis hely az előző fejezet után
                 if current_chapter is not None:
-                    html_parts.append('<span class="chapter-break"></span>')
+                    append('<span class="chapter-break"></span>')
                 # Nagy fejezetszám a szöveg elején
-                html_parts.append(f'<span class="chapter-number">{chapter}</span>')
+                append(f'<span class="chapter-number">{chapter}</span>')
             elif current_chapter is not None:
-                html_parts.append('<br><br>')
-            current_chapter = chapter
+                append('<br><br>')
+            current_chapter = (book, chapter)
         
         # Szakasz címek kiemelése a vers szövegből és külön blokk elemként megjelenítése
-        while True:
-            m = re.search(r'<span class="section-(?:heading|title)">(.*?)</span>\s*', text)
-            if not m:
-                break
-            html_parts.append(m.group(0))
-            text = text[:m.start()] + text[m.end():]
+        if '<span class="section-' in text:
+            text = _SECTION_SPAN_RE.sub(lambda m: append(m.group(0)) or '', text)
         text = text.strip()
         
         # Vers hozzáadása - data-ref attribútummal a teljes hivatkozáshoz
-        if verse_num:
-            html_parts.append(
+        if verse_num is not None:
+            append(
                 f'<span class="verse" data-verse="{verse_num}" data-ref="{ref}">'
                 f'<sup class="verse-num">{verse_num}</sup>{text}</span> '
             )
         else:
-            html_parts.append(f'<span class="verse" data-ref="{ref}">{text}</span> ')
+            append(f'<span class="verse" data-ref="{ref}">{text}</span> ')
     
     return ''.join(html_parts)
+
+
+def _location_of(verse):
+    """(fejezet, vers) a vers strukturált mezőiből (régi bejegyzésnél a hivatkozásból)"""
+    if 'chapter' in verse:
+        return verse['chapter'], verse['verse']
+    return _verse_location(verse.get('reference'))
+
+
+def _book_of(verse):
+    """Könyv rövidítése a vers hivatkozásából (pl. "Mt 5,3" -> "Mt")"""
+    ref = verse.get('reference') or ''
+    match = _LOCATION_RE.search(ref)
+    return ref[:match.start()].strip() if match else ref.strip()
+
+
+def align_verses(results):
+    """
+    Több fordítás verseinek összefésülése (fejezet, vers) szerint párhuzamos olvasáshoz.
+    
+    Args:
+        results: {fordítás: versek listája} - a fordítások sorrendje a megjelenítés sorrendje
+    
+    Returns:
+        list: [{'chapter', 'verse', 'reference', 'texts': {fordítás: szöveg vagy None}}]
+              (fejezet, vers) szerint rendezve; ahol egy fordításban nincs ilyen vers, ott None
+    """
+    rows = {}
+    for translation, verses in results.items():
+        for verse in verses:
+            location = _location_of(verse)
+            if location[0] is None:
+                continue
+            row = rows.get(location)
+            if row is None:
+                row = rows[location] = {
+                    'chapter': location[0],
+                    'verse': location[1],
+                    'reference': verse.get('reference', ''),
+                    'texts': dict.fromkeys(results)
+                }
+            row['texts'][translation] = verse.get('text', '').strip()
+    return [rows[location] for location in sorted(rows)]
@@ -0,0 +1,242 @@
+"""
+HTTP kliens a szentiras.hu API-hoz
+
+Közös, keep-alive kapcsolatokat újrahasznosító requests.Session, rövid
+kapcsolódási és olvasási időkorlát, korlátos számú újrapróbálkozás
+véletlenített (jitter) várakozással, és megszakító (circuit breaker):
+ismételt hibák után egy ideig azonnal hibát adunk, így egy lassú
+upstream sem köthet le minden worker szálat.
+
+Egy hívás (újrapróbálkozásokkal és várakozással együtt) legfeljebb
+total_timeout másodpercig tart; nélküle az alapértékekkel a legrosszabb
+eset (3 + 5) × 3 mp + várakozás, kb. 25 mp lenne.
+"""
+
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Ezekre az állapotkódokra érdemes újrapróbálkozni
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """A megszakító nyitva van - az upstream hívást ki sem próbáljuk"""
+
+
+class CircuitBreaker:
+    """
+    Egyszerű megszakító: zárt -> (N egymást követő hiba) -> nyitott
+    -> (várakozási idő) -> félig nyitott: egyetlen próbahívás dönt.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._rejected = 0
+        self._trips = 0
+        self._last_error = None
+
+    def allow(self):
+        """Engedélyezett-e most egy upstream hívás"""
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    self._rejected += 1
+                    return False
+                self._state = self.HALF_OPEN
+                self._trial_running = False
+            if self._state == self.HALF_OPEN:
+                # Félig nyitott állapotban egyszerre csak egy próbahívás mehet
+                if self._trial_running:
+                    self._rejected += 1
+                    return False
+                self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self._failures += 1
+            self._last_error = str(error) if error else None
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._trips += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_running = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def stats(self):
+        state = self.state
+        with self._lock:
+            retry_in = 0.0
+            if state == self.OPEN:
+                retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+            return {
+                'state': state,
+                'consecutive_failures': self._failures,
+                'failure_threshold': self.failure_threshold,
+                'reset_timeout': self.reset_timeout,
+                'retry_in_s': round(retry_in, 1),
+                'trips': self._trips,
+                'rejected': self._rejected,
+                'last_error': self._last_error,
+            }
+
+
+class UpstreamClient:
+    """Közös Session + újrapróbálkozás + megszakító"""
+
+    # Ennél rövidebb hátralévő időre már nem indítunk kísérletet
+    MIN_ATTEMPT_TIMEOUT = 0.1
+
+    def __init__(self, connect_timeout=3.0, read_timeout=5.0, retries=2, backoff=0.3,
+                 pool_size=10, breaker=None, total_timeout=None):
+        self.timeout = (connect_timeout, read_timeout)
+        self.total_timeout = total_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.breaker = breaker or CircuitBreaker()
+        self._local_pid = None
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _get_session(self):
+        """Folyamatonként egy Session (fork után újat nyitunk)"""
+        pid = os.getpid()
+        if self._session is None or self._local_pid != pid:
+            with self._lock:
+                if self._session is None or self._local_pid != pid:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+                    self._local_pid = pid
+        return self._session
+
+    def _can_retry(self, attempt, deadline):
+        if attempt >= self.retries:
+            return False
+        return deadline is None or deadline - time.monotonic() > self.MIN_ATTEMPT_TIMEOUT
+
+    def _attempt_timeout(self, deadline):
+        """Egy kísérlet időkorlátja: a beállított érték, de legfeljebb a hívásból hátralévő idő"""
+        if deadline is None:
+            return self.timeout
+        remaining = max(deadline - time.monotonic(), self.MIN_ATTEMPT_TIMEOUT)
+        return (min(self.timeout[0], remaining), min(self.timeout[1], remaining))
+
+    def _sleep_before_retry(self, attempt, deadline=None):
+        # Exponenciális várakozás teljes jitterrel (a workerek ne egyszerre próbálkozzanak)
+        delay = random.uniform(0, self.backoff * (2 ** attempt))
+        if deadline is not None:
+            delay = min(delay, max(0.0, deadline - time.monotonic() - self.MIN_ATTEMPT_TIMEOUT))
+        time.sleep(delay)
+
+    def get(self, url, headers=None):
+        """
+        GET kérés újrapróbálkozással (összesen legfeljebb total_timeout mp).
+        Sikertelen 2xx-en kívüli válasz esetén requests kivételt dob (mint a raise_for_status).
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError('Az API átmenetileg nem elérhető (megszakító nyitva)')
+
+        session = self._get_session()
+        deadline = time.monotonic() + self.total_timeout if self.total_timeout else None
+        attempt = 0
+        while True:
+            try:
+                response = session.get(url, headers=headers, timeout=self._attempt_timeout(deadline))
+                if response.status_code in RETRY_STATUS_CODES and self._can_retry(attempt, deadline):
+                    response.close()
+                    attempt += 1
+                    self._sleep_before_retry(attempt, deadline)
+                    continue
+                response.raise_for_status()
+            except requests.exceptions.HTTPError as e:
+                # Végleges 5xx / 429: az upstream hibája, a megszakítóba számít
+                status = e.response.status_code if e.response is not None else None
+                if status is None or status in RETRY_STATUS_CODES:
+                    self.breaker.record_failure(e)
+                else:
+                    self.breaker.record_success()
+                raise
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if self._can_retry(attempt, deadline):
+                    attempt += 1
+                    self._sleep_before_retry(attempt, deadline)
+                    continue
+                self.breaker.record_failure(e)
+                raise
+            except requests.exceptions.RequestException:
+                # Pl. hibás URL: nem az upstream állapotáról szól
+                self.breaker.record_success()
+                raise
+            except Exception as e:
+                self.breaker.record_failure(e)
+                raise
+            self.breaker.record_success()
+            return response
+
+    def stats(self):
+        data = self.breaker.stats()
+        data.update({
+            'connect_timeout': self.timeout[0],
+            'read_timeout': self.timeout[1],
+            'total_timeout': self.total_timeout,
+            'retries': self.retries,
+            'pool_size': self.pool_size,
+        })
+        return data
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_upstream_client(config):
+    """A folyamat közös upstream kliense (lusta létrehozás)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = UpstreamClient(
+                    connect_timeout=config.get('BIBLE_API_CONNECT_TIMEOUT', 3.0),
+                    read_timeout=config.get('BIBLE_API_READ_TIMEOUT', 5.0),
+                    retries=config.get('BIBLE_API_RETRIES', 2),
+                    backoff=config.get('BIBLE_API_BACKOFF', 0.3),
+                    total_timeout=config.get('BIBLE_API_TOTAL_TIMEOUT', 10.0),
+                    pool_size=config.get('BIBLE_API_POOL_SIZE', 12),
+                    breaker=CircuitBreaker(
+                        failure_threshold=config.get('BIBLE_API_BREAKER_THRESHOLD', 5),
+                        reset_timeout=config.get('BIBLE_API_BREAKER_RESET', 30),
+                    ),
+                )
+    return _client
@@ -0,0 +1,155 @@
+"""
+Helyi Biblia szöveg tároló ('local' forrás)
+
+A teljes fordításokat egy indexelt SQLite fájlba importáljuk
+(fordítás, könyv, fejezet, vers) kulccsal. Egy hivatkozás (pl. "Máté 5:1-26")
+feloldása szakaszonként egyetlen tartomány lekérdezés az elsődleges kulcson, hálózat nélkül.
+"""
+
+import csv
+import json
+import threading
+
+from .bible_api import process_verse_html
+from .reference_parser import API_BOOKS, InvalidReference, normalize_book_name, parse_reference
+from .sqlite_store import SQLiteStore
+
+
+class LocalBible(SQLiteStore):
+    """Indexelt, helyi vers tároló"""
+
+    def _init_schema(self, conn):
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS bible_verses (
+                translation TEXT NOT NULL,
+                book TEXT NOT NULL,
+                chapter INTEGER NOT NULL,
+                verse INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                PRIMARY KEY (translation, book, chapter, verse)
+            ) WITHOUT ROWID
+        ''')
+
+    def get_range(self, translation, book, start, stop):
+        """Versek egy tartományban - egyetlen tartomány bejárás az elsődleges kulcson"""
+        return self._conn().execute('''
+            SELECT chapter, verse, text FROM bible_verses
+            WHERE translation = ? AND book = ?
+              AND (chapter, verse) >= (?, ?) AND (chapter, verse) <= (?, ?)
+            ORDER BY chapter, verse
+        ''', (translation, book, start[0], start[1], stop[0], stop[1])).fetchall()
+
+    def translations(self):
+        """Importált fordítások és verseik száma"""
+        rows = self._conn().execute(
+            'SELECT translation, COUNT(*) FROM bible_verses GROUP BY translation'
+        ).fetchall()
+        return dict(rows)
+
+    def import_rows(self, translation, rows, replace=False):
+        """
+        Versek importálása egyetlen tranzakcióban.
+
+        Args:
+            rows: (könyv név, fejezet, vers, szöveg) elemek
+            replace: a fordítás meglévő verseinek törlése az import előtt
+
+        Returns:
+            tuple: (importált versek száma, ismeretlen könyv nevek halmaza)
+        """
+        unknown = set()
+
+        def normalized():
+            for book_name, chapter, verse, text in rows:
+                book = book_name if book_name in API_BOOKS else normalize_book_name(book_name)
+                if not book:
+                    unknown.add(book_name)
+                    continue
+                yield translation, book, int(chapter), int(verse), process_verse_html(text)
+
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if replace:
+                conn.execute('DELETE FROM bible_verses WHERE translation = ?', (translation,))
+            before = conn.total_changes
+            conn.executemany(
+                'INSERT OR REPLACE INTO bible_verses (translation, book, chapter, verse, text) '
+                'VALUES (?, ?, ?, ?, ?)',
+                normalized()
+            )
+            imported = conn.total_changes - before
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return imported, unknown
+
+
+def read_import_file(path):
+    """
+    Import fájl beolvasása (könyv, fejezet, vers, szöveg) sorokként.
+
+    JSON: [{"book", "chapter", "verse", "text"}, ...] vagy {"verses": [...]}
+    CSV: fejléc sorral (book,chapter,verse,text)
+    """
+    if path.lower().endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get('verses', [])
+        return [(v['book'], v['chapter'], v['verse'], v['text']) for v in data]
+
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return [(r['book'], r['chapter'], r['verse'], r['text']) for r in csv.DictReader(f)]
+
+
+def fetch_verses_from_local(store, reference, translation='SZIT'):
+    """
+    Versek lekérése a helyi tárolóból - a fetch_verses_from_api-val azonos formátumban.
+    """
+    try:
+        parsed = parse_reference(reference)
+    except InvalidReference:
+        return {
+            'success': False,
+            'error': 'Érvénytelen hivatkozás',
+            'verses': [],
+            'full_reference': reference
+        }
+
+    verses = []
+    for passage in parsed.passages:
+        verses.extend(
+            {'text': text, 'reference': f'{passage.book} {chapter},{verse}', 'chapter': chapter, 'verse': verse}
+            for chapter, verse, text in store.get_range(translation, passage.book, passage.start, passage.stop)
+        )
+    if not verses:
+        return {
+            'success': False,
+            'error': 'Nem található vers',
+            'verses': [],
+            'full_reference': reference
+        }
+
+    return {
+        'success': True,
+        'verses': verses,
+        'full_reference': verses[0]['reference'],
+        'error': None
+    }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_local_bible(config):
+    """A folyamat közös helyi vers tárolója (lusta létrehozás)"""
+    global _store
+    path = config.get('LOCAL_BIBLE_PATH')
+    if _store is None or _store.path != path:
+        with _store_lock:
+            if _store is None or _store.path != path:
+                _store = LocalBible(path, busy_timeout_ms=config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    return _store
@@ -0,0 +1,67 @@
+"""
+Folyamaton belüli, méretkorlátos (LRU) memória gyorsítótár
+
+A renderelt vers válaszok közös példánya is itt él, így a route modulok
+(olvasás: bible, statisztika: admin) egymás nélkül érik el.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Szálbiztos LRU gyorsítótár"""
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._data),
+                'max_entries': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+_rendered_verses = None
+_rendered_verses_lock = threading.Lock()
+
+
+def get_rendered_verses_cache(config):
+    """Kész (renderelt) vers válaszok workerenkénti gyorsítótára szakasz és fordítás szerint (lusta létrehozás)"""
+    global _rendered_verses
+    if _rendered_verses is None:
+        with _rendered_verses_lock:
+            if _rendered_verses is None:
+                _rendered_verses = LRUCache(config.get('RENDERED_VERSES_CACHE_SIZE', 512))
+    return _rendered_verses
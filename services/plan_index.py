@@ -0,0 +1,219 @@
+"""
+Előre fordított olvasási terv index
+
+A terv fájlt betöltéskor egyszer dolgozzuk fel: napokra bontott, normalizált
+és rendezett szakasz listák (értelmezett hivatkozásokkal), a terv típusa
+(számozott vagy MM-DD), a legkisebb/legnagyobb nap és a rendezett kulcsok.
+A kérések csak olvassák - a napi, naptár és admin nézetek semmit nem
+számolnak újra.
+"""
+
+import threading
+from calendar import monthrange
+from collections import namedtuple
+from datetime import date, timedelta
+from types import MappingProxyType
+
+from .reference_parser import InvalidReference, parse_reference
+
+# Szakasz típusok metaadatai (régi ot/nt/ps/pr kulcsos formátum)
+SECTION_TYPES = {
+    'ot': {'name': 'Ószövetség', 'icon': 'bi-bookmark', 'order': 1},
+    'nt': {'name': 'Újszövetség', 'icon': 'bi-bookmark-fill', 'order': 2},
+    'ps': {'name': 'Zsoltár', 'icon': 'bi-music-note', 'order': 3},
+    'pr': {'name': 'Példabeszédek', 'icon': 'bi-lightbulb', 'order': 4},
+}
+
+# Egy nap a tervben: szakaszok (rendezett tuple), korszak adat, eredeti bejegyzés
+PlanDay = namedtuple('PlanDay', ['sections', 'epoch', 'raw'])
+
+EMPTY_DAY = PlanDay((), None, MappingProxyType({}))
+
+# Naptár váz: a terv és a kezdő dátum függvénye, minden felhasználónál azonos
+# day_base: a hónap 1. napjának sorszáma (számozott terv), reading_mask: i. bit = (i+1). napon van olvasmány
+CalendarMonth = namedtuple('CalendarMonth', ['name', 'year', 'month', 'days', 'day_base', 'reading_mask'])
+CalendarDay = namedtuple('CalendarDay', ['day', 'day_number', 'date_str', 'has_reading'])
+
+MONTH_NAMES = ['Január', 'Február', 'Március', 'Április', 'Május', 'Június',
+               'Július', 'Augusztus', 'Szeptember', 'Október', 'November', 'December']
+
+# Ennyi különböző kezdő dátumhoz tartunk naptár vázat egy terv indexében
+CALENDAR_CACHE_SIZE = 8
+
+
+def _section(section):
+    """Egy szakasz csak olvasható példánya értelmezett hivatkozással"""
+    section = dict(section)
+    reference = section.get('reference')
+    try:
+        section['parsed'] = parse_reference(reference) if isinstance(reference, str) else None
+    except InvalidReference:
+        section['parsed'] = None
+    section['key'] = section['parsed'].key if section['parsed'] else reference
+    return MappingProxyType(section)
+
+
+def _normalize_sections(value):
+    """Egy nap bejegyzése -> rendezett szakasz lista (a 'sections' és a régi formátumból is)"""
+    # Ha a nap már lista formátumú (sections kulccsal)
+    if 'sections' in value:
+        return tuple(_section(s) for s in value['sections'] or ())
+
+    # Régi formátum átalakítása (ot, nt, ps, pr kulcsok)
+    sections = []
+    for key in SECTION_TYPES:
+        if value.get(key):
+            meta = SECTION_TYPES[key]
+            sections.append({
+                'id': key,
+                'name': meta['name'],
+                'icon': meta['icon'],
+                'reference': value[key],
+                'order': meta['order']
+            })
+
+    # Egyéb kulcsok (ami nem ot, nt, ps, pr, és nem a korszak adat)
+    custom_order = 10
+    for key, item in value.items():
+        if key not in SECTION_TYPES and key != 'epoch' and item:
+            sections.append({
+                'id': key,
+                'name': key,
+                'icon': 'bi-book',
+                'reference': item,
+                'order': custom_order
+            })
+            custom_order += 1
+
+    sections.sort(key=lambda s: s.get('order', 99))
+    return tuple(_section(s) for s in sections)
+
+
+def _reading_mask(days):
+    mask = 0
+    for i, day in enumerate(days):
+        if day.has_reading:
+            mask |= 1 << i
+    return mask
+
+
+def _day_sort_key(key):
+    # Számozott kulcsok szám szerint, a többi string szerint
+    key = str(key)
+    return (0, int(key)) if key.isdigit() else (1, key)
+
+
+class PlanIndex:
+    """Egy terv fájl csak olvasható, előre feldolgozott indexe"""
+
+    def __init__(self, data):
+        keys = list(data)
+        # Ha az első kulcs csak számokból áll, akkor számozott terv (1, 2, 3...)
+        self.numbered = bool(keys) and str(keys[0]).isdigit()
+        self.total_days = len(keys)
+        self.sorted_keys = tuple(sorted(keys, key=_day_sort_key))
+
+        day_numbers = [int(k) for k in keys if str(k).isdigit()]
+        self.day_numbers = frozenset(day_numbers)
+        self.min_day = min(day_numbers) if day_numbers else None
+        self.max_day = max(day_numbers) if day_numbers else None
+
+        days = {}
+        for key, value in data.items():
+            if not isinstance(value, dict):
+                continue
+            days[key] = PlanDay(_normalize_sections(value), value.get('epoch'), MappingProxyType(value))
+        self._days = MappingProxyType(days)
+        self._calendars = {}
+        self._calendars_lock = threading.Lock()
+
+    def __len__(self):
+        return self.total_days
+
+    def __contains__(self, key):
+        return key in self._days
+
+    def day(self, key):
+        """Egy nap szakaszai és korszak adata (nem létező napnál üres)"""
+        return self._days.get(key, EMPTY_DAY)
+
+    def days(self):
+        """(kulcs, PlanDay) párok a rendezett kulcs sorrendben"""
+        return [(key, self._days.get(key, EMPTY_DAY)) for key in self.sorted_keys]
+
+    def key_for_date(self, target_date, start_date):
+        """
+        Dátum -> (terv kulcs, nap sorszám).
+        Számozott tervnél a sorszám a kezdő dátumtól (1-től), dátum alapúnál a kulcs MM-DD és a sorszám None.
+        """
+        if self.numbered:
+            day_number = (target_date - start_date).days + 1
+            return str(day_number), day_number
+        return target_date.strftime('%m-%d'), None
+
+    def date_for_day(self, day_number, start_date):
+        """Nap sorszám -> dátum (számozott terv)"""
+        return start_date + timedelta(days=day_number - 1)
+
+    def date_range(self, start_date, today=None):
+        """
+        A terv által lefedett (első, utolsó) dátum - olvasottság csak ezen belül jelölhető.
+        Számozott terv: a kezdő dátumtól az utolsó napig; MM-DD terv: a kezdő év elejétől a folyó év végéig.
+        """
+        if self.numbered:
+            return start_date, start_date + timedelta(days=(self.max_day or 0) - 1)
+        last_year = max(start_date.year, (today or date.today()).year)
+        return date(start_date.year, 1, 1), date(last_year, 12, 31)
+
+    def has_reading(self, day_number):
+        """Van-e olvasmány a számozott terv adott napján"""
+        return 1 <= day_number <= self.total_days and day_number in self.day_numbers
+
+    def calendar(self, start_date):
+        """
+        A terv naptár váza (CalendarMonth tuple) - kezdő dátumonként egyszer számolva.
+        Az olvasottság és a mai nap felhasználó és nap függő, azt a hívó teszi rá.
+        """
+        months = self._calendars.get(start_date)
+        if months is None:
+            months = self._build_calendar(start_date)
+            with self._calendars_lock:
+                if len(self._calendars) >= CALENDAR_CACHE_SIZE:
+                    self._calendars.clear()
+                self._calendars[start_date] = months
+        return months
+
+    def _build_calendar(self, start_date):
+        months = []
+        if self.numbered:
+            # Számozott terv: hónapok a kezdő dátumtól a terv utolsó napjáig
+            end_date = start_date + timedelta(days=self.total_days - 1)
+            year, month = start_date.year, start_date.month
+            while date(year, month, 1) <= end_date:
+                days = []
+                for d in range(1, monthrange(year, month)[1] + 1):
+                    current_date = date(year, month, d)
+                    day_number = (current_date - start_date).days + 1
+                    has_reading = self.has_reading(day_number)
+                    days.append(CalendarDay(
+                        d, day_number if has_reading else None, current_date.isoformat(), has_reading
+                    ))
+                months.append(CalendarMonth(
+                    f"{year}. {MONTH_NAMES[month - 1]}", year, month, tuple(days),
+                    (date(year, month, 1) - start_date).days + 1, _reading_mask(days)
+                ))
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        else:
+            # Régi dátum alapú terv (MM-DD): a kezdő dátum évének 12 hónapja
+            days_in_month = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+            year = start_date.year
+            for m in range(12):
+                days = tuple(
+                    CalendarDay(d, None, date(year, m + 1, d).isoformat(), f"{m + 1:02d}-{d:02d}" in self._days)
+                    for d in range(1, days_in_month[m] + 1)
+                )
+                months.append(CalendarMonth(MONTH_NAMES[m], year, m + 1, days, None, _reading_mask(days)))
+        return tuple(months)
+
+
+EMPTY_INDEX = PlanIndex({})
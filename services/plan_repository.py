@@ -0,0 +1,111 @@
+"""
+Olvasási terv fájlok közös tárolója
+
+Minden terv fájlt folyamatonként egyszer olvasunk be, értelmezünk és
+fordítunk indexszé (PlanIndex); a memóriában tartott példányt minden
+hozzáféréskor egyetlen os.stat hívással ellenőrizzük (módosítás ideje,
+méret, inode). A mentés atomi cserével (ideiglenes fájl + os.replace)
+történik, így a többi gunicorn worker a megváltozott fájl azonosítóból a
+következő kérésnél magától újratölt.
+"""
+
+import json
+import os
+import tempfile
+import threading
+
+from .plan_index import PlanIndex
+
+
+class PlanRepository:
+    """Értelmezett terv fájlok gyorsítótára fájl azonosító szerinti újraellenőrzéssel"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.hits = 0
+
+    @staticmethod
+    def _signature(stat):
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _entry(self, path):
+        """(fájl azonosító, adat, index) - a fájl változása esetén újratöltve; nem létező fájlnál None"""
+        path = os.path.abspath(path)
+        try:
+            signature = self._signature(os.stat(path))
+        except FileNotFoundError:
+            self.invalidate(path)
+            return None
+
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == signature:
+            self.hits += 1
+            return entry
+
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        # Betöltéskor egyszer fordítjuk le a terv indexét
+        entry = (signature, data, PlanIndex(data))
+        with self._lock:
+            self._entries[path] = entry
+            self.loads += 1
+        return entry
+
+    def get(self, path):
+        """
+        A terv értelmezett tartalma, vagy None, ha a fájl nem létezik.
+        A visszaadott dict közös példány: csak olvasásra (módosításhoz load_copy).
+        """
+        entry = self._entry(path)
+        return entry[1] if entry is not None else None
+
+    def get_index(self, path):
+        """A terv előre fordított indexe (PlanIndex), vagy None, ha a fájl nem létezik"""
+        entry = self._entry(path)
+        return entry[2] if entry is not None else None
+
+    def load_copy(self, path):
+        """A terv módosítható másolata (pl. az admin szerkesztőnek); nem létező fájlnál üres dict"""
+        data = self.get(path)
+        return json.loads(json.dumps(data)) if data is not None else {}
+
+    def save(self, path, data):
+        """Terv mentése atomi cserével, a saját gyorsítótár bejegyzés azonnali eldobásával"""
+        path = os.path.abspath(path)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.plan-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=4)
+            # Az ideiglenes fájl 0600 jogú: a meglévő fájl jogait vesszük át
+            try:
+                os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+            except FileNotFoundError:
+                os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        # A mentett adatot nem tesszük be közvetlenül: a hívó még módosíthatja,
+        # a következő get() a friss fájlból tölt
+        self.invalidate(path)
+
+    def invalidate(self, path=None):
+        """Egy terv (vagy az összes) eldobása a gyorsítótárból"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(path), None)
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'loads': self.loads, 'hits': self.hits}
+
+
+# A folyamat közös terv tárolója
+plan_repository = PlanRepository()
@@ -0,0 +1,288 @@
+"""
+Szentírási hivatkozások értelmezése
+
+Az összes könyv név változatból előre felépített pontos és prefix
+(trie) keresés: a könyv azonosítása a név hosszával arányos, független a
+változatok számától és sorrendjétől (mindig a leghosszabb egyezés nyer).
+Az eredmény strukturált (könyv, fejezet/vers tartományok), és memoizált.
+
+Pl.: "Zsolt 1; 2:1-5" -> ParsedReference(passages=(Passage('Zsolt', (1, 0), (1, LAST_VERSE)),
+                                                    Passage('Zsolt', (2, 1), (2, 5))))
+"""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+# Könyv nevek átalakítása az API formátumra
+BOOK_MAPPINGS = {
+    # Ószövetség
+    '1mózes': '1Móz', '1móz': '1Móz', 'genezis': '1Móz', 'ter': '1Móz',
+    '2mózes': '2Móz', '2móz': '2Móz', 'exodus': '2Móz', 'kiv': '2Móz',
+    '3mózes': '3Móz', '3móz': '3Móz', 'leviticus': '3Móz', 'lev': '3Móz',
+    '4mózes': '4Móz', '4móz': '4Móz', 'numeri': '4Móz', 'szám': '4Móz',
+    '5mózes': '5Móz', '5móz': '5Móz', 'deuteronomium': '5Móz', 'mtörv': '5Móz',
+    'józsué': 'Józs', 'józs': 'Józs',
+    'bírák': 'Bír', 'bír': 'Bír',
+    'ruth': 'Ruth', 'rut': 'Ruth',
+    '1sámuel': '1Sám', '1sám': '1Sám',
+    '2sámuel': '2Sám', '2sám': '2Sám',
+    '1királyok': '1Kir', '1kir': '1Kir',
+    '2királyok': '2Kir', '2kir': '2Kir',
+    '1krónikák': '1Krón', '1krón': '1Krón',
+    '2krónikák': '2Krón', '2krón': '2Krón',
+    'ezsdrás': 'Ezsd', 'ezsd': 'Ezsd',
+    'nehémiás': 'Neh', 'neh': 'Neh',
+    'eszter': 'Eszt', 'eszt': 'Eszt',
+    'jób': 'Jób',
+    'zsoltárok': 'Zsolt', 'zsoltár': 'Zsolt', 'zsolt': 'Zsolt',
+    'példabeszédek': 'Péld', 'péld': 'Péld',
+    'prédikátor': 'Préd', 'préd': 'Préd',
+    'énekek éneke': 'Én', 'én': 'Én',
+    'ézsaiás': 'Ézs', 'ézs': 'Ézs', 'izajás': 'Ézs',
+    'jeremiás': 'Jer', 'jer': 'Jer',
+    'siralmak': 'Siral', 'jsir': 'Siral',
+    'ezékiel': 'Ez', 'ez': 'Ez',
+    'dániel': 'Dán', 'dán': 'Dán',
+    'hóseás': 'Hós', 'hós': 'Hós',
+    'jóel': 'Jóel',
+    'ámósz': 'Ám', 'ám': 'Ám',
+    'abdiás': 'Abd', 'abd': 'Abd',
+    'jónás': 'Jón', 'jón': 'Jón',
+    'mikeás': 'Mik', 'mik': 'Mik',
+    'náhum': 'Náh', 'náh': 'Náh',
+    'habakuk': 'Hab', 'hab': 'Hab',
+    'zofóniás': 'Zof', 'zof': 'Zof',
+    'haggeus': 'Hag', 'hag': 'Hag',
+    'zakariás': 'Zak', 'zak': 'Zak',
+    'malakiás': 'Mal', 'mal': 'Mal',
+    
+    # Újszövetség
+    'máté': 'Mt', 'mt': 'Mt',
+    'márk': 'Mk', 'mk': 'Mk',
+    'lukács': 'Lk', 'lk': 'Lk',
+    'jános': 'Jn', 'jn': 'Jn',
+    'apostolok cselekedetei': 'ApCsel', 'apcsel': 'ApCsel', 'csel': 'ApCsel',
+    'róma': 'Róm', 'róm': 'Róm', 'rómaiakhoz': 'Róm',
+    '1korinthus': '1Kor', '1kor': '1Kor',
+    '2korinthus': '2Kor', '2kor': '2Kor',
+    'galata': 'Gal', 'gal': 'Gal',
+    'efezus': 'Ef', 'ef': 'Ef',
+    'filippi': 'Fil', 'fil': 'Fil',
+    'kolossé': 'Kol', 'kol': 'Kol',
+    '1thesszalonika': '1Thessz', '1thessz': '1Thessz',
+    '2thesszalonika': '2Thessz', '2thessz': '2Thessz',
+    '1timóteus': '1Tim', '1tim': '1Tim',
+    '2timóteus': '2Tim', '2tim': '2Tim',
+    'titusz': 'Tit', 'tit': 'Tit',
+    'filemon': 'Filem', 'filem': 'Filem',
+    'zsidók': 'Zsid', 'zsid': 'Zsid',
+    'jakab': 'Jak', 'jak': 'Jak',
+    '1péter': '1Pt', '1pt': '1Pt',
+    '2péter': '2Pt', '2pt': '2Pt',
+    '1jános': '1Jn', '1jn': '1Jn',
+    '2jános': '2Jn', '2jn': '2Jn',
+    '3jános': '3Jn', '3jn': '3Jn',
+    'júdás': 'Júd', 'júd': 'Júd',
+    'jelenések': 'Jel', 'jel': 'Jel',
+}
+
+
+# API könyv rövidítések (könyv azonosítók)
+API_BOOKS = frozenset(BOOK_MAPPINGS.values())
+
+# Egyfejezetes könyvek: fejezet nélkül az egész könyv ("Júd" = Júd 1). A puszta
+# szám - mint minden könyvnél - fejezet ("Filem 1" = az egész könyv), versre: "Júd 1:5"
+SINGLE_CHAPTER_BOOKS = {'Abd', 'Filem', '2Jn', '3Jn', 'Júd'}
+
+# Fejezet vége jelölő a tartományokhoz ("a fejezet összes verse")
+LAST_VERSE = 10 ** 6
+
+# Fejezet/vers tartomány: "5", "1-3", "5:1-26", "5,1-26", "5:1-6:3"
+_RANGE_RE = re.compile(r'^(\d+)(?:[:,](\d+))?(?:-(\d+)(?:[:,](\d+))?)?$')
+
+# Könyv név után maradt betűk (pl. "Korinthusiakhoz" a "korinthus" változat után)
+_WORD_TAIL_RE = re.compile(r'^[^\W\d_]+')
+
+_END = ''
+
+
+def _build_trie():
+    """Trie az összes könyv név változatra (kisbetűs, szóközök nélkül)"""
+    aliases = {key.replace(' ', ''): book for key, book in BOOK_MAPPINGS.items()}
+    for book in API_BOOKS:
+        aliases.setdefault(book.lower(), book)
+    trie = {}
+    for alias, book in aliases.items():
+        node = trie
+        for ch in alias:
+            node = node.setdefault(ch, {})
+        node[_END] = book
+    return trie
+
+
+_BOOK_TRIE = _build_trie()
+
+
+class InvalidReference(ValueError):
+    """A hivatkozás nem értelmezhető könyv + fejezet/vers tartományként"""
+
+
+class Passage(NamedTuple):
+    """Egy könyv összefüggő (fejezet, vers) tartománya - mindkét vég zárt"""
+    book: str
+    start: tuple
+    stop: tuple
+
+    @property
+    def chapters(self):
+        return range(self.start[0], self.stop[0] + 1)
+
+    @property
+    def api_ref(self):
+        """Kanonikus API hivatkozás (pl. "Mt5:1-26", "1Móz1-3")"""
+        (c1, v1), (c2, v2) = self.start, self.stop
+        if v1 == 0 and v2 == LAST_VERSE:
+            return f'{self.book}{c1}' if c1 == c2 else f'{self.book}{c1}-{c2}'
+        if c1 == c2:
+            return f'{self.book}{c1}:{v1}' if v1 == v2 else f'{self.book}{c1}:{v1}-{v2}'
+        return f'{self.book}{c1}:{v1}-{c2}:{v2}'
+
+    def contains(self, chapter, verse):
+        return self.start <= (chapter, verse) <= self.stop
+
+
+class ParsedReference(NamedTuple):
+    """Értelmezett hivatkozás: egy vagy több szakasz (";" elválasztással)"""
+    passages: tuple
+
+    @property
+    def key(self):
+        """Kanonikus kulcs gyorsítótárakhoz és összevonáshoz"""
+        return ';'.join(p.api_ref for p in self.passages)
+
+
+def _match_book(text):
+    """
+    Leghosszabb könyv név egyezés a szöveg elején.
+    Visszaadja: (könyv azonosító, a név utáni szöveg) vagy (None, text)
+    """
+    node = _BOOK_TRIE
+    best, best_end = None, 0
+    for i, ch in enumerate(text.lower()):
+        if ch.isspace():
+            continue
+        node = node.get(ch)
+        if node is None:
+            break
+        if _END in node:
+            best, best_end = node[_END], i + 1
+    if best is None:
+        return None, text
+    # A név megkezdett szavának maradéka is a névhez tartozik (pl. "Mózes", "Zsoltárok")
+    return best, _WORD_TAIL_RE.sub('', text[best_end:])
+
+
+def _parse_range(book, spec):
+    """Fejezet/vers tartomány -> ((fejezet, vers), (fejezet, vers))"""
+    if not spec:
+        if book in SINGLE_CHAPTER_BOOKS:
+            return (1, 0), (1, LAST_VERSE)
+        raise InvalidReference(f'Hiányzó fejezet: {book}')
+
+    match = _RANGE_RE.match(spec)
+    if not match:
+        raise InvalidReference(f'Érvénytelen fejezet/vers: {spec}')
+    c1, v1, end, v2 = match.groups()
+    c1 = int(c1)
+
+    if v1 is None:
+        # Teljes fejezet(ek): "5" vagy "1-3" (vagy "1-3:5")
+        start = (c1, 0)
+        if end is None:
+            stop = (c1, LAST_VERSE)
+        else:
+            stop = (int(end), int(v2) if v2 else LAST_VERSE)
+    else:
+        start = (c1, int(v1))
+        if end is None:
+            stop = start
+        elif v2 is None:
+            # "5:1-26": a kötőjel utáni szám vers ugyanabban a fejezetben
+            stop = (c1, int(end))
+        else:
+            stop = (int(end), int(v2))
+
+    if stop < start:
+        raise InvalidReference(f'Fordított tartomány: {spec}')
+    return start, stop
+
+
+@lru_cache(maxsize=4096)
+def parse_reference(reference):
+    """
+    Hivatkozás értelmezése (memoizált).
+    Pl: "Máté 5:1-26", "1Mózes 1-3", "Zsolt 1; 2:1-5", "Mt 5; Mk 3:1-6"
+    
+    Raises:
+        InvalidReference: ha a hivatkozás nem értelmezhető
+    """
+    if not reference:
+        raise InvalidReference('Üres hivatkozás')
+
+    passages = []
+    book = None
+    for part in reference.split(';'):
+        part = part.strip()
+        if not part:
+            continue
+        part_book, rest = _match_book(part)
+        if part_book:
+            book = part_book
+        elif book is None:
+            raise InvalidReference(f'Ismeretlen könyv: {part}')
+        start, stop = _parse_range(book, re.sub(r'\s+', '', rest))
+        passages.append(Passage(book, start, stop))
+
+    if not passages:
+        raise InvalidReference(f'Üres hivatkozás: {reference}')
+    return ParsedReference(tuple(passages))
+
+
+def reference_key(reference):
+    """Kanonikus kulcs (értelmezhetetlen hivatkozásnál a normalizált szöveg)"""
+    try:
+        return parse_reference(reference).key
+    except InvalidReference:
+        return normalize_reference(reference)
+
+
+def normalize_book_name(name):
+    """
+    Könyv név átalakítása az API rövidítésére.
+    Pl: "1 Mózes" -> "1Móz", "Máté" -> "Mt" (ismeretlen név esetén None)
+    """
+    if not name:
+        return None
+    book, _ = _match_book(name.strip())
+    return book
+
+
+@lru_cache(maxsize=4096)
+def normalize_reference(reference):
+    """
+    Átalakítja a hivatkozást az API által elfogadott formátumra.
+    Pl: "1Mózes 1-3" -> "1Móz1-3"
+    """
+    if not reference:
+        return None
+    
+    ref = reference.strip()
+    book, rest = _match_book(ref)
+    if book:
+        # Összeállítjuk az API hivatkozást (szóköz nélkül)
+        return f"{book}{rest.strip()}"
+    
+    # Ha nem sikerült feldolgozni, próbáljuk közvetlenül
+    # Eltávolítjuk a szóközöket
+    return ref.replace(' ', '')
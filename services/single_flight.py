@@ -0,0 +1,55 @@
+"""
+Single-flight: azonos, egyidejű lekérések összevonása
+
+Ha több szál ugyanazt a kulcsot kéri, csak az első (vezető) hívja meg a
+függvényt, a többiek megvárják és ugyanazt az eredményt kapják.
+"""
+
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Folyamaton belüli kérés összevonás kulcs szerint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.shared = 0
+
+    def do(self, key, fn):
+        """fn() eredménye - egyidejű, azonos kulcsú hívások esetén egyetlen végrehajtással"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
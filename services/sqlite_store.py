@@ -0,0 +1,43 @@
+"""
+Helyi SQLite fájlok közös kapcsolatkezelése
+
+Szálanként (és fork után folyamatonként) egy kapcsolat, WAL módban,
+így a gunicorn szálak és workerek biztonságosan osztozhatnak a fájlon.
+"""
+
+import os
+import sqlite3
+import threading
+
+
+class SQLiteStore:
+    """Alaposztály a szolgáltatások helyi SQLite tárolóihoz"""
+
+    def __init__(self, path, busy_timeout_ms=5000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._init_schema(self._conn())
+
+    def _init_schema(self, conn):
+        """Táblák létrehozása (alosztályok felülírják)"""
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+        return conn
+
+    def _conn(self):
+        """Az aktuális szál kapcsolata (autocommit módban)"""
+        pid = os.getpid()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != pid:
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.pid = pid
+        return conn
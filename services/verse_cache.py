@@ -0,0 +1,191 @@
+"""
+Tartós vers gyorsítótár
+
+A szentírás szövege egy adott fordításban nem változik, ezért a lekért
+verseket egy helyi SQLite fájlban tároljuk (normalizált hivatkozás,
+fordítás) kulccsal. A gyorsítótár túléli az újraindítást, WAL módban
+több gunicorn worker és szál is biztonságosan használhatja, és méret
+szerint korlátos (LRU kiürítés).
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+
+from .sqlite_store import SQLiteStore
+
+
+class VerseCache(SQLiteStore):
+    """SQLite alapú, méretkorlátos (LRU) vers gyorsítótár"""
+
+    # Az utolsó hozzáférés idejét csak ennyi másodpercenként frissítjük,
+    # így a gyakori találatok nem okoznak írást
+    TOUCH_INTERVAL = 3600
+
+    # Ennyi beszúrásonként ellenőrizzük a méretkorlátot
+    EVICT_EVERY = 50
+
+    def __init__(self, path, max_entries=5000, busy_timeout_ms=5000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.hits = 0
+        self.misses = 0
+        super().__init__(path, busy_timeout_ms)
+
+    def _init_schema(self, conn):
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS verse_cache (
+                id INTEGER PRIMARY KEY,
+                api_ref TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                full_reference TEXT,
+                verses TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                UNIQUE (api_ref, translation)
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_verse_cache_last_access ON verse_cache (last_access)')
+        # Workerek közötti lekérési zár (egy kulcsot egyszerre csak egy worker kér le)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS verse_fetch_locks (
+                lock_key TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        ''')
+
+    def get(self, api_ref, translation):
+        """Gyorsítótárazott eredmény ({'verses', 'full_reference', 'fetched_at'}) vagy None"""
+        conn = self._conn()
+        row = conn.execute(
+            'SELECT id, full_reference, verses, last_access, created_at FROM verse_cache '
+            'WHERE api_ref = ? AND translation = ?',
+            (api_ref, translation)
+        ).fetchone()
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        entry_id, full_reference, verses, last_access, fetched_at = row
+        now = time.time()
+        if now - last_access > self.TOUCH_INTERVAL:
+            conn.execute('UPDATE verse_cache SET last_access = ? WHERE id = ?', (now, entry_id))
+        with self._lock:
+            self.hits += 1
+        return {'verses': json.loads(verses), 'full_reference': full_reference, 'fetched_at': fetched_at}
+
+    def put(self, api_ref, translation, verses, full_reference):
+        """Eredmény mentése (meglévő kulcs esetén felülírja)"""
+        now = time.time()
+        conn = self._conn()
+        conn.execute('''
+            INSERT INTO verse_cache (api_ref, translation, full_reference, verses, created_at, last_access)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (api_ref, translation) DO UPDATE
+            SET full_reference = excluded.full_reference, verses = excluded.verses,
+                created_at = excluded.created_at, last_access = excluded.last_access
+        ''', (api_ref, translation, full_reference, json.dumps(verses, ensure_ascii=False), now, now))
+        with self._lock:
+            self._puts += 1
+            evict = self._puts % self.EVICT_EVERY == 1
+        if evict:
+            self.evict()
+
+    def evict(self):
+        """A legrégebben használt bejegyzések törlése a méretkorlát fölött"""
+        if not self.max_entries:
+            return 0
+        conn = self._conn()
+        (count,) = conn.execute('SELECT COUNT(*) FROM verse_cache').fetchone()
+        excess = count - self.max_entries
+        if excess <= 0:
+            return 0
+        conn.execute(
+            'DELETE FROM verse_cache WHERE id IN '
+            '(SELECT id FROM verse_cache ORDER BY last_access LIMIT ?)',
+            (excess,)
+        )
+        return excess
+
+    def try_lock(self, key, ttl):
+        """
+        Lekérési zár megszerzése (lejárt zárat átveszünk).
+        Visszaadja a zár azonosítóját, vagy None-t, ha egy másik worker tartja.
+        """
+        owner = f'{os.getpid()}:{uuid.uuid4().hex}'
+        now = time.time()
+        conn = self._conn()
+        conn.execute('''
+            INSERT INTO verse_fetch_locks (lock_key, owner, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT (lock_key) DO UPDATE
+            SET owner = excluded.owner, expires_at = excluded.expires_at
+            WHERE verse_fetch_locks.expires_at < ?
+        ''', (key, owner, now + ttl, now))
+        (changed,) = conn.execute('SELECT changes()').fetchone()
+        return owner if changed else None
+
+    def unlock(self, key, owner):
+        self._conn().execute(
+            'DELETE FROM verse_fetch_locks WHERE lock_key = ? AND owner = ?', (key, owner)
+        )
+
+    def wait_for(self, key, lookup, timeout, interval=0.05):
+        """
+        Várakozás egy másik worker lekérésére: a lookup() eredménye, vagy None,
+        ha a zár eredmény nélkül szabadult fel (pl. upstream hiba), illetve lejárt az idő.
+        """
+        deadline = time.monotonic() + timeout
+        conn = self._conn()
+        while time.monotonic() < deadline:
+            time.sleep(interval)
+            cached = lookup()
+            if cached:
+                return cached
+            held = conn.execute(
+                'SELECT 1 FROM verse_fetch_locks WHERE lock_key = ? AND expires_at >= ?',
+                (key, time.time())
+            ).fetchone()
+            if held is None:
+                return None
+        return None
+
+    def clear(self):
+        self._conn().execute('DELETE FROM verse_cache')
+
+    def stats(self):
+        (count,) = self._conn().execute('SELECT COUNT(*) FROM verse_cache').fetchone()
+        with self._lock:
+            return {
+                'entries': count,
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_verse_cache(config):
+    """
+    A folyamat közös vers gyorsítótára (lusta létrehozás).
+    Üres VERSE_CACHE_PATH esetén a gyorsítótár ki van kapcsolva (None).
+    """
+    global _cache
+    path = config.get('VERSE_CACHE_PATH')
+    if not path:
+        return None
+    if _cache is None or _cache.path != path:
+        with _cache_lock:
+            if _cache is None or _cache.path != path:
+                _cache = VerseCache(
+                    path,
+                    max_entries=config.get('VERSE_CACHE_MAX_ENTRIES', 5000),
+                    busy_timeout_ms=config.get('SQLITE_BUSY_TIMEOUT_MS', 5000),
+                )
+    return _cache
@@ -3,6 +3,9 @@
 // Aktuális fordítás (localStorage-ból vagy alapértelmezett)
 let currentTranslation = localStorage.getItem('bibleTranslation') || 'SZIT';
 
+// Párhuzamos olvasáshoz kiválasztott további fordítások
+let parallelTranslations = JSON.parse(localStorage.getItem('parallelTranslations') || '[]');
+
 // Store event handlers for cleanup using WeakMap
 const eventHandlers = new WeakMap();
 
@@ -45,61 +48,145 @@ function setupTranslationSelector() {
         // Versek újratöltése az új fordítással
         loadBibleVerses();
     });
+    
+    // Párhuzamos fordítások kiválasztása
+    const parallelMenu = document.getElementById('parallelTranslations');
+    if (!parallelMenu) return;
+    
+    parallelMenu.querySelectorAll('input[type="checkbox"]').forEach(checkbox => {
+        checkbox.checked = parallelTranslations.includes(checkbox.value);
+        checkbox.addEventListener('change', function() {
+            parallelTranslations = Array.from(parallelMenu.querySelectorAll('input:checked'))
+                .map(input => input.value);
+            localStorage.setItem('parallelTranslations', JSON.stringify(parallelTranslations));
+            loadBibleVerses();
+        });
+    });
 }
 
-// Biblia versek betöltése API-ból
+// A megjelenítendő fordítások: a kiválasztott, majd a párhuzamosak
+function getDisplayedTranslations() {
+    return [currentTranslation, ...parallelTranslations.filter(t => t !== currentTranslation)];
+}
+
+// Biblia versek betöltése - a nap összes szakasza egyetlen kéréssel
 function loadBibleVerses() {
-    const bibleContents = document.querySelectorAll('.bible-content[data-reference]');
+    const bibleContents = Array.from(document.querySelectorAll('.bible-content[data-reference]'))
+        .filter(content => content.dataset.reference);
+    if (bibleContents.length === 0) return;
+    
+    const translations = getDisplayedTranslations();
     
     bibleContents.forEach(content => {
-        const reference = content.dataset.reference;
-        if (!reference) return;
-        
         // Betöltés jelzés
         content.innerHTML = `
             <div class="verse-loading text-center py-3">
                 <div class="spinner-border spinner-border-sm text-primary" role="status">
                     <span class="visually-hidden">Betöltés...</span>
                 </div>
-                <span class="ms-2 text-muted">Szöveg betöltése (${currentTranslation})...</span>
+                <span class="ms-2 text-muted">Szöveg betöltése (${translations.join(', ')})...</span>
             </div>
         `;
-        
-        // API hívás a kiválasztott fordítással
-        fetch(`/api/verses/${encodeURIComponent(reference)}?translation=${currentTranslation}`)
-            .then(response => response.json())
-            .then(data => {
-                if (data.success && data.html) {
-                    content.innerHTML = data.html;
-                    // Újra beállítjuk a szöveg kijelölést az új tartalomhoz
-                    content.addEventListener('mouseup', handleTextSelection);
-                    // Kiemelések megjelölése a szövegben
-                    applyHighlightsToText();
+    });
+    
+    const references = bibleContents.map(content => content.dataset.reference);
+    
+    // Kötegelt API hívás a kiválasztott fordítással, vagy párhuzamos olvasásnál
+    // egyetlen hívás az összes fordítással (versenként összefésülve)
+    const parallel = translations.length > 1;
+    fetch(parallel ? '/api/verses/parallel' : '/api/verses/batch', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify(parallel
+            ? { references: references, translations: translations }
+            : { references: references, translation: currentTranslation })
+    })
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success) {
+                throw new Error(data.error || 'Kötegelt lekérés sikertelen');
+            }
+            bibleContents.forEach((content, index) => {
+                if (parallel) {
+                    renderParallelContent(content, data.translations, data.results[index] || {});
                 } else {
-                    content.innerHTML = `
-                        <p class="text-muted fst-italic mb-0">
-                            <i class="bi bi-exclamation-triangle"></i> 
-                            ${data.error || 'Nem sikerült betölteni a szöveget'}
-                        </p>
-                        <p class="small text-muted mt-2">
-                            <i class="bi bi-book"></i> ${reference}
-                        </p>
-                    `;
+                    renderBibleContent(content, data.results[index] || {});
                 }
-            })
-            .catch(error => {
-                console.error('Hiba a versek betöltésekor:', error);
+            });
+            // Kiemelések megjelölése a szövegben
+            applyHighlightsToText();
+        })
+        .catch(error => {
+            console.error('Hiba a versek betöltésekor:', error);
+            bibleContents.forEach(content => {
                 content.innerHTML = `
                     <p class="text-muted fst-italic mb-0">
                         <i class="bi bi-wifi-off"></i> 
                         Hálózati hiba - nem sikerült betölteni
                     </p>
                     <p class="small text-muted mt-2">
-                        <i class="bi bi-book"></i> ${reference}
+                        <i class="bi bi-book"></i> ${content.dataset.reference}
                     </p>
                 `;
             });
-    });
+        });
+}
+
+// Egy szakasz megjelenítése a lekért adatokból
+function renderBibleContent(content, data) {
+    if (data.success && data.html) {
+        content.innerHTML = data.html;
+        // Újra beállítjuk a szöveg kijelölést az új tartalomhoz
+        content.addEventListener('mouseup', handleTextSelection);
+    } else {
+        content.innerHTML = `
+            <p class="text-muted fst-italic mb-0">
+                <i class="bi bi-exclamation-triangle"></i> 
+                ${data.error || 'Nem sikerült betölteni a szöveget'}
+            </p>
+            <p class="small text-muted mt-2">
+                <i class="bi bi-book"></i> ${content.dataset.reference}
+            </p>
+        `;
+    }
+}
+
+// Egy szakasz megjelenítése több fordításban, versenként egymás mellett
+function renderParallelContent(content, translations, data) {
+    if (!data.success) {
+        renderBibleContent(content, { error: Object.values(data.errors || {})[0] });
+        return;
+    }
+    
+    // Az első (kiválasztott) fordítás versei kijelölhetők és kiemelhetők
+    const head = translations.map(t => `<th>${escapeHtml(t)}</th>`).join('');
+    const body = data.rows.map(row => {
+        const cells = translations.map((t, i) => {
+            const text = row.texts[t];
+            if (text == null) return '<td class="text-muted">—</td>';
+            return i === 0
+                ? `<td><span class="verse" data-verse="${row.verse}" data-ref="${escapeHtml(row.reference)}">${text}</span></td>`
+                : `<td>${text}</td>`;
+        }).join('');
+        return `<tr><td class="verse-num">${row.chapter},${row.verse}</td>${cells}</tr>`;
+    }).join('');
+    
+    const errors = Object.entries(data.errors || {})
+        .map(([t, error]) => `<p class="small text-muted mb-1"><i class="bi bi-exclamation-triangle"></i> ${escapeHtml(t)}: ${escapeHtml(error)}</p>`)
+        .join('');
+    
+    content.innerHTML = `
+        ${errors}
+        <div class="table-responsive">
+            <table class="table table-sm parallel-verses">
+                <thead><tr><th></th>${head}</tr></thead>
+                <tbody>${body}</tbody>
+            </table>
+        </div>
+    `;
+    content.addEventListener('mouseup', handleTextSelection);
 }
 
 // Kiemelések vizuális megjelölése a szövegben (csak saját kiemelések)
@@ -0,0 +1,29 @@
+"""
+Közös pytest beállítások
+
+A tesztek a projekt gyökeréből importálnak, és mindig SQLite-tal futnak
+(a DATABASE_URL-t még a config betöltése előtt eltávolítjuk).
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.pop('DATABASE_URL', None)
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """Migrált SQLite adatbázis a teszt ideiglenes könyvtárában (saját kapcsolat pool-lal)"""
+    from config import Config
+    from models import database as db
+    from models.pool import PoolHolder
+
+    monkeypatch.setattr(Config, 'DATABASE_PATH', str(tmp_path / 'bible.db'))
+    monkeypatch.setattr(db, '_pool', PoolHolder(db._create_pool))
+    db.init_db()
+    yield db
+    db._pool.get().close_all()
+    db.invalidate_plan_cache()
@@ -0,0 +1,100 @@
+import re
+from unittest import mock
+
+import pytest
+import requests
+from flask import Flask
+
+from services.bible_api import fetch_verses_from_api
+
+VERSES_PER_CHAPTER = 30
+
+
+class FakeResponse:
+    """szentiras.hu /idezet válasz: a kért fejezet tartomány összes verse"""
+
+    status_code = 200
+
+    def __init__(self, api_ref):
+        book, first, last = re.match(r'^(\d?\D+?)(\d+)(?:-(\d+))?$', api_ref).groups()
+        self.verses = [
+            {'szoveg': f'{chapter}.{verse}', 'hely': {'szep': f'{book} {chapter},{verse}'}}
+            for chapter in range(int(first), int(last or first) + 1)
+            for verse in range(1, VERSES_PER_CHAPTER + 1)
+        ]
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        pass
+
+    def json(self):
+        return {'valasz': {'versek': self.verses}}
+
+
+@pytest.fixture
+def upstream(tmp_path):
+    """Flask alkalmazás környezet ideiglenes vers gyorsítótárral; a lekért API hivatkozások listája"""
+    app = Flask(__name__)
+    app.config.update(VERSE_CACHE_PATH=str(tmp_path / 'verses.db'), BIBLE_API_URL='http://api')
+    calls = []
+
+    def fake_get(session, url, headers=None, timeout=None):
+        api_ref = url.split('/idezet/')[1].split('/')[0]
+        calls.append(api_ref)
+        return FakeResponse(api_ref)
+
+    with app.app_context(), mock.patch.object(requests.Session, 'get', fake_get):
+        yield calls
+
+
+def _locations(result):
+    return [(v['chapter'], v['verse']) for v in result['verses']]
+
+
+def test_verse_range_is_sliced_from_whole_chapter(upstream):
+    result = fetch_verses_from_api('Máté 5:3-12')
+    assert result['success']
+    assert _locations(result) == [(5, v) for v in range(3, 13)]
+    assert result['full_reference'] == 'Mt 5,3'
+    assert upstream == ['Mt5']
+
+
+def test_other_ranges_of_a_cached_chapter_need_no_fetch(upstream):
+    fetch_verses_from_api('Máté 5:1-26')
+    result = fetch_verses_from_api('Mt 5:27-30')
+    assert _locations(result) == [(5, v) for v in range(27, 31)]
+    assert upstream == ['Mt5']
+
+
+def test_cross_chapter_range(upstream):
+    result = fetch_verses_from_api('Mt 4:29-5:2')
+    assert _locations(result) == [(4, 29), (4, 30), (5, 1), (5, 2)]
+    assert upstream == ['Mt4-5']
+
+
+def test_only_missing_chapters_are_fetched(upstream):
+    fetch_verses_from_api('Lk 1')
+    result = fetch_verses_from_api('Lukács 1-3')
+    assert len(result['verses']) == 3 * VERSES_PER_CHAPTER
+    assert [v['chapter'] for v in result['verses']][::VERSES_PER_CHAPTER] == [1, 2, 3]
+    assert upstream == ['Lk1', 'Lk2-3']
+
+
+def test_whole_single_chapter_book(upstream):
+    result = fetch_verses_from_api('Filem 1')
+    assert len(result['verses']) == VERSES_PER_CHAPTER
+    assert upstream == ['Filem1']
+
+
+def test_range_outside_chapter_finds_nothing(upstream):
+    result = fetch_verses_from_api('Mt 5:40-45')
+    assert not result['success']
+    assert result['verses'] == []
+
+
+def test_multiple_passages(upstream):
+    result = fetch_verses_from_api('Zsolt 1:1-2; Mk 3:1')
+    assert _locations(result) == [(1, 1), (1, 2), (3, 1)]
+    assert upstream == ['Zsolt1', 'Mk3']
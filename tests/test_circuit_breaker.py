@@ -0,0 +1,110 @@
+import io
+import time
+from unittest import mock
+
+import pytest
+import requests
+
+from services.http_client import CircuitBreaker, CircuitOpenError, UpstreamClient
+
+
+def test_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    for _ in range(2):
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+    breaker.record_failure('hiba')
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    stats = breaker.stats()
+    assert stats['trips'] == 1 and stats['rejected'] == 1 and stats['last_error'] == 'hiba'
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_allows_single_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_half_open_success_closes():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+
+def test_half_open_failure_reopens():
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=0.01)
+    for _ in range(5):
+        breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.stats()['trips'] == 2
+
+
+def _response(status):
+    response = requests.Response()
+    response.status_code = status
+    response.raw = io.BytesIO(b'')
+    return response
+
+
+def test_client_retries_then_succeeds():
+    client = UpstreamClient(retries=2, backoff=0)
+    responses = [_response(503), _response(200)]
+    with mock.patch.object(requests.Session, 'get', side_effect=responses) as get:
+        assert client.get('http://api').status_code == 200
+    assert get.call_count == 2
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_client_final_5xx_counts_as_failure():
+    client = UpstreamClient(retries=1, backoff=0, breaker=CircuitBreaker(failure_threshold=1))
+    with mock.patch.object(requests.Session, 'get', side_effect=[_response(502), _response(502)]):
+        with pytest.raises(requests.exceptions.HTTPError):
+            client.get('http://api')
+    with pytest.raises(CircuitOpenError):
+        client.get('http://api')
+
+
+def test_client_404_is_not_an_upstream_failure():
+    client = UpstreamClient(retries=2, backoff=0, breaker=CircuitBreaker(failure_threshold=1))
+    with mock.patch.object(requests.Session, 'get', return_value=_response(404)) as get:
+        with pytest.raises(requests.exceptions.HTTPError):
+            client.get('http://api')
+    assert get.call_count == 1
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_client_total_timeout_caps_retries():
+    attempts = []
+
+    def slow(url, headers=None, timeout=None):
+        attempts.append(timeout)
+        time.sleep(min(timeout[1], 0.2))
+        raise requests.exceptions.ReadTimeout('lassú')
+
+    client = UpstreamClient(connect_timeout=0.2, read_timeout=0.2, retries=10, backoff=0.01, total_timeout=0.5)
+    started = time.monotonic()
+    with mock.patch.object(requests.Session, 'get', side_effect=slow):
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            client.get('http://api')
+    assert time.monotonic() - started < 0.8
+    assert len(attempts) < 11
+    # Az utolsó kísérlet időkorlátja a hátralévő időhöz igazodik
+    assert all(read <= 0.2 for _, read in attempts)
@@ -0,0 +1,51 @@
+def _counters(database, table, target_id):
+    conn = database.get_db_connection()
+    row = conn.execute(f'SELECT reaction_count, reply_count FROM {table} WHERE id = ?', (target_id,)).fetchone()
+    conn.close()
+    return row['reaction_count'], row['reply_count']
+
+
+def _recounted(database, table, target_id):
+    database.recount_counters()
+    return _counters(database, table, target_id)
+
+
+def test_counters_follow_reactions_and_replies(database):
+    plan_id = database.get_all_plans()[0]['id']
+    anna = database.get_or_create_user('Anna', plan_id)['id']
+    bela = database.get_or_create_user('Béla', plan_id)['id']
+    comment_id = database.add_comment(anna, plan_id, '2026-01-05', 'komment')
+    highlight_id = database.add_highlight(anna, plan_id, '2026-01-05', 'Mt 5,3', 'Boldogok')
+
+    steps = [
+        (lambda: database.add_reaction(anna, 'comment', comment_id), (1, 0)),
+        (lambda: database.add_reaction(bela, 'comment', comment_id), (2, 0)),
+        # Ismételt reakció: nem számolódik kétszer
+        (lambda: database.add_reaction(bela, 'comment', comment_id), (2, 0)),
+        (lambda: database.remove_reaction(bela, 'comment', comment_id), (1, 0)),
+        # Dupla eltávolítás: a számláló nem csökken tovább
+        (lambda: database.remove_reaction(bela, 'comment', comment_id), (1, 0)),
+        (lambda: database.add_comment_reply(bela, comment_id, 'válasz 1'), (1, 1)),
+        (lambda: database.add_comment_reply(anna, comment_id, 'válasz 2'), (1, 2)),
+        # Nem létező (vagy más felhasználó) válaszának törlése
+        (lambda: database.delete_comment_reply(999, bela), (1, 2)),
+        (lambda: database.remove_reaction(anna, 'comment', comment_id), (0, 2)),
+        (lambda: database.remove_reaction(anna, 'comment', comment_id), (0, 2)),
+    ]
+    for action, expected in steps:
+        action()
+        assert _counters(database, 'comments', comment_id) == expected
+        assert _recounted(database, 'comments', comment_id) == expected
+
+    replies = database.get_replies_for_comment(comment_id)
+    for reply in replies:
+        assert not database.delete_comment_reply(reply['id'], anna if reply['user_id'] == bela else bela)
+        assert database.delete_comment_reply(reply['id'], reply['user_id'])
+        assert not database.delete_comment_reply(reply['id'], reply['user_id'])
+    assert _counters(database, 'comments', comment_id) == (0, 0)
+    assert _recounted(database, 'comments', comment_id) == (0, 0)
+
+    assert database.add_reaction(bela, 'highlight', highlight_id)['count'] == 1
+    assert database.remove_reaction(bela, 'highlight', highlight_id) == 0
+    assert database.remove_reaction(bela, 'highlight', highlight_id) == 0
+    assert _counters(database, 'highlights', highlight_id) == _recounted(database, 'highlights', highlight_id) == (0, 0)
@@ -0,0 +1,23 @@
+from services.bible_api import format_verses_html
+
+
+def _verses(*refs):
+    return {'success': True, 'verses': [{'text': ref, 'reference': ref} for ref in refs]}
+
+
+def _headers(html):
+    return html.count('class="chapter-number"')
+
+
+def test_single_chapter_has_no_headers():
+    assert _headers(format_verses_html(_verses('Mt 5,1', 'Mt 5,2'))) == 0
+
+
+def test_headers_for_every_chapter_across_books():
+    # Az első és az utolsó fejezetszám egyezik, mégis három fejezet
+    html = format_verses_html(_verses('Mt 5,1', 'Mk 3,1', 'Mk 3,2', 'Lk 5,1'))
+    assert _headers(html) == 3
+
+
+def test_same_chapter_number_in_two_books():
+    assert _headers(format_verses_html(_verses('Mt 5,1', 'Lk 5,1'))) == 2
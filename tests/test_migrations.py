@@ -0,0 +1,77 @@
+import pytest
+
+
+def _applied_versions(db):
+    conn = db.get_db_connection()
+    cursor = db.get_cursor(conn)
+    cursor.execute('SELECT version FROM schema_version ORDER BY version')
+    versions = [row['version'] for row in cursor.fetchall()]
+    conn.close()
+    return versions
+
+
+def test_versions_are_contiguous():
+    from models.database import MIGRATIONS, SCHEMA_VERSION
+    versions = [version for version, _, _ in MIGRATIONS]
+    assert versions == list(range(1, len(MIGRATIONS) + 1))
+    assert SCHEMA_VERSION == versions[-1]
+
+
+def test_fresh_database_is_fully_migrated(database):
+    assert _applied_versions(database) == [version for version, _, _ in database.MIGRATIONS]
+    conn = database.get_db_connection()
+    assert database.get_schema_version(conn) == database.SCHEMA_VERSION
+    conn.close()
+
+
+def test_up_to_date_schema_is_a_noop(database):
+    assert database.migrate_db() == []
+
+
+def test_only_pending_migrations_run(database):
+    conn = database.get_db_connection(write=True)
+    conn.execute('DELETE FROM schema_version WHERE version > 3')
+    conn.commit()
+    conn.close()
+
+    assert database.migrate_db() == list(range(4, database.SCHEMA_VERSION + 1))
+    assert database.migrate_db() == []
+
+
+def test_failed_migration_is_rolled_back(database, monkeypatch):
+    def broken(cursor):
+        cursor.execute('CREATE TABLE half_done (id INTEGER)')
+        raise RuntimeError('boom')
+
+    next_version = database.SCHEMA_VERSION + 1
+    monkeypatch.setattr(database, 'MIGRATIONS', database.MIGRATIONS + [(next_version, 'Hibás', broken)])
+    monkeypatch.setattr(database, 'SCHEMA_VERSION', next_version)
+
+    with pytest.raises(RuntimeError):
+        database.migrate_db()
+
+    assert next_version not in _applied_versions(database)
+    conn = database.get_db_connection()
+    cursor = database.get_cursor(conn)
+    cursor.execute("SELECT name FROM sqlite_master WHERE name = 'half_done'")
+    assert cursor.fetchone() is None
+    conn.close()
+    # Az író a sikertelen migráció után is felszabadult
+    assert not database.get_pool_stats()['saturated']
+
+
+def test_progress_is_built_from_existing_reading_log(database):
+    plan_id = database.get_all_plans()[0]['id']
+    user = database.get_or_create_user('Teszt', plan_id)
+    # 4-es verziójú adatbázis olvasási naplóval, reading_progress tábla nélkül
+    conn = database.get_db_connection(write=True)
+    conn.execute('DROP TABLE reading_progress')
+    conn.execute('DELETE FROM schema_version WHERE version > 4')
+    for day in ('2026-01-01', '2026-01-02'):
+        conn.execute('INSERT INTO reading_log (user_id, plan_id, date) VALUES (?, ?, ?)', (user['id'], plan_id, day))
+    conn.commit()
+    conn.close()
+
+    database.migrate_db()
+    (stat,) = [s for s in database.get_all_reading_stats(plan_id) if s['name'] == 'Teszt']
+    assert stat['days_read'] == 2 and stat['last_read_at'] == '2026-01-02'
@@ -0,0 +1,81 @@
+from datetime import datetime
+
+import pytest
+
+from models.database import InvalidCursor, _keyset_condition, decode_notes_cursor, encode_notes_cursor
+
+
+def test_cursor_round_trip():
+    note = {'created_at': datetime(2026, 1, 5, 10, 30), 'type': 'highlight', 'id': 42}
+    assert decode_notes_cursor(encode_notes_cursor(note)) == ('2026-01-05 10:30:00', 'highlight', 42)
+    assert decode_notes_cursor(None) is None
+
+
+@pytest.mark.parametrize('value', ['zzz', 'bm90IGpzb24', encode_notes_cursor({'created_at': 'x', 'type': 'other', 'id': 1})])
+def test_invalid_cursor(value):
+    with pytest.raises(InvalidCursor):
+        decode_notes_cursor(value)
+
+
+def test_keyset_condition():
+    key = ('2026-01-05 10:30:00', 'comment', 7)
+    assert _keyset_condition('c', 'comment', None) == ('', ())
+    # Azonos típus: (created_at, id) összehasonlítás
+    sql, params = _keyset_condition('c', 'comment', key)
+    assert 'c.created_at <' in sql and 'c.id <' in sql
+    assert params == ('2026-01-05 10:30:00', '2026-01-05 10:30:00', 7)
+    # A kisebb típus ("comment" < "highlight") azonos időpontú elemei a kurzor után jönnek
+    sql, params = _keyset_condition('c', 'comment', ('2026-01-05 10:30:00', 'highlight', 3))
+    assert 'c.created_at <=' in sql and params == ('2026-01-05 10:30:00',)
+    sql, params = _keyset_condition('h', 'highlight', key)
+    assert 'h.created_at <' in sql and '<=' not in sql and params == ('2026-01-05 10:30:00',)
+
+
+def _seed_notes(db, user_id, plan_id):
+    """Jegyzetek és kiemelések, részben azonos időbélyeggel (döntetlenek a lapok határán)"""
+    timestamps = ['2026-01-01 08:00:00', '2026-01-02 08:00:00', '2026-01-02 08:00:00', '2026-01-03 08:00:00']
+    conn = db.get_db_connection(write=True)
+    for i, created_at in enumerate(timestamps):
+        conn.execute(
+            'INSERT INTO comments (user_id, plan_id, date, content, created_at) VALUES (?, ?, ?, ?, ?)',
+            (user_id, plan_id, '2026-01-01', f'komment {i}', created_at)
+        )
+        conn.execute(
+            'INSERT INTO highlights (user_id, plan_id, date, verse_ref, text, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+            (user_id, plan_id, '2026-01-01', 'Mt 5:1', f'kiemelés {i}', created_at)
+        )
+    conn.commit()
+    conn.close()
+
+
+@pytest.mark.parametrize('page_size', [1, 2, 3, 5])
+def test_combined_pages_match_full_list(database, page_size):
+    plan_id = database.get_all_plans()[0]['id']
+    user = database.get_or_create_user('Teszt', plan_id)
+    _seed_notes(database, user['id'], plan_id)
+
+    full = database.get_user_notes_combined(user['id'], plan_id)
+    assert len(full) == 8
+
+    pages, cursor = [], None
+    while True:
+        page = database.get_user_notes_combined(user['id'], plan_id, limit=page_size, cursor=cursor)
+        assert len(page) <= page_size
+        pages.extend(page)
+        if len(page) < page_size:
+            break
+        cursor = decode_notes_cursor(encode_notes_cursor(page[-1]))
+
+    assert [(n['type'], n['id']) for n in pages] == [(n['type'], n['id']) for n in full]
+
+
+def test_single_type_pages(database):
+    plan_id = database.get_all_plans()[0]['id']
+    user = database.get_or_create_user('Teszt', plan_id)
+    _seed_notes(database, user['id'], plan_id)
+
+    first = database.get_user_comments(user['id'], plan_id, limit=2)
+    rest = database.get_user_comments(
+        user['id'], plan_id, limit=10, cursor=decode_notes_cursor(encode_notes_cursor(first[-1]))
+    )
+    assert [c['id'] for c in first + rest] == [c['id'] for c in database.get_user_comments(user['id'], plan_id)]
@@ -0,0 +1,39 @@
+from config import Config
+
+
+def test_login_by_lookup_key(database):
+    plan_id = database.create_plan('Teszt terv', 'titok123', 'reading_plan.json', '')
+    assert database.get_plan_by_password('titok123')['id'] == plan_id
+    assert database.get_plan_by_password('rossz') is None
+    assert database.get_stale_lookup_plans() == []
+
+
+def test_secret_rotation_heals_on_login(database, monkeypatch):
+    plan_id = database.create_plan('Teszt terv', 'titok123', 'reading_plan.json', '')
+    monkeypatch.setattr(Config, 'PLAN_LOOKUP_SECRET', 'új titok')
+
+    stale = {plan['id'] for plan in database.get_stale_lookup_plans()}
+    assert plan_id in stale
+    assert database.get_plan_by_password('rossz') is None
+    # Az első sikeres belépés a régi kulcsú tervet is megtalálja, és újraírja a kulcsát
+    plan = database.get_plan_by_password('titok123')
+    assert plan['id'] == plan_id
+    assert plan['password_lookup'] == database.plan_lookup_key('titok123')
+    assert plan_id not in {plan['id'] for plan in database.get_stale_lookup_plans()}
+
+
+def test_backfill_requires_matching_password(database, monkeypatch):
+    monkeypatch.setattr(Config, 'PLAN_LOOKUP_SECRET', 'új titok')
+    (default_plan,) = database.get_stale_lookup_plans()
+    assert not database.backfill_plan_lookup(default_plan['id'], 'rossz')
+    assert database.backfill_plan_lookup(default_plan['id'], Config.SITE_PASSWORD)
+    assert database.get_stale_lookup_plans() == []
+
+
+def test_password_change_writes_current_key(database, monkeypatch):
+    plan_id = database.create_plan('Teszt terv', 'titok123', 'reading_plan.json', '')
+    monkeypatch.setattr(Config, 'PLAN_LOOKUP_SECRET', 'új titok')
+    database.update_plan_password(plan_id, 'másik')
+    assert plan_id not in {plan['id'] for plan in database.get_stale_lookup_plans()}
+    assert database.get_plan_by_password('másik')['id'] == plan_id
+    assert database.get_plan_by_password('titok123') is None
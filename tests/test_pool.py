@@ -0,0 +1,231 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from models.pool import PoolHolder, PoolTimeout, PostgresPool, SQLitePool
+
+
+class FakeConnection:
+    """psycopg2 kapcsolatot utánzó objektum (closed, rollback, close)"""
+
+    def __init__(self):
+        self.closed = 0
+        self.rollbacks = 0
+        self.fail_rollback = False
+
+    def rollback(self):
+        if self.fail_rollback:
+            raise RuntimeError('broken connection')
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+
+def make_pool(size=2, **kwargs):
+    created = []
+
+    def connect():
+        created.append(FakeConnection())
+        return created[-1]
+
+    return PostgresPool(connect, size=size, **kwargs), created
+
+
+def test_checkout_release_reuses_connection():
+    pool, created = make_pool()
+    conn = pool.acquire()
+    raw = conn.raw
+    conn.close()
+    assert raw.rollbacks == 1
+    again = pool.acquire()
+    assert again.raw is raw
+    assert len(created) == 1
+    stats = pool.stats()
+    assert stats['checkouts'] == 2 and stats['created'] == 1 and stats['checked_out'] == 1
+
+
+def test_close_is_idempotent():
+    pool, _ = make_pool()
+    conn = pool.acquire()
+    conn.close()
+    conn.close()
+    assert pool.stats()['checked_out'] == 0
+    assert pool.stats()['idle'] == 1
+
+
+def test_lifo_order():
+    pool, _ = make_pool()
+    first, second = pool.acquire(), pool.acquire()
+    first_raw, second_raw = first.raw, second.raw
+    first.close()
+    second.close()
+    # A legutóbb visszaadott (legmelegebb) kapcsolat megy ki először
+    assert pool.acquire().raw is second_raw
+
+
+def test_timeout_when_saturated():
+    pool, _ = make_pool(size=1, timeout=0.05)
+    held = pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    assert pool.stats()['timeouts'] == 1
+    assert pool.stats()['saturated']
+    held.close()
+
+
+def test_waiter_gets_released_connection():
+    pool, created = make_pool(size=1, timeout=2)
+    held = pool.acquire()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire()))
+    waiter.start()
+    time.sleep(0.05)
+    held.close()
+    waiter.join(1)
+    assert got and got[0].raw is created[0]
+    assert pool.stats()['waits'] == 1
+
+
+def test_recycle_discards_old_connections():
+    pool, created = make_pool(recycle=0.01)
+    pool.acquire().close()
+    time.sleep(0.02)
+    conn = pool.acquire()
+    assert len(created) == 2 and conn.raw is created[1]
+    assert created[0].closed
+    assert pool.stats()['discarded'] == 1
+
+
+def test_closed_or_broken_connections_are_discarded():
+    pool, created = make_pool()
+    conn = pool.acquire()
+    conn.raw.closed = 1
+    conn.close()
+    conn = pool.acquire()
+    conn.raw.fail_rollback = True
+    conn.close()
+    assert pool.stats()['idle'] == 0 and pool.stats()['open'] == 0
+    assert pool.acquire().raw is created[-1] and len(created) == 3
+
+
+def test_failed_connect_frees_slot():
+    calls = []
+
+    def connect():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError('down')
+        return FakeConnection()
+
+    pool = PostgresPool(connect, size=1, timeout=0.05)
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+    assert pool.acquire() is not None
+
+
+def test_pool_holder_recreates_after_fork(monkeypatch):
+    holder = PoolHolder(lambda: object())
+    first = holder.get()
+    assert holder.get() is first
+    monkeypatch.setattr('os.getpid', lambda: -1)
+    assert holder.get() is not first
+
+
+@pytest.fixture
+def sqlite_pool(tmp_path):
+    path = str(tmp_path / 'pool.db')
+    setup = sqlite3.connect(path)
+    setup.execute('PRAGMA journal_mode=WAL')
+    setup.execute('CREATE TABLE t (x INTEGER)')
+    setup.commit()
+    setup.close()
+    pool = SQLitePool(lambda: sqlite3.connect(path, timeout=0.1), write_timeout=0.1)
+    yield pool
+    pool.close_all()
+
+
+def _rows(pool):
+    conn = pool.acquire()
+    rows = [x for (x,) in conn.execute('SELECT x FROM t ORDER BY x')]
+    conn.close()
+    return rows
+
+
+def _in_thread(func):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(func()))
+    thread.start()
+    thread.join(2)
+    return result[0]
+
+
+def _try_write(pool):
+    conn = pool.acquire()
+    try:
+        conn.begin_write()
+        return True
+    except PoolTimeout:
+        return False
+    finally:
+        conn.close()
+
+
+def test_sqlite_thread_reuses_connection(sqlite_pool):
+    first = sqlite_pool.acquire()
+    second = sqlite_pool.acquire()
+    assert first.raw is second.raw
+    second.close()
+    first.close()
+    assert sqlite_pool.stats()['created'] == 1 and sqlite_pool.stats()['checked_out'] == 0
+
+
+def test_sqlite_commit_releases_writer(sqlite_pool):
+    conn = sqlite_pool.acquire()
+    conn.begin_write()
+    conn.execute('INSERT INTO t VALUES (1)')
+    assert conn.writing and sqlite_pool.stats()['saturated']
+    assert not _in_thread(lambda: _try_write(sqlite_pool))
+    conn.commit()
+    assert not conn.writing and not sqlite_pool.stats()['saturated']
+    assert _in_thread(lambda: _try_write(sqlite_pool))
+    conn.close()
+    assert _rows(sqlite_pool) == [1]
+
+
+def test_sqlite_uncommitted_write_rolled_back_on_release(sqlite_pool):
+    conn = sqlite_pool.acquire()
+    conn.begin_write()
+    conn.execute('INSERT INTO t VALUES (1)')
+    conn.close()
+    assert _rows(sqlite_pool) == []
+    assert not sqlite_pool.stats()['saturated']
+
+
+def test_sqlite_nested_checkout_keeps_outer_transaction(sqlite_pool):
+    outer = sqlite_pool.acquire()
+    outer.begin_write()
+    outer.execute('INSERT INTO t VALUES (1)')
+
+    inner = sqlite_pool.acquire()
+    started = time.monotonic()
+    inner.begin_write()  # ugyanaz a szál: nem vár a saját írójára
+    assert time.monotonic() - started < sqlite_pool.write_timeout
+    inner.execute('INSERT INTO t VALUES (2)')
+    inner.close()
+
+    # A belső visszaadás nem görgette vissza a külső tranzakciót és nem adta fel az írót
+    assert outer.in_transaction and outer.writing
+    outer.commit()
+    outer.close()
+    assert _rows(sqlite_pool) == [1, 2]
+
+
+def test_sqlite_write_timeout(sqlite_pool):
+    conn = sqlite_pool.acquire()
+    conn.begin_write()
+    assert not _in_thread(lambda: _try_write(sqlite_pool))
+    assert sqlite_pool.stats()['timeouts'] == 1
+    conn.close()
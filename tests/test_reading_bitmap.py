@@ -0,0 +1,148 @@
+from datetime import date
+
+from models.reading_bitmap import MAX_BYTES, ReadingBitmap, parse_date
+
+
+def test_parse_date():
+    assert parse_date('2026-01-05') == date(2026, 1, 5)
+    assert parse_date('2026-01-05 10:00:00') == date(2026, 1, 5)
+    assert parse_date(date(2026, 1, 5)) == date(2026, 1, 5)
+    assert parse_date('hibás') is None
+    assert parse_date(None) is None
+
+
+def test_add_and_contains():
+    bitmap = ReadingBitmap()
+    assert bitmap.add('2026-01-05')
+    assert not bitmap.add('2026-01-05')
+    assert '2026-01-05' in bitmap
+    assert '2026-01-06' not in bitmap
+    assert bitmap.add('2026-02-20')
+    assert len(bitmap) == 2
+    assert not bitmap.add('nem dátum')
+
+
+def test_add_before_base_date_shifts_whole_bytes():
+    bitmap = ReadingBitmap.from_dates(['2026-01-10'])
+    bitmap.add('2026-01-01')
+    assert bitmap.base_date <= date(2026, 1, 1)
+    assert (date(2026, 1, 10) - bitmap.base_date).days % 8 == 0
+    assert list(bitmap.dates()) == [date(2026, 1, 1), date(2026, 1, 10)]
+
+
+def test_add_rejects_span_beyond_limit():
+    bitmap = ReadingBitmap.from_dates(['2026-01-01'])
+    assert not bitmap.add('9999-12-31')
+    assert not bitmap.add('0001-01-01')
+    assert bitmap.add('2030-01-01')
+    assert len(bitmap.to_bytes()) <= MAX_BYTES
+    assert list(bitmap.dates()) == [date(2026, 1, 1), date(2030, 1, 1)]
+
+
+def test_discard_trims_trailing_bytes():
+    bitmap = ReadingBitmap.from_dates(['2026-01-01', '2026-03-01'])
+    assert bitmap.discard('2026-03-01')
+    assert not bitmap.discard('2026-03-01')
+    assert not bitmap.discard('2025-01-01')
+    assert bitmap.to_bytes() == b'\x01'
+
+
+def test_count_range():
+    bitmap = ReadingBitmap.from_dates(['2026-01-01', '2026-01-02', '2026-01-10', '2026-02-01'])
+    assert bitmap.count_range('2026-01-01', '2026-01-31') == 3
+    assert bitmap.count_range('2025-12-01', '2026-12-31') == 4
+    assert bitmap.count_range('2026-01-03', '2026-01-09') == 0
+    assert bitmap.count_range('2026-01-31', '2026-01-01') == 0
+
+
+def test_mask():
+    bitmap = ReadingBitmap.from_dates(['2026-01-01', '2026-01-03', '2026-01-09'])
+    assert bitmap.mask('2026-01-01', 3) == 0b101
+    assert bitmap.mask('2026-01-03', 7) == 0b1000001
+    # A bittérkép kezdete előtti ablak: a korábbi napok 0 bitek
+    assert bitmap.mask('2025-12-30', 5) == 0b10100
+    assert bitmap.mask('2026-01-01', 0) == 0
+    assert ReadingBitmap().mask('2026-01-01', 31) == 0
+
+
+def test_streak_relative_to_today():
+    bitmap = ReadingBitmap.from_dates(['2026-01-01', '2026-01-02', '2026-01-03', '2026-01-05', '2026-01-06'])
+    assert bitmap.streak(date(2026, 1, 6)) == 2
+    # Ma még nem olvasott: a tegnappal végződő sorozat számít
+    assert bitmap.streak(date(2026, 1, 7)) == 2
+    assert bitmap.streak(date(2026, 1, 4)) == 3
+    # Megszakadt sorozat
+    assert bitmap.streak(date(2026, 1, 8)) == 0
+    assert bitmap.streak(date(2025, 12, 31)) == 0
+    assert ReadingBitmap().streak(date(2026, 1, 1)) == 0
+
+
+def test_last_date():
+    assert ReadingBitmap().last_date() is None
+    bitmap = ReadingBitmap.from_dates(['2026-01-03', '2026-02-10', '2026-01-01'])
+    assert bitmap.last_date() == date(2026, 2, 10)
+    bitmap.discard('2026-02-10')
+    assert bitmap.last_date() == date(2026, 1, 3)
+
+
+def test_serialization_round_trip():
+    dates = ['2026-01-01', '2026-01-08', '2026-01-09', '2026-12-31']
+    bitmap = ReadingBitmap.from_dates(dates)
+    restored = ReadingBitmap(bitmap.base_date.isoformat(), bitmap.to_bytes())
+    assert [d.isoformat() for d in restored.dates()] == dates
+    assert restored.count() == 4
+    # Egy teljes év elfér 46 bájtban
+    assert len(bitmap.to_bytes()) <= 46
+
+
+def test_mark_and_unmark_keep_log_and_bitmap_in_step(database):
+    plan_id = database.get_all_plans()[0]['id']
+    user = database.get_or_create_user('Teszt', plan_id)
+    for day in ('2026-01-01', '2026-01-02', '2026-01-05'):
+        database.mark_day_as_read(user['id'], plan_id, day)
+    database.mark_day_as_read(user['id'], plan_id, '2026-01-02')
+    database.unmark_day_as_read(user['id'], plan_id, '2026-01-01')
+
+    progress = database.get_reading_progress(user['id'], plan_id)
+    log = sorted(database.get_reading_log(user['id'], plan_id))
+    assert [d.isoformat() for d in progress.dates()] == log == ['2026-01-02', '2026-01-05']
+    stats = {row['name']: row for row in database.get_all_reading_stats(plan_id)}
+    assert stats['Teszt']['days_read'] == 2
+    assert stats['Teszt']['last_read_at'] == '2026-01-05'
+
+
+def test_leaderboard_streak_and_last_read(database):
+    from datetime import timedelta
+    plan_id = database.get_all_plans()[0]['id']
+    reader = database.get_or_create_user('Olvasó', plan_id)
+    database.get_or_create_user('Néző', plan_id)
+    today = date.today()
+    for offset in (1, 2, 3, 5):
+        database.mark_day_as_read(reader['id'], plan_id, (today - timedelta(days=offset)).isoformat())
+
+    stats = {row['name']: row for row in database.get_all_reading_stats(plan_id)}
+    # Ma még nem olvasott: a tegnappal végződő 3 napos sorozat számít
+    assert stats['Olvasó']['current_streak'] == 3
+    assert stats['Olvasó']['last_read_at'] == (today - timedelta(days=1)).isoformat()
+    assert stats['Olvasó']['days_read'] == 4
+    assert stats['Néző'] == {'name': 'Néző', 'days_read': 0, 'last_read_at': None, 'current_streak': 0}
+
+
+def test_mark_read_rejects_bad_or_out_of_plan_dates(database):
+    from app import create_app
+    from routes.bible import get_plan_start_date, load_plan_index
+    plan_id = database.get_all_plans()[0]['id']
+    user = database.get_or_create_user('Teszt', plan_id)
+    app = create_app()
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess.update(authenticated=True, user_id=user['id'], plan_id=plan_id)
+    with app.app_context():
+        first, last = load_plan_index(plan_id).date_range(get_plan_start_date(plan_id))
+
+    for bad in (None, '2026-1-5', '2026-02-30', 'holnap', '0001-01-01', '9999-12-31'):
+        response = client.post('/api/mark-read', json={'date': bad})
+        assert response.status_code == 400, bad
+    assert client.post('/api/mark-read', json={'date': first.isoformat()}).json == {'success': True}
+    assert client.post('/api/mark-read', json={'date': last.isoformat()}).status_code == 200
+    assert sorted(database.get_reading_log(user['id'], plan_id)) == [first.isoformat(), last.isoformat()]
@@ -0,0 +1,86 @@
+import pytest
+
+from services.reference_parser import (
+    LAST_VERSE, InvalidReference, normalize_book_name, normalize_reference, parse_reference, reference_key
+)
+
+# A korábbi (regex + prefix keresés) normalize_reference kimenetei
+LEGACY_OUTPUTS = [
+    ('1Mózes 1-3', '1Móz1-3'),
+    ('1 Mózes 1-3', '1Móz1-3'),
+    ('Máté 5:1-26', 'Mt5:1-26'),
+    ('Zsoltár 1', 'Zsolt1'),
+    ('Zsoltárok 23', 'Zsolt23'),
+    ('Példabeszédek 3:5-6', 'Péld3:5-6'),
+    ('Mt 5', 'Mt5'),
+    ('Jn 3,16', 'Jn3,16'),
+    ('2Kor 5:17', '2Kor5:17'),
+    ('1 Korinthusiakhoz 13', '1Kor13'),
+    ('Jelenések 21:1-22:5', 'Jel21:1-22:5'),
+    ('Júd 1-25', 'Júd1-25'),
+    ('Róm 8', 'Róm8'),
+    ('Ézsaiás 53', 'Ézs53'),
+    ('ApCsel 2:1-13', 'ApCsel2:1-13'),
+    ('Ismeretlen 3', 'Ismeretlen3'),
+]
+
+
+@pytest.mark.parametrize('reference, expected', LEGACY_OUTPUTS)
+def test_normalize_reference_matches_legacy(reference, expected):
+    assert normalize_reference(reference) == expected
+
+
+def test_longest_book_name_wins():
+    # A régi prefix keresés a "Filem"-et Filippinek levélnek ("Fil") vette
+    assert normalize_book_name('Filemon') == 'Filem'
+    assert normalize_reference('Filem 1') == 'Filem1'
+    assert normalize_book_name('Fil') == 'Fil'
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('1 Mózes', '1Móz'), ('Máté', 'Mt'), ('Zsoltárok', 'Zsolt'), ('Jelenések', 'Jel'), ('xyz', None), ('', None),
+])
+def test_normalize_book_name(name, expected):
+    assert normalize_book_name(name) == expected
+
+
+@pytest.mark.parametrize('reference, start, stop', [
+    ('Máté 5:1-26', (5, 1), (5, 26)),
+    ('1Mózes 1-3', (1, 0), (3, LAST_VERSE)),
+    ('Jn 3,16', (3, 16), (3, 16)),
+    ('Jel 21:1-22:5', (21, 1), (22, 5)),
+])
+def test_parse_ranges(reference, start, stop):
+    (passage,) = parse_reference(reference).passages
+    assert (passage.start, passage.stop) == (start, stop)
+
+
+def test_multiple_passages_inherit_book():
+    parsed = parse_reference('Zsolt 1; 2:1-5; Mk 3:1-6')
+    assert parsed.key == 'Zsolt1;Zsolt2:1-5;Mk3:1-6'
+
+
+@pytest.mark.parametrize('reference, key', [
+    # Egyfejezetes könyvek: a puszta szám fejezet, mint a korábbi értelmezésben
+    ('Filem 1', 'Filem1'),
+    ('Júd 1', 'Júd1'),
+    ('3Jn 1', '3Jn1'),
+    # Fejezet nélkül az egész könyv, versre fejezet:vers formában
+    ('Abd', 'Abd1'),
+    ('Júd 1:5', 'Júd1:5'),
+    ('Filem 1:4-7', 'Filem1:4-7'),
+])
+def test_single_chapter_books(reference, key):
+    assert parse_reference(reference).key == key
+
+
+def test_key_is_canonical():
+    assert reference_key('Máté 5:1-26') == reference_key('Mt 5,1-26') == 'Mt5:1-26'
+    # Értelmezhetetlen hivatkozásnál a normalizált szöveg
+    assert reference_key('Ismeretlen 3') == 'Ismeretlen3'
+
+
+@pytest.mark.parametrize('reference', ['', 'Ismeretlen 3', 'Mt', 'Mt 5:9-2', 'Mt x'])
+def test_invalid_references(reference):
+    with pytest.raises(InvalidReference):
+        parse_reference(reference)
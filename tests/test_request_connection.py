@@ -0,0 +1,112 @@
+import pytest
+from flask import Flask, jsonify
+
+
+@pytest.fixture
+def app(database):
+    app = Flask(__name__)
+    database.init_app(app)
+    return app
+
+
+def _setup(database):
+    plan_id = database.get_all_plans()[0]['id']
+    user = database.get_or_create_user('Teszt', plan_id)
+    comment_id = database.add_comment(user['id'], plan_id, '2026-01-05', 'komment')
+    return user['id'], comment_id
+
+
+def _reactions(database, comment_id):
+    conn = database.get_db_connection()
+    cursor = database.get_cursor(conn)
+    cursor.execute('SELECT reaction_count FROM comments WHERE id = ?', (comment_id,))
+    count = cursor.fetchone()['reaction_count']
+    cursor.execute("SELECT COUNT(*) AS c FROM reactions WHERE target_type = 'comment' AND target_id = ?", (comment_id,))
+    rows = cursor.fetchone()['c']
+    conn.close()
+    return count, rows
+
+
+def test_one_connection_per_request(app, database):
+    @app.route('/same')
+    def same():
+        return jsonify(database.get_db_connection() is database.get_db_connection())
+
+    assert app.test_client().get('/same').json is True
+
+
+def test_swallowed_error_does_not_poison_request(app, database):
+    user_id, comment_id = _setup(database)
+
+    @app.route('/react')
+    def react():
+        first = database.add_reaction(user_id, 'comment', comment_id)
+        # Második reakció: IntegrityError, csak a saját mentési pontja görgetődik vissza
+        second = database.add_reaction(user_id, 'comment', comment_id)
+        return jsonify(first=first['success'], second=second['success'])
+
+    assert app.test_client().get('/react').json == {'first': True, 'second': False}
+    assert _reactions(database, comment_id) == (1, 1)
+
+
+def test_error_response_rolls_back_uncommitted_writes(app, database):
+    user_id, comment_id = _setup(database)
+
+    @app.route('/bad')
+    def bad():
+        conn = database.get_db_connection()
+        # Commit nélküli írás (olvasási kapcsolaton): a 4xx válasz után eldobjuk
+        conn.execute('UPDATE comments SET content = ? WHERE id = ?', ('módosítva', comment_id))
+        return jsonify(success=False), 400
+
+    assert app.test_client().get('/bad').status_code == 400
+    conn = database.get_db_connection()
+    assert conn.execute('SELECT content FROM comments WHERE id = ?', (comment_id,)).fetchone()[0] == 'komment'
+    conn.close()
+
+
+def test_sqlite_writer_released_at_helper_commit(app, database):
+    user_id, comment_id = _setup(database)
+
+    @app.route('/write')
+    def write():
+        database.add_reaction(user_id, 'comment', comment_id)
+        # A sablon renderelés idejére már nem tartjuk az írót
+        return jsonify(saturated=database.get_pool_stats()['saturated'])
+
+    assert app.test_client().get('/write').json == {'saturated': False}
+    assert _reactions(database, comment_id) == (1, 1)
+
+
+def test_early_returns_release_sqlite_writer(app, database):
+    user_id, comment_id = _setup(database)
+    plan_id = database.get_all_plans()[0]['id']
+
+    @app.route('/noop-writes')
+    def noop_writes():
+        results = [
+            database.delete_user(999, plan_id),
+            database.delete_comment_reply(999, user_id),
+            database.backfill_plan_lookup(plan_id, 'rossz jelszó'),
+        ]
+        # IntegrityError (NOT NULL dátum): a függvény elnyeli, az írót elengedi
+        database.mark_day_as_read(user_id, plan_id, None)
+        return jsonify(results=results, saturated=database.get_pool_stats()['saturated'])
+
+    assert app.test_client().get('/noop-writes').json == {'results': [False, False, False], 'saturated': False}
+
+
+def test_close_without_commit_discards_write_and_releases_writer(app, database):
+    user_id, comment_id = _setup(database)
+
+    @app.route('/abandon')
+    def abandon():
+        conn = database.get_db_connection(write=True)
+        conn.execute('UPDATE comments SET content = ? WHERE id = ?', ('módosítva', comment_id))
+        conn.close()
+        return jsonify(saturated=database.get_pool_stats()['saturated'])
+
+    assert app.test_client().get('/abandon').json == {'saturated': False}
+    conn = database.get_db_connection()
+    assert conn.execute('SELECT content FROM comments WHERE id = ?', (comment_id,)).fetchone()[0] == 'komment'
+    conn.close()
@@ -0,0 +1,86 @@
+import threading
+
+import pytest
+
+from services.single_flight import SingleFlight
+
+
+def _run_concurrently(count, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def test_concurrent_calls_are_coalesced():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(2)
+        return 'versek'
+
+    threads = _run_concurrently(5, lambda: results.append(flight.do('Mt5|SZIT', fetch)))
+    # Megvárjuk, hogy mind az 5 szál beálljon (1 vezető + 4 várakozó)
+    while flight.shared < 4:
+        threading.Event().wait(0.001)
+    assert flight.in_flight() == 1
+    release.set()
+    for thread in threads:
+        thread.join(2)
+
+    assert calls == [1]
+    assert results == ['versek'] * 5
+    assert flight.in_flight() == 0
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    assert flight.do('a', lambda: 1) == 1
+    assert flight.do('b', lambda: 2) == 2
+    assert flight.shared == 0
+
+
+def test_sequential_calls_are_not_cached():
+    flight = SingleFlight()
+    calls = []
+    flight.do('a', lambda: calls.append(1))
+    flight.do('a', lambda: calls.append(1))
+    assert len(calls) == 2
+
+
+def test_error_is_shared_with_waiters():
+    flight = SingleFlight()
+    release = threading.Event()
+    errors = []
+
+    def failing():
+        release.wait(2)
+        raise RuntimeError('upstream')
+
+    def call():
+        try:
+            flight.do('k', failing)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = _run_concurrently(3, call)
+    while flight.shared < 2:
+        threading.Event().wait(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(2)
+
+    assert errors == ['upstream'] * 3
+    # A hiba után a kulcs újra hívható
+    assert flight.do('k', lambda: 'ok') == 'ok'
+
+
+def test_leader_error_propagates():
+    flight = SingleFlight()
+    with pytest.raises(ValueError):
+        flight.do('k', lambda: int('x'))
+    assert flight.in_flight() == 0
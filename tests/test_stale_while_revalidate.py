@@ -0,0 +1,88 @@
+import threading
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+import requests
+from flask import Flask
+
+from services import bible_api, http_client
+from services.bible_api import fetch_verses_from_api
+from services.http_client import CircuitBreaker, UpstreamClient
+from test_chapter_slicing import FakeResponse
+
+
+@pytest.fixture
+def upstream(tmp_path, monkeypatch):
+    """Saját upstream kliens és vers gyorsítótár; a lekért API hivatkozások listája (upstream.gate: kiengedés)"""
+    monkeypatch.setattr(http_client, '_client', UpstreamClient(
+        retries=0, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    ))
+    app = Flask(__name__)
+    app.config.update(VERSE_CACHE_PATH=str(tmp_path / 'verses.db'), BIBLE_API_URL='http://api')
+    calls = []
+    gate = threading.Event()
+    gate.set()
+
+    def fake_get(session, url, headers=None, timeout=None):
+        api_ref = url.split('/idezet/')[1].split('/')[0]
+        calls.append(api_ref)
+        gate.wait(5)
+        return FakeResponse(api_ref)
+
+    with app.app_context(), mock.patch.object(requests.Session, 'get', fake_get):
+        yield SimpleNamespace(calls=calls, gate=gate, config=app.config)
+
+
+def _expire(upstream):
+    upstream.config['VERSE_CACHE_TTL'] = 0.01
+    time.sleep(0.02)
+
+
+def _wait_for_refresh():
+    deadline = time.monotonic() + 5
+    while bible_api._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not bible_api._refreshing
+
+
+def test_stale_entry_is_served_and_refreshed_once(upstream):
+    assert fetch_verses_from_api('Mt 5')['stale'] is False
+    _expire(upstream)
+    # A háttér frissítés addig vár, amíg két kérés is a lejárt bejegyzést kapja
+    upstream.gate.clear()
+    first = fetch_verses_from_api('Mt 5:1-3')
+    second = fetch_verses_from_api('Mt 5')
+    assert first['success'] and first['stale'] is True
+    assert second['success'] and second['stale'] is True
+    upstream.gate.set()
+    _wait_for_refresh()
+    assert upstream.calls == ['Mt5', 'Mt5']
+
+    upstream.config['VERSE_CACHE_TTL'] = 60
+    assert fetch_verses_from_api('Mt 5')['stale'] is False
+    assert upstream.calls == ['Mt5', 'Mt5']
+
+
+def test_cache_only_serves_cached_without_upstream(upstream):
+    fetch_verses_from_api('Mt 5')
+    _expire(upstream)
+    upstream.config['VERSE_CACHE_ONLY'] = True
+    result = fetch_verses_from_api('Mt 5:1-3')
+    assert result['success'] and len(result['verses']) == 3
+    assert not fetch_verses_from_api('Mk 1')['success']
+    _wait_for_refresh()
+    assert upstream.calls == ['Mt5']
+
+
+def test_open_breaker_serves_cached_without_upstream(upstream):
+    fetch_verses_from_api('Mt 5')
+    _expire(upstream)
+    http_client._client.breaker.record_failure('leállás')
+    assert bible_api.is_cache_only()
+    result = fetch_verses_from_api('Mt 5:1-3')
+    assert result['success'] and len(result['verses']) == 3
+    assert not fetch_verses_from_api('Mk 1')['success']
+    _wait_for_refresh()
+    assert upstream.calls == ['Mt5']